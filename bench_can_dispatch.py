@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark cho vòng nhận CAN: so sánh chuỗi if cũ với bảng dispatch.
+
+Chạy:
+    python bench_can_dispatch.py [số_frame]
+"""
+
+import io
+import os
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from communication.can_config import (
+    CAN_ID_DISTANCE, CAN_ID_DIRECTION,
+    CAN_ID_CANNON_LEFT, CAN_ID_CANNON_RIGHT,
+    CAN_ID_AMMO_STATUS,
+    CAN_ID_MODULE_DATA_START, CAN_ID_MODULE_DATA_END,
+    is_module_data_id
+)
+from communication.can_dispatcher import CANDispatcher
+
+
+class _Frame:
+    """Frame CAN tối giản (thay cho can.Message trong benchmark)."""
+    __slots__ = ("arbitration_id", "data", "timestamp")
+
+    def __init__(self, arbitration_id, data):
+        self.arbitration_id = arbitration_id
+        self.data = bytearray(data)
+        self.timestamp = time.time()
+
+
+def make_frames(count, seed=0):
+    """Tạo luồng frame giống tải thực: phần lớn là module telemetry."""
+    rng = random.Random(seed)
+    frames = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.85:
+            can_id = rng.randint(CAN_ID_MODULE_DATA_START, CAN_ID_MODULE_DATA_START + 24)
+            data = [rng.randint(0, 4), 0x04, 0xB0, 0x00, 0xC8, 0x00, 0xF0, 35]
+        elif roll < 0.90:
+            can_id = rng.choice([CAN_ID_CANNON_LEFT, CAN_ID_CANNON_RIGHT])
+            data = [0] * 8
+        elif roll < 0.95:
+            can_id = rng.choice([CAN_ID_DISTANCE, CAN_ID_DIRECTION])
+            data = [0, 0, 0x80, 0x3F]
+        elif roll < 0.97:
+            can_id = CAN_ID_AMMO_STATUS
+            data = [0x31, 0x31, 0xFF, 0xFF, 0x03, 0x11]
+        else:
+            can_id = rng.randint(0x400, 0x4FF)
+            data = [0] * 8
+        frames.append(_Frame(can_id, data))
+    return frames
+
+
+def _noop(msg):
+    return msg.arbitration_id
+
+
+def legacy_route(msg, module_handler=_noop, distance_handler=_noop, direction_handler=_noop,
+                 cannon_left_handler=_noop, cannon_right_handler=_noop,
+                 ammo_handler=_noop, unknown_handler=_noop):
+    """Bản sao cấu trúc định tuyến cũ của data_receiver.run (chuỗi if không elif)."""
+    if is_module_data_id(msg.arbitration_id):
+        return module_handler(msg)
+    if msg.arbitration_id == CAN_ID_DISTANCE:
+        distance_handler(msg)
+    if msg.arbitration_id == CAN_ID_DIRECTION:
+        direction_handler(msg)
+    if msg.arbitration_id in [CAN_ID_DISTANCE, CAN_ID_DIRECTION]:
+        pass
+    if msg.arbitration_id == CAN_ID_CANNON_LEFT:
+        cannon_left_handler(msg)
+    if msg.arbitration_id == CAN_ID_CANNON_RIGHT:
+        cannon_right_handler(msg)
+    if msg.arbitration_id == CAN_ID_AMMO_STATUS:
+        ammo_handler(msg)
+    if (msg.arbitration_id not in [CAN_ID_DISTANCE, CAN_ID_DIRECTION,
+                                  CAN_ID_CANNON_LEFT, CAN_ID_CANNON_RIGHT,
+                                  CAN_ID_AMMO_STATUS] and
+            not is_module_data_id(msg.arbitration_id)):
+        unknown_handler(msg)
+
+
+def table_router():
+    """Bảng dispatch với cùng tập handler rỗng như legacy_route."""
+    dispatcher = CANDispatcher(default_handler=_noop)
+    dispatcher.register_range(CAN_ID_MODULE_DATA_START, CAN_ID_MODULE_DATA_END, _noop)
+    for can_id in (CAN_ID_DISTANCE, CAN_ID_DIRECTION, CAN_ID_CANNON_LEFT,
+                   CAN_ID_CANNON_RIGHT, CAN_ID_AMMO_STATUS):
+        dispatcher.register(can_id, _noop)
+    return dispatcher.dispatch
+
+
+def measure(route, frames, repeat=5):
+    """Trả về throughput tốt nhất (frames/s) sau `repeat` lần chạy."""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for msg in frames:
+            route(msg)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(frames) / elapsed)
+    return best
+
+
+def measure_bursts(process_burst, frames, burst_size=64, repeat=3):
+    """Throughput (frames/s) khi xử lý theo burst như vòng nhận thực tế."""
+    bursts = [frames[i:i + burst_size] for i in range(0, len(frames), burst_size)]
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for burst in bursts:
+            process_burst(burst)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(frames) / elapsed)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    frames = make_frames(count)
+
+    print(f"=== CAN dispatch microbenchmark ({count} frames) ===")
+    legacy = measure(legacy_route, frames)
+    table = measure(table_router(), frames)
+    print(f"Định tuyến - chuỗi if cũ : {legacy:12,.0f} frames/s")
+    print(f"Định tuyến - bảng dispatch: {table:12,.0f} frames/s ({table / legacy:.2f}x)")
+
+    # End-to-end qua handler thật của receiver (stdout bị bỏ qua)
+    from communication import data_receiver
+    sample = frames[:min(count, 20000)]
+    with redirect_stdout(io.StringIO()):
+        end_to_end = measure(data_receiver.process_frame, sample, repeat=3)
+        burst = measure_bursts(data_receiver.process_burst, sample)
+    print(f"End-to-end data_receiver.process_frame: {end_to_end:12,.0f} frames/s")
+    print(f"End-to-end data_receiver.process_burst: {burst:12,.0f} frames/s (burst 64, gộp latest-wins)")
+
+
+if __name__ == "__main__":
+    main()
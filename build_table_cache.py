@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Biên dịch các bảng CSV (bảng bắn, bảng tra chênh tà) thành cache .npz.
+
+Chạy trước khi đóng gói để lần khởi động đầu tiên không phải import pandas:
+    python build_table_cache.py [bảng.csv ...]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from common.ballistics import build_table_caches, table_cache_path
+
+
+def main():
+    csv_paths = sys.argv[1:] or None
+    start = time.perf_counter()
+    results = build_table_caches(csv_paths)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    for csv_path, ok in results.items():
+        status = "OK " if ok else "LỖI"
+        print(f"[{status}] {csv_path} -> {table_cache_path(csv_path)}")
+    print(f"Đã biên dịch {sum(results.values())}/{len(results)} bảng trong {elapsed_ms:.1f} ms")
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
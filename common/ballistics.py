@@ -0,0 +1,972 @@
+# -*- coding: utf-8 -*-
+"""
+Ballistics module - bảng bắn, bảng tra chênh tà và tính toán giải pháp bắn.
+
+Mỗi bảng bắn được nạp một lần thành một mảng float64 liền khối, đã sắp xếp
+theo khoảng cách và chỉ đọc (cột × khoảng cách); tên cột ánh xạ sang chỉ số
+hàng qua FIRING_TABLE_COLUMN_INDEX. Mọi nơi dùng bảng bắn (receiver thread,
+tab điều khiển, các dialog) lấy chung một instance từ firing_table_registry.
+
+Các bảng CSV được biên dịch sẵn thành file .npz cạnh file CSV (kèm SHA-256
+của CSV nguồn). Khi khởi động, bảng được nạp từ .npz nếu checksum còn khớp;
+pandas chỉ được import để đọc CSV khi cache thiếu hoặc đã cũ.
+"""
+
+import hashlib
+import math
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from common.constants import Paths, FiringTableDefaults
+from common.utils import resource_path
+
+
+# Các cột của bảng bắn theo thứ tự lưu trong FiringTableInterpolator.table:
+# (tên cột/trường trong kết quả evaluate(), tên cột trong file CSV)
+FIRING_TABLE_COLUMNS = (
+    ('angle_mils', 'P'),
+    ('z', 'Z'),
+    ('delta_zwhz', 'delta_Zwhz'),
+    ('delta_zwbez', 'delta_Zwbez'),
+    ('delta_zwhx', 'delta_Zwhx'),
+    ('delta_zwbe', 'delta_Zwbe'),
+    ('delta_xwhx', 'delta_Xwhx'),
+    ('delta_xwhz', 'delta_Xwhz'),
+    ('delta_xwbex', 'delta_Xwbex'),
+    ('delta_xkacn', 'delta_Xkacn'),
+    ('delta_xh', 'delta_XH'),
+    ('delta_xt', 'delta_XT'),
+    ('delta_xtsz', 'delta_XTsz'),
+    ('delta_xtbic', 'delta_XTbic'),
+)
+
+# {tên cột: chỉ số hàng trong FiringTableInterpolator.table}
+FIRING_TABLE_COLUMN_INDEX = {name: i for i, (name, _) in enumerate(FIRING_TABLE_COLUMNS)}
+
+# Tên thuộc tính cũ của interpolator khác với tên cột
+_LEGACY_ATTRIBUTES = {'angles': 'angle_mils', 'z_data': 'z'}
+
+# Kiểu một hàng kết quả của FiringTableInterpolator.evaluate()
+FIRING_TABLE_ROW_DTYPE = np.dtype([(name, np.float64) for name, _ in FIRING_TABLE_COLUMNS])
+
+
+class AngleLutReport(NamedTuple):
+    """Sai số của LUT góc tầm so với np.interp trên bảng gốc."""
+    step: float             # Bước khoảng cách của LUT (m)
+    size: int               # Số điểm LUT
+    max_abs_error: float    # Sai số tuyệt đối lớn nhất (ly giác)
+    max_error_range: float  # Khoảng cách có sai số lớn nhất (m)
+    rms_error: float        # Sai số trung bình phương (ly giác)
+    samples: int            # Số điểm kiểm tra
+
+
+class FiringTableInterpolator:
+    """Nội suy bảng bắn để tìm góc tầm và các lượng sửa cho một khoảng cách.
+
+    Góc tầm và mọi cột lượng sửa nằm trong một mảng `table` (cột × khoảng
+    cách) liền khối, chỉ đọc, sắp xếp theo khoảng cách tăng dần. Cột vắng mặt
+    trong file CSV được lưu là 0 và `column()` trả về None cho cột đó.
+    """
+
+    def __init__(self, ranges: np.ndarray, angles: np.ndarray, **columns: Optional[np.ndarray]):
+        """
+        Khởi tạo interpolator với dữ liệu bảng bắn.
+
+        Args:
+            ranges: Mảng khoảng cách (X)
+            angles: Mảng góc tầm (P) bằng ly giác
+            **columns: Các cột lượng sửa theo tên trong FIRING_TABLE_COLUMNS
+                (ví dụ z=..., delta_xt=...); chấp nhận cả tên cũ z_data
+        """
+        if len(ranges) != len(angles):
+            raise ValueError("Số lượng khoảng cách và góc tầm phải bằng nhau.")
+        if len(ranges) == 0:
+            raise ValueError("Bảng bắn không có dữ liệu.")
+
+        columns['angle_mils'] = angles
+        for legacy, name in _LEGACY_ATTRIBUTES.items():
+            if legacy in columns:
+                columns[name] = columns.pop(legacy)
+        unknown = set(columns) - set(FIRING_TABLE_COLUMN_INDEX)
+        if unknown:
+            raise ValueError(f"Cột bảng bắn không hợp lệ: {', '.join(sorted(unknown))}")
+
+        # Đảm bảo các khoảng cách được sắp xếp tăng dần
+        ranges = np.asarray(ranges, dtype=np.float64)
+        sort_indices = np.argsort(ranges, kind='stable')
+        self.ranges = ranges[sort_indices]
+
+        # Gom mọi cột vào một mảng 2D; cột không có trong bảng là 0 (nội suy ra 0)
+        table = np.zeros((len(FIRING_TABLE_COLUMNS), len(self.ranges)), dtype=np.float64)
+        present = set()
+        for name, data in columns.items():
+            if data is None:
+                continue
+            if len(data) != len(self.ranges):
+                raise ValueError(f"Cột {name} không cùng số hàng với khoảng cách.")
+            table[FIRING_TABLE_COLUMN_INDEX[name]] = np.asarray(data, dtype=np.float64)[sort_indices]
+            present.add(name)
+
+        # Bảng dùng chung giữa các thread: khóa ghi để không ai sửa nhầm
+        self.table = table
+        self.table.setflags(write=False)
+        self.ranges.setflags(write=False)
+        self._present = frozenset(present)
+        self.angles = self.table[FIRING_TABLE_COLUMN_INDEX['angle_mils']]
+
+        # LUT góc tầm: (start, end, 1/step, last_index, values, end_value) hoặc None
+        self._angle_lut = None
+
+    # ------------------------------------------------------------------
+    # Truy cập cột
+    # ------------------------------------------------------------------
+    def has_column(self, name: str) -> bool:
+        """Cột có trong file CSV gốc hay không."""
+        return name in self._present
+
+    def column(self, name: str) -> Optional[np.ndarray]:
+        """View chỉ đọc của một cột (None nếu cột không có trong file CSV)."""
+        if name not in self._present:
+            return None
+        return self.table[FIRING_TABLE_COLUMN_INDEX[name]]
+
+    def __getattr__(self, name: str):
+        # Thuộc tính cột kiểu cũ (z_data, delta_xt, ...) là view vào table
+        column = _LEGACY_ATTRIBUTES.get(name, name)
+        if column in FIRING_TABLE_COLUMN_INDEX and '_present' in self.__dict__:
+            return self.column(column)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    # ------------------------------------------------------------------
+    # Nội suy
+    # ------------------------------------------------------------------
+    def evaluate(self, target_ranges):
+        """Nội suy mọi cột của bảng bắn cho một hoặc nhiều khoảng cách.
+
+        Khoảng chứa của mỗi khoảng cách chỉ được tìm một lần; ngoài dải bảng,
+        giá trị được giữ bằng giá trị biên (giống np.interp).
+
+        Args:
+            target_ranges: Một khoảng cách hoặc mảng khoảng cách (m)
+
+        Returns:
+            Mảng có cấu trúc kiểu FIRING_TABLE_ROW_DTYPE (một hàng cho mỗi
+            khoảng cách, truy cập theo tên trường, ví dụ row['delta_xt']);
+            một hàng đơn nếu đầu vào là số vô hướng. Góc tầm ở trường
+            'angle_mils' (ly giác).
+        """
+        x = np.asarray(target_ranges, dtype=np.float64)
+        scalar = x.ndim == 0
+        x = np.atleast_1d(x).ravel()
+        ranges = self.ranges
+
+        if len(ranges) == 1:
+            values = np.repeat(self.table, len(x), axis=1)
+        else:
+            index = np.clip(np.searchsorted(ranges, x, side='right') - 1, 0, len(ranges) - 2)
+            x0 = ranges[index]
+            span = ranges[index + 1] - x0
+            weight = np.divide(x - x0, span, out=np.zeros_like(x), where=span != 0)
+            np.clip(weight, 0.0, 1.0, out=weight)
+            lower = self.table[:, index]
+            values = lower + (self.table[:, index + 1] - lower) * weight
+
+        rows = np.ascontiguousarray(values.T).view(FIRING_TABLE_ROW_DTYPE)[:, 0]
+        return rows[0] if scalar else rows
+
+    def interpolate(self, name: str, target_range: float) -> float:
+        """Nội suy một cột theo tên cho một khoảng cách (0 nếu cột không có).
+
+        Ngoài dải bảng, giá trị được giữ bằng giá trị biên.
+        """
+        if name not in self._present:
+            return 0.0
+        return np.interp(target_range, self.ranges, self.table[FIRING_TABLE_COLUMN_INDEX[name]])
+
+    # ------------------------------------------------------------------
+    # LUT góc tầm
+    # ------------------------------------------------------------------
+    def compile_angle_lut(self, step: float = FiringTableDefaults.ELEVATION_LUT_STEP_M) -> None:
+        """Lấy mẫu lại góc tầm lên lưới khoảng cách đều để tra O(1).
+
+        Sau khi dựng, interpolate_angle/interpolate_angle_mils chỉ còn một phép
+        tính chỉ số và một phép nội suy tuyến tính giữa hai ô liền kề.
+
+        Sai số so với np.interp không được tính ở đây (nằm trên đường khởi động);
+        gọi angle_lut_error_report() khi cần kiểm tra.
+
+        Args:
+            step: Bước khoảng cách của lưới (m)
+        """
+        if step <= 0:
+            raise ValueError(f"Bước LUT không hợp lệ: {step}")
+        start = float(self.ranges[0])
+        end = float(self.ranges[-1])
+        last_index = max(1, int(math.ceil((end - start) / step)))
+        grid = start + np.arange(last_index + 1) * step
+        values = np.interp(grid, self.ranges, self.angles).tolist()
+        # Ô cuối để values[i + 1] luôn hợp lệ
+        values.append(values[-1])
+        self._angle_lut = (start, end, 1.0 / step, last_index, values, float(self.angles[-1]))
+
+    def disable_angle_lut(self):
+        """Quay về nội suy chính xác bằng np.interp."""
+        self._angle_lut = None
+
+    @property
+    def has_angle_lut(self) -> bool:
+        return self._angle_lut is not None
+
+    def angle_lut_error_report(self, samples_per_step: int = FiringTableDefaults.LUT_CHECK_SAMPLES_PER_STEP
+                               ) -> Optional[AngleLutReport]:
+        """So sánh LUT với np.interp trên lưới dày hơn và tại mọi điểm của bảng."""
+        lut = self._angle_lut
+        if lut is None:
+            return None
+        start, end, inv_step, last_index, _, _ = lut
+        step = 1.0 / inv_step
+        check = np.concatenate([
+            np.linspace(start, end, max(2, int((end - start) * inv_step * samples_per_step) + 1)),
+            self.ranges,
+        ])
+        exact = np.interp(check, self.ranges, self.angles)
+        approx = self._lut_angle_mils_array(check)
+        errors = np.abs(approx - exact)
+        worst = int(np.argmax(errors))
+        return AngleLutReport(
+            step=step,
+            size=last_index + 1,
+            max_abs_error=float(errors[worst]),
+            max_error_range=float(check[worst]),
+            rms_error=float(np.sqrt(np.mean(errors ** 2))),
+            samples=len(check),
+        )
+
+    def _lut_angle_mils_array(self, target_ranges: np.ndarray) -> np.ndarray:
+        """Cùng phép tra như _lut_angle_mils cho một mảng khoảng cách hữu hạn."""
+        start, end, inv_step, last_index, values, end_value = self._angle_lut
+        values = np.asarray(values)
+        position = np.maximum((target_ranges - start) * inv_step, 0.0)
+        index = np.minimum(position.astype(np.int64), last_index)
+        lower = values[index]
+        result = lower + (values[index + 1] - lower) * (position - index)
+        return np.where(target_ranges >= end, end_value, result)
+
+    def _lut_angle_mils(self, target_range: float) -> float:
+        if not math.isfinite(target_range):
+            # NaN/±inf: trả về đúng như đường np.interp (NaN → NaN, không ném lỗi)
+            return float(np.interp(target_range, self.ranges, self.angles))
+        start, end, inv_step, last_index, values, end_value = self._angle_lut
+        if target_range >= end:
+            return end_value
+        position = (target_range - start) * inv_step
+        if position <= 0:
+            return values[0]
+        index = int(position)
+        lower = values[index]
+        return lower + (values[index + 1] - lower) * (position - index)
+
+    def interpolate_angle(self, target_range: float) -> float:
+        """Nội suy góc tầm cho một khoảng cách mục tiêu.
+        
+        Returns:
+            Góc tầm tính bằng độ (degrees)
+        """
+        angle_mils = self.interpolate_angle_mils(target_range)
+        # Quy đổi từ ly giác sang độ: 1 ly giác = 0.06 độ
+        angle_degrees = angle_mils * 0.06
+        return angle_degrees
+    
+    def interpolate_angle_mils(self, target_range: float) -> float:
+        """Nội suy góc tầm cho một khoảng cách mục tiêu.
+        
+        Dùng LUT nếu đã dựng bằng compile_angle_lut(), ngược lại np.interp.
+
+        Returns:
+            Góc tầm tính bằng ly giác (mils)
+        """
+        if self._angle_lut is not None:
+            return self._lut_angle_mils(target_range)
+        return np.interp(target_range, self.ranges, self.angles)
+
+    def interpolate_angles(self, target_ranges: np.ndarray) -> np.ndarray:
+        """Nội suy góc tầm (độ) cho mảng khoảng cách."""
+        return np.interp(target_ranges, self.ranges, self.angles) * 0.06
+    
+    def interpolate_z(self, target_range: float) -> float:
+        """Nội suy giá trị Z cho một khoảng cách."""
+        return self.interpolate('z', target_range)
+    
+    def interpolate_delta_zwhz(self, target_range: float) -> float:
+        """Nội suy lượng sửa Z do gió hướng Z (ly giác)."""
+        return self.interpolate('delta_zwhz', target_range)
+    
+    def interpolate_delta_zwbez(self, target_range: float) -> float:
+        """Nội suy lượng sửa Z do gió bên Z (ly giác)."""
+        return self.interpolate('delta_zwbez', target_range)
+    
+    def interpolate_delta_zwhx(self, target_range: float) -> float:
+        """Nội suy lượng sửa Z do gió hướng X (ly giác)."""
+        return self.interpolate('delta_zwhx', target_range)
+    
+    def interpolate_delta_zwbe(self, target_range: float) -> float:
+        """Nội suy lượng sửa Z do gió bên (ly giác)."""
+        return self.interpolate('delta_zwbe', target_range)
+    
+    def interpolate_delta_xwhx(self, target_range: float) -> float:
+        """Nội suy lượng sửa X do gió hướng X (ly giác)."""
+        return self.interpolate('delta_xwhx', target_range)
+    
+    def interpolate_delta_xwhz(self, target_range: float) -> float:
+        """Nội suy lượng sửa X do gió hướng Z (ly giác)."""
+        return self.interpolate('delta_xwhz', target_range)
+    
+    def interpolate_delta_xwbex(self, target_range: float) -> float:
+        """Nội suy lượng sửa X do gió bên X (ly giác)."""
+        return self.interpolate('delta_xwbex', target_range)
+    
+    def interpolate_delta_xkacn(self, target_range: float) -> float:
+        """Nội suy lượng sửa X do không khí chuyển động ngang (ly giác)."""
+        return self.interpolate('delta_xkacn', target_range)
+    
+    def interpolate_delta_xh(self, target_range: float) -> float:
+        """Nội suy lượng sửa X do độ cao (ly giác)."""
+        return self.interpolate('delta_xh', target_range)
+    
+    def interpolate_delta_xt(self, target_range: float) -> float:
+        """Nội suy lượng sửa X do nhiệt độ (ly giác)."""
+        return self.interpolate('delta_xt', target_range)
+    
+    def interpolate_delta_xtsz(self, target_range: float) -> float:
+        """Nội suy lượng sửa X do nhiệt độ liều sử dụng (ly giác)."""
+        return self.interpolate('delta_xtsz', target_range)
+    
+    def interpolate_delta_xtbic(self, target_range: float) -> float:
+        """Nội suy lượng sửa X do nhiệt độ bi có (ly giác)."""
+        return self.interpolate('delta_xtbic', target_range)
+
+
+# ----------------------------------------------------------------------
+# Cache nhị phân của bảng CSV
+# ----------------------------------------------------------------------
+TABLE_CACHE_VERSION = 1
+
+
+def table_cache_path(csv_path: str) -> str:
+    """Đường dẫn file cache .npz của một bảng CSV (cùng thư mục, cùng tên)."""
+    return os.path.splitext(resource_path(csv_path))[0] + FiringTableDefaults.BINARY_CACHE_SUFFIX
+
+
+def _file_checksum(full_path: str) -> str:
+    with open(full_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _read_table_cache(csv_path: str, kind: str, checksum: str) -> Optional[Dict[str, np.ndarray]]:
+    """Mảng trong cache nếu cache tồn tại và được dựng từ đúng nội dung CSV hiện tại."""
+    cache_path = table_cache_path(csv_path)
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            if (int(data['version']) != TABLE_CACHE_VERSION or str(data['kind']) != kind
+                    or str(data['checksum']) != checksum):
+                print(f"Cache {os.path.basename(cache_path)} đã cũ, đọc lại {csv_path}")
+                return None
+            return {name: data[name] for name in data.files}
+    except Exception as e:
+        print(f"Lỗi đọc cache {cache_path}: {e}")
+        return None
+
+
+def _write_table_cache(csv_path: str, kind: str, checksum: str, **arrays: np.ndarray) -> bool:
+    """Ghi cache (file tạm rồi đổi tên để không ai đọc phải file ghi dở)."""
+    cache_path = table_cache_path(csv_path)
+    temp_path = cache_path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            np.savez(f, version=TABLE_CACHE_VERSION, kind=kind, checksum=checksum, **arrays)
+        os.replace(temp_path, cache_path)
+        return True
+    except OSError as e:
+        # Thư mục chỉ đọc (ví dụ bản đóng gói): vẫn chạy bình thường từ CSV
+        print(f"Không ghi được cache {cache_path}: {e}")
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+
+
+def _load_table(csv_path: str, kind: str, parse_csv, to_arrays, from_arrays, use_cache: bool):
+    """Nạp bảng từ cache nếu còn mới, ngược lại đọc CSV rồi ghi lại cache.
+
+    Args:
+        parse_csv: Hàm (full_path) -> bảng, đọc file CSV
+        to_arrays: Hàm (bảng) -> dict mảng để lưu cache
+        from_arrays: Hàm (dict mảng) -> bảng
+    """
+    full_path = resource_path(csv_path)
+    checksum = _file_checksum(full_path)
+    use_cache = use_cache and FiringTableDefaults.BINARY_CACHE
+    if use_cache:
+        arrays = _read_table_cache(csv_path, kind, checksum)
+        if arrays is not None:
+            return from_arrays(arrays)
+
+    table = parse_csv(full_path)
+    if use_cache and FiringTableDefaults.BINARY_CACHE_WRITE:
+        _write_table_cache(csv_path, kind, checksum, **to_arrays(table))
+    return table
+
+
+def _parse_firing_table_csv(full_path: str) -> FiringTableInterpolator:
+    import pandas as pd
+
+    df = pd.read_csv(full_path)
+
+    # Kiểm tra các cột cần thiết (X là khoảng cách, P là góc tầm)
+    if 'X' not in df.columns or 'P' not in df.columns:
+        raise ValueError("File CSV phải có cột 'X' và 'P'")
+
+    # Các cột lượng sửa chỉ được đọc nếu có trong file CSV
+    columns = {name: df[csv_column].values
+               for name, csv_column in FIRING_TABLE_COLUMNS
+               if csv_column in df.columns and name != 'angle_mils'}
+
+    return FiringTableInterpolator(df['X'].values, df['P'].values, **columns)
+
+
+def _firing_table_arrays(interpolator: FiringTableInterpolator) -> Dict[str, np.ndarray]:
+    present = [name for name, _ in FIRING_TABLE_COLUMNS if interpolator.has_column(name)]
+    return {'ranges': interpolator.ranges, 'table': interpolator.table, 'columns': np.array(present)}
+
+
+def _firing_table_from_arrays(arrays: Dict[str, np.ndarray]) -> FiringTableInterpolator:
+    table = arrays['table']
+    columns = {str(name): table[FIRING_TABLE_COLUMN_INDEX[str(name)]] for name in arrays['columns']}
+    return FiringTableInterpolator(arrays['ranges'], columns.pop('angle_mils'), **columns)
+
+
+def load_firing_table(csv_path: str = Paths.FIRING_TABLE_LOW, use_cache: bool = True):
+    """Đọc bảng bắn (từ cache .npz nếu còn mới, ngược lại từ file CSV).
+    
+    Args:
+        csv_path: Đường dẫn đến file CSV (mặc định: bảng bắn thấp)
+        use_cache: Dùng/ghi cache nhị phân (False = luôn đọc CSV)
+        
+    Returns:
+        FiringTableInterpolator instance hoặc None nếu lỗi
+    """
+    try:
+        return _load_table(csv_path, 'firing_table', _parse_firing_table_csv,
+                           _firing_table_arrays, _firing_table_from_arrays, use_cache)
+    except FileNotFoundError:
+        print(f"Không tìm thấy file {csv_path}")
+        return None
+    except Exception as e:
+        print(f"Lỗi đọc file CSV: {e}")
+        return None
+
+
+class FiringTableRegistry:
+    """Sổ đăng ký bảng bắn dùng chung.
+
+    Mỗi file CSV (bảng thấp, bảng cao, các liều khác) chỉ được đọc một lần và
+    giữ theo (đường dẫn, mtime). Mỗi lần tra chỉ tốn một lần os.stat; bảng được
+    đọc lại khi file trên đĩa thay đổi. File lỗi hoặc thiếu cũng được ghi nhớ
+    theo mtime để không đọc lại (và không in lỗi) ở mỗi chu kỳ cập nhật.
+    """
+
+    def __init__(self):
+        # {full_path: (mtime_ns, interpolator hoặc None)}
+        self._tables: Dict[str, Tuple[Optional[int], Optional[FiringTableInterpolator]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _mtime(full_path: str) -> Optional[int]:
+        try:
+            return os.stat(full_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, csv_path: str = Paths.FIRING_TABLE_LOW) -> Optional[FiringTableInterpolator]:
+        """Interpolator của bảng bắn, đọc (lại) file chỉ khi chưa có hoặc đã thay đổi.
+
+        Args:
+            csv_path: Đường dẫn tương đối của file CSV
+
+        Returns:
+            FiringTableInterpolator hoặc None nếu file thiếu/lỗi
+        """
+        full_path = resource_path(csv_path)
+        mtime = self._mtime(full_path)
+        entry = self._tables.get(full_path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        with self._lock:
+            entry = self._tables.get(full_path)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+            if entry is not None:
+                print(f"Bảng bắn {csv_path} đã thay đổi, đọc lại")
+            interpolator = load_firing_table(csv_path) if mtime is not None else None
+            if mtime is None and entry is None:
+                print(f"Không tìm thấy file {csv_path}")
+            if interpolator is not None and FiringTableDefaults.ELEVATION_LUT:
+                interpolator.compile_angle_lut(FiringTableDefaults.ELEVATION_LUT_STEP_M)
+            if interpolator is not None and interpolator.has_angle_lut and FiringTableDefaults.LUT_ERROR_REPORT:
+                report = interpolator.angle_lut_error_report()
+                print(f"Đã dựng LUT góc tầm cho {csv_path}: {report.size} điểm, bước {report.step:g} m, "
+                      f"sai số tối đa {report.max_abs_error:.3g} ly giác tại {report.max_error_range:.1f} m")
+            self._tables[full_path] = (mtime, interpolator)
+            return interpolator
+
+    def invalidate(self, csv_path: Optional[str] = None):
+        """Bỏ cache của một bảng (hoặc tất cả) để lần tra sau đọc lại file."""
+        with self._lock:
+            if csv_path is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(resource_path(csv_path), None)
+
+
+# Registry global để dùng chung
+firing_table_registry = FiringTableRegistry()
+
+
+def get_firing_table_interpolator():
+    """Lấy interpolator bảng bắn thấp (mặc định)."""
+    return firing_table_registry.get(Paths.FIRING_TABLE_LOW)
+
+
+def get_high_firing_table_interpolator():
+    """Lấy interpolator bảng bắn cao."""
+    return firing_table_registry.get(Paths.FIRING_TABLE_HIGH)
+
+
+class SlopeCorrection2DTable:
+    """Bảng tra 2D cho lượng sửa chênh tà (P).
+    
+    Tra cứu dựa trên:
+    - Góc tà (góc tạ mục tiêu) - theo hàng
+    - Ly giác hiện tại (góc tầm) - theo cột
+
+    Bảng được biên dịch một lần thành lưới NumPy (ô `null` là NaN) với hai
+    trục tăng dần; lookup/interpolate nhận số vô hướng hoặc mảng (ví dụ cả hai
+    bệ phóng cùng lúc) và không dùng pandas/SciPy khi tra.
+    """
+
+    # Cách xử lý điểm nằm ngoài dải của bảng
+    OUT_OF_RANGE_CLAMP = 'clamp'  # Giữ giá trị ở biên bảng
+    OUT_OF_RANGE_NAN = 'nan'      # Trả về NaN
+    
+    def __init__(self, df: 'pandas.DataFrame'):
+        """
+        Khởi tạo bảng tra 2D.
+        
+        Args:
+            df: DataFrame với cột đầu tiên là góc tà, các cột còn lại là ly giác
+        """
+        import pandas as pd
+
+        self.df = df
+        
+        # Lấy tên cột đầu tiên làm index (góc tà)
+        self.slope_angle_col = df.columns[0]
+        
+        # Các cột còn lại là ly giác (góc tầm)
+        self.elevation_cols = [col for col in df.columns if col != self.slope_angle_col]
+        
+        # Chuyển các tên cột ly giác thành số
+        try:
+            elevation_values = np.array([float(col) for col in self.elevation_cols])
+        except ValueError:
+            raise ValueError("Tên cột phải là số (ly giác)")
+        
+        # Lấy các giá trị góc tà
+        slope_angles = df[self.slope_angle_col].values.astype(np.float64)
+        grid = df[self.elevation_cols].apply(pd.to_numeric, errors='coerce').values.astype(np.float64)
+
+        self._compile(slope_angles, elevation_values, grid)
+        
+        print(f"Đã load bảng tra 2D: {len(self.slope_angles)} góc tà × {len(self.elevation_values)} ly giác")
+
+    @classmethod
+    def from_arrays(cls, slope_angles: np.ndarray, elevation_values: np.ndarray,
+                    grid: np.ndarray) -> 'SlopeCorrection2DTable':
+        """Tạo bảng từ lưới đã biên dịch (ví dụ từ cache), không cần DataFrame."""
+        table = cls.__new__(cls)
+        table.df = None
+        table.slope_angle_col = None
+        table.elevation_cols = [f"{value:g}" for value in elevation_values]
+        table._compile(np.asarray(slope_angles, dtype=np.float64),
+                       np.asarray(elevation_values, dtype=np.float64),
+                       np.asarray(grid, dtype=np.float64))
+        return table
+
+    def _compile(self, slope_angles: np.ndarray, elevation_values: np.ndarray, grid: np.ndarray):
+        """Sắp xếp hai trục tăng dần và lưu lưới giá trị (NaN = ô trống)."""
+        if grid.shape != (len(slope_angles), len(elevation_values)):
+            raise ValueError("Kích thước lưới không khớp với trục góc tà/ly giác")
+        if len(slope_angles) == 0 or len(elevation_values) == 0:
+            raise ValueError("Bảng tra chênh tà không có dữ liệu")
+        row_order = np.argsort(slope_angles, kind='stable')
+        col_order = np.argsort(elevation_values, kind='stable')
+        self.slope_angles = slope_angles[row_order]
+        self.elevation_values = elevation_values[col_order]
+        self.grid = np.ascontiguousarray(grid[np.ix_(row_order, col_order)])
+        self.valid_mask = ~np.isnan(self.grid)
+
+    @staticmethod
+    def _nearest_index(axis: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Chỉ số phần tử gần nhất trên trục tăng dần (hòa thì lấy phần tử nhỏ hơn)."""
+        if len(axis) == 1:
+            return np.zeros(values.shape, dtype=np.intp)
+        upper = np.clip(np.searchsorted(axis, values), 1, len(axis) - 1)
+        lower = upper - 1
+        take_lower = np.abs(values - axis[lower]) <= np.abs(axis[upper] - values)
+        return np.where(take_lower, lower, upper)
+
+    @staticmethod
+    def _bracket(axis: np.ndarray, values: np.ndarray):
+        """Chỉ số ô chứa và trọng số tuyến tính trên một trục.
+
+        Returns:
+            (index, weight, outside): ô [index, index + 1], trọng số của điểm
+            index + 1 và mặt nạ các giá trị nằm ngoài trục
+        """
+        outside = (values < axis[0]) | (values > axis[-1])
+        if len(axis) == 1:
+            zeros = np.zeros(values.shape)
+            return np.zeros(values.shape, dtype=np.intp), zeros, outside
+        clamped = np.clip(values, axis[0], axis[-1])
+        index = np.clip(np.searchsorted(axis, clamped, side='right') - 1, 0, len(axis) - 2)
+        weight = (clamped - axis[index]) / (axis[index + 1] - axis[index])
+        return index, weight, outside
+
+    @staticmethod
+    def _result(values: np.ndarray, scalar: bool):
+        return float(values) if scalar else values
+    
+    def lookup(self, slope_angle, current_elevation_mils):
+        """
+        Tra cứu giá trị P (chênh tà) tại ô gần nhất của bảng 2D.
+        
+        Args:
+            slope_angle: Góc tà mục tiêu (độ), số hoặc mảng
+            current_elevation_mils: Ly giác hiện tại (ly giác), số hoặc mảng
+            
+        Returns:
+            Giá trị P (chênh tà) - đơn vị ly giác; NaN nếu ô gần nhất trống.
+            Số vô hướng nếu cả hai đầu vào là số, ngược lại mảng (broadcast).
+        """
+        slope, elevation = np.broadcast_arrays(np.asarray(slope_angle, dtype=np.float64),
+                                               np.asarray(current_elevation_mils, dtype=np.float64))
+        scalar = slope.ndim == 0
+        rows = self._nearest_index(self.slope_angles, slope)
+        cols = self._nearest_index(self.elevation_values, elevation)
+        return self._result(self.grid[rows, cols], scalar)
+    
+    def interpolate(self, slope_angle, current_elevation_mils, out_of_range: str = OUT_OF_RANGE_CLAMP):
+        """
+        Nội suy song tuyến giá trị P (chênh tà) từ bảng.
+        
+        Args:
+            slope_angle: Góc tà mục tiêu (độ), số hoặc mảng
+            current_elevation_mils: Ly giác hiện tại (ly giác), số hoặc mảng
+            out_of_range: OUT_OF_RANGE_CLAMP (giữ giá trị biên) hoặc
+                OUT_OF_RANGE_NAN (trả NaN ngoài dải bảng)
+            
+        Returns:
+            Giá trị P (chênh tà) nội suy - đơn vị ly giác. NaN nếu một ô góc
+            có trọng số khác 0 là ô trống. Số vô hướng nếu cả hai đầu vào là
+            số, ngược lại mảng (broadcast).
+        """
+        if out_of_range not in (self.OUT_OF_RANGE_CLAMP, self.OUT_OF_RANGE_NAN):
+            raise ValueError(f"Chế độ ngoài dải không hợp lệ: {out_of_range}")
+        slope, elevation = np.broadcast_arrays(np.asarray(slope_angle, dtype=np.float64),
+                                               np.asarray(current_elevation_mils, dtype=np.float64))
+        scalar = slope.ndim == 0
+        row, row_weight, row_outside = self._bracket(self.slope_angles, slope)
+        col, col_weight, col_outside = self._bracket(self.elevation_values, elevation)
+
+        grid = self.grid
+        row_next = np.minimum(row + 1, len(self.slope_angles) - 1)
+        col_next = np.minimum(col + 1, len(self.elevation_values) - 1)
+        result = np.zeros(slope.shape)
+        # Chỉ cộng các ô góc có trọng số > 0 để ô trống bên cạnh một điểm
+        # nằm đúng trên lưới không làm hỏng kết quả
+        for rows, r_weight in ((row, 1.0 - row_weight), (row_next, row_weight)):
+            for cols, c_weight in ((col, 1.0 - col_weight), (col_next, col_weight)):
+                weight = r_weight * c_weight
+                result = result + np.where(weight > 0, grid[rows, cols] * weight, 0.0)
+
+        if out_of_range == self.OUT_OF_RANGE_NAN:
+            result = np.where(row_outside | col_outside, np.nan, result)
+        return self._result(result, scalar)
+
+
+def _parse_slope_table_csv(full_path: str) -> SlopeCorrection2DTable:
+    import pandas as pd
+
+    df = pd.read_csv(full_path)
+    if len(df.columns) < 2:
+        raise ValueError("File CSV phải có ít nhất 2 cột (góc tà + ly giác)")
+    return SlopeCorrection2DTable(df)
+
+
+def _slope_table_arrays(table: SlopeCorrection2DTable) -> Dict[str, np.ndarray]:
+    return {'slope_angles': table.slope_angles, 'elevation_values': table.elevation_values, 'grid': table.grid}
+
+
+def _slope_table_from_arrays(arrays: Dict[str, np.ndarray]) -> SlopeCorrection2DTable:
+    return SlopeCorrection2DTable.from_arrays(arrays['slope_angles'], arrays['elevation_values'], arrays['grid'])
+
+
+def load_slope_correction_table(csv_path: str = Paths.SLOPE_CORRECTION_TABLE, use_cache: bool = True):
+    """Đọc bảng tra chênh tà (từ cache .npz nếu còn mới, ngược lại từ file CSV).
+    
+    Args:
+        csv_path: Đường dẫn đến file CSV (mặc định: "table2.csv")
+        use_cache: Dùng/ghi cache nhị phân (False = luôn đọc CSV)
+        
+    Returns:
+        SlopeCorrection2DTable instance hoặc None nếu lỗi
+    """
+    try:
+        table = _load_table(csv_path, 'slope_correction', _parse_slope_table_csv,
+                            _slope_table_arrays, _slope_table_from_arrays, use_cache)
+        print(f"Đã đọc bảng tra chênh tà từ {csv_path}")
+        return table
+        
+    except FileNotFoundError:
+        print(f"Không tìm thấy file {csv_path}")
+        return None
+    except Exception as e:
+        print(f"Lỗi đọc file CSV: {e}")
+        return None
+
+
+def build_table_caches(csv_paths: Optional[List[str]] = None) -> Dict[str, bool]:
+    """Biên dịch lại cache .npz cho các bảng (bước build/đóng gói).
+
+    Args:
+        csv_paths: Các bảng cần biên dịch (None = bảng bắn thấp, cao và bảng chênh tà)
+
+    Returns:
+        {csv_path: True nếu đã ghi cache}
+    """
+    loaders = {
+        Paths.FIRING_TABLE_LOW: (_parse_firing_table_csv, _firing_table_arrays, 'firing_table'),
+        Paths.FIRING_TABLE_HIGH: (_parse_firing_table_csv, _firing_table_arrays, 'firing_table'),
+        Paths.SLOPE_CORRECTION_TABLE: (_parse_slope_table_csv, _slope_table_arrays, 'slope_correction'),
+    }
+    results = {}
+    for csv_path in csv_paths or list(loaders):
+        # Bảng khác (ví dụ bảng bắn của liều khác) có cùng định dạng bảng bắn
+        parse_csv, to_arrays, kind = loaders.get(csv_path, loaders[Paths.FIRING_TABLE_LOW])
+        try:
+            full_path = resource_path(csv_path)
+            checksum = _file_checksum(full_path)
+            results[csv_path] = _write_table_cache(csv_path, kind, checksum, **to_arrays(parse_csv(full_path)))
+        except Exception as e:
+            print(f"Lỗi biên dịch cache cho {csv_path}: {e}")
+            results[csv_path] = False
+    return results
+
+
+# Khởi tạo bảng tra chênh tà global
+_slope_correction_table = None
+
+
+def get_slope_correction_table():
+    """Lấy hoặc tạo bảng tra chênh tà singleton."""
+    global _slope_correction_table
+    if _slope_correction_table is None:
+        _slope_correction_table = load_slope_correction_table()
+    return _slope_correction_table
+
+
+# ----------------------------------------------------------------------
+# Giải pháp bắn
+# ----------------------------------------------------------------------
+class Point2D:
+    """Lớp biểu diễn điểm trong không gian 2D."""
+    
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+    
+    def distance(self, other: 'Point2D') -> float:
+        """Tính khoảng cách đến một điểm khác."""
+        return math.sqrt((self.x - other.x)**2 + (self.y - other.y)**2)
+    
+    def __str__(self) -> str:
+        return f"({self.x:.2f}, {self.y:.2f})"
+
+
+class Ship:
+    def __init__(self, length: float = 30, width: float = 10):
+        self.length = length
+        self.width = width
+        
+        # Quang điện tử (điểm A) 
+        self.optoelectronic = Point2D(width/4, 0)
+        
+        # Pháo B và C 
+        self.cannon_1 = Point2D(-width/2, length/4)  # Pháo bên trái (B)
+        self.cannon_2 = Point2D(width/2, length/4)   # Pháo bên phải (C)
+    
+    def get_optoelectronic(self) -> Point2D:
+        """Trả về vị trí của quang điện tử."""
+        return self.optoelectronic
+    
+    def get_cannons(self) -> List[tuple]:
+        """Trả về vị trí của các khẩu pháo."""
+        return [("cannon_1", self.cannon_1), ("cannon_2", self.cannon_2)]
+
+    def get_launcher_positions(self) -> Tuple[Tuple[str, ...], np.ndarray]:
+        """Tên và tọa độ các bệ phóng dạng mảng (N, 2) cột x, y."""
+        cannons = self.get_cannons()
+        names = tuple(name for name, _ in cannons)
+        positions = np.array([(pos.x, pos.y) for _, pos in cannons], dtype=np.float64)
+        return names, positions
+
+
+class FiringSolutionBatch(NamedTuple):
+    """Giải pháp bắn cho nhiều mục tiêu × nhiều bệ phóng.
+
+    Mảng giải pháp có dạng (số mục tiêu, số bệ phóng), cột theo thứ tự `launchers`.
+    """
+    launchers: Tuple[str, ...]
+    target_x: np.ndarray    # (n,) tọa độ mục tiêu trong hệ tàu
+    target_y: np.ndarray    # (n,)
+    distance: np.ndarray    # (n, m) khoảng cách bệ phóng → mục tiêu
+    azimuth: np.ndarray     # (n, m) góc hướng (độ, -180..180)
+    elevation: np.ndarray   # (n, m) góc tầm từ bảng bắn (độ)
+
+    def for_launcher(self, name: str) -> dict:
+        """Các cột của một bệ phóng: {'distance', 'azimuth', 'elevation'}."""
+        column = self.launchers.index(name)
+        return {
+            'distance': self.distance[:, column],
+            'azimuth': self.azimuth[:, column],
+            'elevation': self.elevation[:, column],
+        }
+
+
+class TargetingSystem:
+    """Hệ thống nhắm mục tiêu tính toán giải pháp bắn.
+
+    Nếu không truyền interpolator, góc tầm được nội suy từ bảng bắn thấp dùng
+    chung trong firing_table_registry (tự cập nhật khi file thay đổi).
+    """
+
+    def __init__(self, ship: Ship, interpolator: Optional[FiringTableInterpolator] = None):
+        self.ship = ship
+        self._interpolator = interpolator
+
+    @property
+    def interpolator(self) -> Optional[FiringTableInterpolator]:
+        if self._interpolator is not None:
+            return self._interpolator
+        return get_firing_table_interpolator()
+
+    def calculate_target_position(self, distance_optoelectronic: float, azimuth_optoelectronic_deg: float) -> Point2D:
+        """Tính toán vị trí mục tiêu dựa trên dữ liệu từ quang điện tử."""
+        # Chuyển góc hướng từ độ sang radian
+        azimuth_rad = math.radians(azimuth_optoelectronic_deg)
+        
+        # Lấy vị trí của quang điện tử
+        optoelectronic_pos = self.ship.get_optoelectronic()
+        
+        # Tính toán tọa độ x, y của mục tiêu
+        target_x = optoelectronic_pos.x + distance_optoelectronic * math.sin(azimuth_rad)
+        target_y = optoelectronic_pos.y + distance_optoelectronic * math.cos(azimuth_rad)
+        
+        return Point2D(target_x, target_y)
+
+    def calculate_firing_solutions(self, target_position: Point2D) -> dict:
+        """Tính toán giải pháp bắn cho từng khẩu pháo.
+
+        Góc tầm là NaN nếu không có bảng bắn.
+        """
+        solutions = {}
+        interpolator = self.interpolator
+        
+        for cannon_name, cannon_pos in self.ship.get_cannons():
+            # Tính khoảng cách từ pháo đến mục tiêu
+            distance_to_target = cannon_pos.distance(target_position)
+            
+            # Tính góc hướng của mục tiêu so với pháo
+            delta_x = target_position.x - cannon_pos.x
+            delta_y = target_position.y - cannon_pos.y
+            
+            # Tính góc bằng atan2 để xử lý đúng các góc phần tư
+            azimuth_rad = math.atan2(delta_x, delta_y)
+            azimuth_deg = math.degrees(azimuth_rad)
+            
+            # Đảm bảo góc hướng nằm trong khoảng -180 đến 180 độ
+            if azimuth_deg > 180:
+                azimuth_deg -= 360
+            elif azimuth_deg < -180:
+                azimuth_deg += 360
+            
+            # Nội suy góc tầm từ bảng bắn
+            if interpolator is not None:
+                elevation_angle_deg = interpolator.interpolate_angle(distance_to_target)
+            else:
+                elevation_angle_deg = math.nan
+            
+            # Chuyển đổi sang float tiêu chuẩn của Python
+            solutions[f"{cannon_name}_distance"] = float(distance_to_target)
+            solutions[f"{cannon_name}_azimuth"] = float(azimuth_deg)
+            solutions[f"{cannon_name}_elevation"] = float(elevation_angle_deg)
+            
+        return solutions
+
+    def calculate_target_positions(self, distances, azimuths_deg) -> Tuple[np.ndarray, np.ndarray]:
+        """Vị trí (x, y) của nhiều mục tiêu từ mảng quan sát của quang điện tử."""
+        distances = np.asarray(distances, dtype=np.float64)
+        azimuth_rad = np.radians(np.asarray(azimuths_deg, dtype=np.float64))
+        optoelectronic_pos = self.ship.get_optoelectronic()
+        target_x = optoelectronic_pos.x + distances * np.sin(azimuth_rad)
+        target_y = optoelectronic_pos.y + distances * np.cos(azimuth_rad)
+        return target_x, target_y
+
+    def solve_positions(self, target_x, target_y) -> FiringSolutionBatch:
+        """Giải pháp bắn cho mọi bệ phóng với nhiều vị trí mục tiêu trong một lần tính."""
+        target_x = np.atleast_1d(np.asarray(target_x, dtype=np.float64))
+        target_y = np.atleast_1d(np.asarray(target_y, dtype=np.float64))
+        launchers, positions = self.ship.get_launcher_positions()
+
+        delta_x = target_x[:, None] - positions[:, 0]
+        delta_y = target_y[:, None] - positions[:, 1]
+        distance = np.hypot(delta_x, delta_y)
+        # atan2 đã cho góc trong khoảng -180..180 độ
+        azimuth = np.degrees(np.arctan2(delta_x, delta_y))
+        interpolator = self.interpolator
+        if interpolator is not None:
+            elevation = interpolator.interpolate_angles(distance)
+        else:
+            elevation = np.full(distance.shape, np.nan)
+
+        return FiringSolutionBatch(launchers, target_x, target_y, distance, azimuth, elevation)
+
+    def solve(self, distances, azimuths_deg) -> FiringSolutionBatch:
+        """Giải pháp bắn cho nhiều quan sát (khoảng cách, hướng) của quang điện tử.
+
+        Args:
+            distances: Mảng khoảng cách từ quang điện tử (m)
+            azimuths_deg: Mảng góc hướng từ quang điện tử (độ)
+
+        Returns:
+            FiringSolutionBatch với mảng (số quan sát, số bệ phóng)
+        """
+        target_x, target_y = self.calculate_target_positions(distances, azimuths_deg)
+        return self.solve_positions(target_x, target_y)
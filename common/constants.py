@@ -34,6 +34,79 @@ BACKUP_RETENTION_LIMIT = 50
 CAN_BITRATE = 500000
 CAN_CHANNEL = 'can0'
 
+# Log Sink Constants
+class LogSinkDefaults:
+    """Default settings for the asynchronous log sink."""
+
+    QUEUE_MAXLEN = 10000            # Records buffered between producers and the GUI
+    FLUSH_INTERVAL_MS = 100         # GUI drain cadence
+    MAX_BATCH = 500                 # Records rendered per GUI flush
+    VIEW_MAX_RECORDS = 50000        # Records retained by the event log view
+    SOURCE_RATE_LIMIT = 200         # Records per second per source (0 = unlimited)
+    MODULE_DATA_SAMPLE_EVERY = 10   # Keep 1 of N INFO records per module CAN ID
+    CONSOLE_LEVELS = ("ERROR", "WARNING")
+
+class JournalDefaults:
+    """Default settings for the on-disk event journal."""
+
+    DIRECTORY = "journal"           # Relative to the application directory
+    FLUSH_INTERVAL_S = 1.0          # Batch commit (and fsync) cadence
+    MAX_SEGMENT_BYTES = 64 * 1024 * 1024  # Rotate to a new segment file past this size
+    MAX_SEGMENTS = 64               # Oldest segments are deleted beyond this count
+    QUEUE_MAXLEN = 200000           # Entries buffered between producers and the writer
+    PAGE_SIZE = 200                 # Rows per search page
+    TEXT_SEARCH_WINDOW_S = 6 * 3600  # Free-text searches without from: look back this far
+    RECORD_CAN_FRAMES = True        # Journal every received CAN frame
+    MODULE_FRAME_SAMPLE_EVERY = 1   # Opt-in: keep 1 of N module telemetry frames per CAN ID
+    CAN_FRAME_SAMPLE_EVERY = {}     # Opt-in per-ID overrides {can_id: N}; 1 = keep all, 0 = none
+    # Retention: a journaled CAN frame costs ~140 bytes on disk including the four
+    # indexes, so the 4 GB budget above (MAX_SEGMENTS x MAX_SEGMENT_BYTES) holds
+    # ~2 h of a saturated 500 kbit/s bus (~4000 frames/s) with the keep-all
+    # default, and several days only below ~100 frames/s. Raise MAX_SEGMENTS to
+    # keep more; sampling module telemetry 1/10 stretches a saturated bus to
+    # ~9 h at the cost of no longer having every frame on disk.
+
+class TelemetryDefaults:
+    """Default settings for the columnar telemetry history store."""
+
+    HISTORY_CAPACITY = 1000         # Samples kept per module
+    INITIAL_SLOTS = 128             # Preallocated module rows; keep above nodes x modules (grows by doubling)
+
+class FiringTableDefaults:
+    """Default settings for firing-table lookups."""
+
+    ELEVATION_LUT = True            # Compile a dense elevation LUT when a table is loaded
+    ELEVATION_LUT_STEP_M = 1.0      # Range step of the LUT (m)
+    LUT_CHECK_SAMPLES_PER_STEP = 8  # Error-report sampling density against np.interp
+    LUT_ERROR_REPORT = False        # Check the LUT against np.interp (and print it) on every load
+    BINARY_CACHE = True             # Load tables from the precompiled .npz cache when it is fresh
+    BINARY_CACHE_WRITE = True       # Rewrite the cache after parsing a changed CSV
+    BINARY_CACHE_SUFFIX = '.npz'    # Cache file sits next to the CSV with this extension
+
+class IconCacheDefaults:
+    """Default settings for the process-wide colored SVG icon cache."""
+
+    MAX_ENTRIES = 64                # Rendered icons kept, least recently used evicted first
+
+class AssetCacheDefaults:
+    """Default settings for the shared pixmap asset cache."""
+
+    PIXMAP_CACHE_LIMIT_KB = 32 * 1024   # QPixmapCache budget for scaled/tinted variants
+    PRELOAD = True                      # Decode the preload directories on a background thread
+    PRELOAD_DIRECTORIES = ('assets/image', 'assets/Icons')
+    PRELOAD_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.svg')
+
+class LatencyTraceDefaults:
+    """Default settings for end-to-end latency tracing."""
+
+    ENABLED = True                  # Record stage latencies on the frame and command paths
+    MIN_LATENCY_S = 1e-6            # Lower edge of the first histogram bucket
+    MAX_LATENCY_S = 100.0           # Upper edge of the last bucket (larger values are clamped)
+    BUCKETS_PER_DECADE = 40         # Log-spaced buckets, ~6% relative resolution
+    MAX_FRAME_AGE_S = 60.0          # Frame timestamps older than this come from another clock
+    PANEL_REFRESH_MS = 1000         # Diagnostics panel refresh cadence
+    DUMP_FILE = 'latency_trace.json'  # Default JSON dump path (relative to the working directory)
+
 # Color Constants
 class Colors:
     """Common color values used throughout the application."""
@@ -70,7 +143,11 @@ class Paths:
     CUSTOM_CONFIG_FILE = 'system_config_custom.json'
     ASSETS_DIR = 'assets'
     ICONS_DIR = 'assets/Icons'
+    IMAGES_DIR = 'assets/image'
     VIETNAM_FLAG_ICON = 'assets/Icons/Vietnam.png'
+    FIRING_TABLE_LOW = 'table1.csv'
+    FIRING_TABLE_HIGH = 'table1_high.csv'
+    SLOPE_CORRECTION_TABLE = 'table2.csv'
 
 # System Configuration Constants
 class SystemLimits:
@@ -110,6 +187,9 @@ class WeaponSystem:
     DEFAULT_DISTANCE = 0
     DEFAULT_SHIP_DIRECTION = 30  # degrees from North
 
+    # Firing tables
+    HIGH_TABLE_MIN_DISTANCE = 9100  # High-angle table is only valid from this range (m)
+
 # Font Constants
 class Fonts:
     """Font specifications."""
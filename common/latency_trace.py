@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+End-to-end latency tracing.
+
+Đo độ trễ theo từng chặng trên hai đường:
+
+- Đường frame: msg.timestamp → giải mã xong → ghi state_store xong → GUI
+  nhận stateChanged → widget vẽ xong. Mọi chặng đều tính từ msg.timestamp
+  (đồng hồ time.time() như timestamp của python-can), nên giá trị của chặng
+  cuối chính là độ trễ từ frame tới điểm ảnh.
+- Đường lệnh: click xác nhận trên GUI → bus.send() trả về.
+
+Mỗi thread ghi vào histogram riêng của mình (threading.local), không lấy
+lock khi ghi; lock chỉ dùng khi một thread đăng ký buffer lần đầu và khi đọc
+gộp. Module này không dùng Qt (xem LatencyDiagnosticsWidget cho phần hiển thị).
+"""
+
+import functools
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from common.constants import LatencyTraceDefaults
+
+# Chặng trên đường frame (tính từ msg.timestamp)
+STAGE_FRAME_DECODE = "frame.decode"        # Handler giải mã xong
+STAGE_FRAME_STATE = "frame.state"          # state_store.update() xong
+STAGE_FRAME_DISPATCH = "frame.dispatch"    # GUI thread nhận stateChanged
+STAGE_FRAME_PAINT = "frame.paint"          # paintEvent của widget hiển thị kết thúc
+
+# Chặng trên đường lệnh
+STAGE_CMD_SEND = "cmd.send"                # Thời gian nằm trong bus.send()
+STAGE_CMD_CLICK_TO_SEND = "cmd.click_to_send"  # Click xác nhận → bus.send() trả về
+
+STAGES = (
+    STAGE_FRAME_DECODE, STAGE_FRAME_STATE, STAGE_FRAME_DISPATCH, STAGE_FRAME_PAINT,
+    STAGE_CMD_SEND, STAGE_CMD_CLICK_TO_SEND,
+)
+
+STAGE_DESCRIPTIONS = {
+    STAGE_FRAME_DECODE: "Frame → giải mã",
+    STAGE_FRAME_STATE: "Frame → ghi trạng thái",
+    STAGE_FRAME_DISPATCH: "Frame → GUI nhận sự kiện",
+    STAGE_FRAME_PAINT: "Frame → vẽ xong",
+    STAGE_CMD_SEND: "bus.send()",
+    STAGE_CMD_CLICK_TO_SEND: "Click → bus.send() trả về",
+}
+
+
+class LatencyHistogram:
+    """Histogram độ trễ với bucket chia theo thang log.
+
+    Bucket 0 chứa các giá trị <= MIN_LATENCY_S, bucket cuối chứa các giá trị
+    >= MAX_LATENCY_S; count/sum/min/max được giữ chính xác.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'minimum', 'maximum')
+
+    MIN_S = LatencyTraceDefaults.MIN_LATENCY_S
+    PER_DECADE = LatencyTraceDefaults.BUCKETS_PER_DECADE
+    SIZE = int(math.ceil(math.log10(LatencyTraceDefaults.MAX_LATENCY_S / MIN_S) * PER_DECADE)) + 2
+    _SCALE = PER_DECADE / math.log(10.0)
+
+    def __init__(self):
+        self.counts = [0] * self.SIZE
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+
+    @classmethod
+    def bucket(cls, seconds: float) -> int:
+        if seconds <= cls.MIN_S:
+            return 0
+        return min(cls.SIZE - 1, int(math.log(seconds / cls.MIN_S) * cls._SCALE) + 1)
+
+    @classmethod
+    def upper_bound(cls, index: int) -> float:
+        """Cận trên (giây) của bucket."""
+        return cls.MIN_S * 10.0 ** (index / cls.PER_DECADE)
+
+    def add(self, seconds: float):
+        self.counts[self.bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.minimum:
+            self.minimum = seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def merge(self, other: 'LatencyHistogram'):
+        counts = self.counts
+        for index, value in enumerate(other.counts):
+            if value:
+                counts[index] += value
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Phân vị p (0-100) theo giây, sai số tương đối bằng độ rộng một bucket."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(p / 100.0 * self.count))
+        seen = 0
+        for index, value in enumerate(self.counts):
+            seen += value
+            if seen >= rank:
+                return min(max(self.upper_bound(index), self.minimum), self.maximum)
+        return self.maximum
+
+    def summary(self) -> dict:
+        """Thống kê (ms) dùng cho bảng chẩn đoán và file JSON."""
+        if not self.count:
+            return {'count': 0}
+
+        def ms(value):
+            return value * 1000.0 if value is not None else None
+
+        return {
+            'count': self.count,
+            'mean_ms': ms(self.total / self.count),
+            'min_ms': ms(self.minimum),
+            'p50_ms': ms(self.percentile(50)),
+            'p90_ms': ms(self.percentile(90)),
+            'p99_ms': ms(self.percentile(99)),
+            'max_ms': ms(self.maximum),
+        }
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """Các bucket khác rỗng: (cận trên ms, số mẫu)."""
+        return [(self.upper_bound(index) * 1000.0, value)
+                for index, value in enumerate(self.counts) if value]
+
+
+class LatencyTracer:
+    """Ghi độ trễ theo chặng vào buffer riêng của từng thread."""
+
+    def __init__(self, enabled: bool = LatencyTraceDefaults.ENABLED,
+                 max_frame_age: float = LatencyTraceDefaults.MAX_FRAME_AGE_S):
+        self.enabled = enabled
+        self.max_frame_age = max_frame_age
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._buffers: List[Tuple[str, Dict[str, LatencyHistogram]]] = []
+        self._frame_origins: Dict[str, float] = {}   # nhóm trạng thái → msg.timestamp
+        self._paint_origins: Dict[int, float] = {}   # id(widget) → msg.timestamp
+        self._started = time.time()
+
+    # ------------------------------------------------------------------
+    # Ghi (thread bất kỳ, không lock)
+    # ------------------------------------------------------------------
+    def _histograms(self) -> Dict[str, LatencyHistogram]:
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            histograms = {}
+            with self._lock:
+                self._buffers.append((threading.current_thread().name, histograms))
+                local.generation = self._generation
+            local.histograms = histograms
+        return local.histograms
+
+    def record(self, stage: str, seconds: float):
+        """Ghi một mẫu độ trễ (giây) cho chặng."""
+        if not self.enabled or seconds < 0:
+            return
+        histograms = self._histograms()
+        histogram = histograms.get(stage)
+        if histogram is None:
+            histogram = histograms[stage] = LatencyHistogram()
+        histogram.add(seconds)
+
+    def _record_since(self, stage: str, timestamp: float, now: float = None) -> bool:
+        if not timestamp:
+            return False
+        delay = (now if now is not None else time.time()) - timestamp
+        # Timestamp phần cứng có thể theo đồng hồ khác (tính từ lúc bật máy, ...)
+        if delay < 0 or delay > self.max_frame_age:
+            return False
+        self.record(stage, delay)
+        return True
+
+    # ------------------------------------------------------------------
+    # Đường frame
+    # ------------------------------------------------------------------
+    def frame_decoded(self, timestamp: float):
+        """Handler đã giải mã xong frame có msg.timestamp = timestamp."""
+        if self.enabled:
+            self._record_since(STAGE_FRAME_DECODE, timestamp)
+
+    def frame_stored(self, timestamp: float, groups: Iterable[str]):
+        """Giá trị giải mã từ frame đã được ghi vào các nhóm trạng thái.
+
+        Chỉ gọi khi state_store.update() báo có nhóm thay đổi; frame không làm
+        đổi gì không bao giờ tới được điểm ảnh.
+        """
+        if self.enabled and groups and self._record_since(STAGE_FRAME_STATE, timestamp):
+            for group in groups:
+                # Giữ frame mới nhất: frame cũ hơn đã bị ghi đè, không được vẽ
+                self._frame_origins[group] = timestamp
+
+    def frame_dispatched(self, groups: FrozenSet[str]) -> Dict[str, float]:
+        """GUI thread nhận stateChanged; trả về msg.timestamp theo nhóm."""
+        if not self.enabled:
+            return {}
+        now = time.time()
+        origins = {}
+        for group in groups:
+            timestamp = self._frame_origins.pop(group, None)
+            if timestamp is not None and self._record_since(STAGE_FRAME_DISPATCH, timestamp, now):
+                origins[group] = timestamp
+        return origins
+
+    def expect_paint(self, widget, timestamp: float):
+        """Lần vẽ kế tiếp của widget sẽ hiển thị frame có msg.timestamp này.
+
+        Nếu widget chưa vẽ kể từ lần báo trước thì giữ frame cũ hơn, vì đó là
+        frame đã chờ điểm ảnh lâu nhất.
+        """
+        if self.enabled:
+            self._paint_origins.setdefault(id(widget), timestamp)
+
+    def paint_done(self, widget):
+        """Gọi ở cuối paintEvent của widget hiển thị."""
+        if self._paint_origins:
+            timestamp = self._paint_origins.pop(id(widget), None)
+            if timestamp is not None:
+                self._record_since(STAGE_FRAME_PAINT, timestamp)
+
+    # ------------------------------------------------------------------
+    # Đường lệnh
+    # ------------------------------------------------------------------
+    @contextmanager
+    def command(self):
+        """Đánh dấu thời điểm click; các lần bus.send() bên trong được đo từ đây."""
+        self._local.command_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.command_start = None
+
+    def traced_command(self, handler):
+        """Decorator cho handler click: mọi bus.send() trong handler được đo từ lúc gọi.
+
+        Handler được gọi đúng với các tham số nhận được, nên khi nối với signal
+        có tham số (clicked(bool), ...) thì nối qua lambda.
+        """
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            with self.command():
+                return handler(*args, **kwargs)
+        return wrapper
+
+    def command_sent(self, send_started: float):
+        """bus.send() vừa trả về; send_started là time.perf_counter() trước khi gửi."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.record(STAGE_CMD_SEND, now - send_started)
+        command_start = getattr(self._local, 'command_start', None)
+        if command_start is not None:
+            self.record(STAGE_CMD_CLICK_TO_SEND, now - command_start)
+
+    # ------------------------------------------------------------------
+    # Đọc
+    # ------------------------------------------------------------------
+    def per_thread(self) -> List[Tuple[str, Dict[str, LatencyHistogram]]]:
+        """Bản sao histogram của từng thread: [(tên thread, {chặng: histogram})]."""
+        with self._lock:
+            buffers = list(self._buffers)
+        result = []
+        for name, histograms in buffers:
+            copies = {}
+            for stage, histogram in list(histograms.items()):
+                copy = LatencyHistogram()
+                copy.merge(histogram)
+                copies[stage] = copy
+            result.append((name, copies))
+        return result
+
+    def merged(self) -> Dict[str, LatencyHistogram]:
+        """Histogram gộp mọi thread, theo thứ tự STAGES."""
+        merged: Dict[str, LatencyHistogram] = {}
+        for _, histograms in self.per_thread():
+            for stage, histogram in histograms.items():
+                merged.setdefault(stage, LatencyHistogram()).merge(histogram)
+        order = {stage: index for index, stage in enumerate(STAGES)}
+        return dict(sorted(merged.items(), key=lambda item: (order.get(item[0], len(order)), item[0])))
+
+    def summary(self) -> dict:
+        """Thống kê (ms) theo chặng, gộp và theo thread."""
+        threads = {}
+        for name, histograms in self.per_thread():
+            stages = threads.setdefault(name, {})
+            for stage, histogram in histograms.items():
+                if stage in stages:
+                    # Thread mới trùng tên thread cũ đã kết thúc
+                    histogram.merge(stages[stage])
+                stages[stage] = histogram
+        return {
+            'enabled': self.enabled,
+            'elapsed_s': time.time() - self._started,
+            'stages': {stage: histogram.summary() for stage, histogram in self.merged().items()},
+            'threads': {name: {stage: histogram.summary() for stage, histogram in stages.items()}
+                        for name, stages in threads.items()},
+        }
+
+    def dump(self, path: str = LatencyTraceDefaults.DUMP_FILE) -> str:
+        """Ghi thống kê và bucket khác rỗng ra file JSON."""
+        result = self.summary()
+        result['timestamp'] = time.strftime("%Y-%m-%d %H:%M:%S")
+        result['bucket_ms'] = {stage: histogram.buckets() for stage, histogram in self.merged().items()}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        return path
+
+    def reset(self):
+        """Bắt đầu kỳ đo mới; mỗi thread tự tạo buffer mới ở lần ghi kế tiếp."""
+        with self._lock:
+            self._buffers = []
+            self._generation += 1
+        self._frame_origins.clear()
+        self._paint_origins.clear()
+        self._started = time.time()
+
+
+# Global instance
+latency_tracer = LatencyTracer()
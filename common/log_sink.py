@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Asynchronous log sink.
+
+Producer threads (CAN receiver, compass reader, ...) push compact log records
+into a bounded queue without touching Qt. The GUI thread drains the queue at a
+fixed cadence and renders records in batches (see LogTab); console output is
+written by the consumer on drain, so producers never block on stdout.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from common.constants import LogSinkDefaults
+
+
+class LogRecord(NamedTuple):
+    """Một bản ghi log."""
+    timestamp: float
+    level: str
+    source: str
+    message: str
+    can_id: Optional[int] = None
+
+
+class LogSink:
+    """Hàng đợi log có giới hạn, an toàn đa luồng.
+
+    `collections.deque.append`/`popleft` là atomic nên hàng đợi giữa producer
+    và consumer không cần khóa. Bộ đếm lấy mẫu, cửa sổ giới hạn tốc độ và số
+    liệu bản ghi bị bỏ được nhiều producer cập nhật nên dùng chung một lock nhỏ.
+    Khi hàng đợi đầy, bản ghi cũ nhất bị bỏ. Bản ghi ở `console_levels` được in
+    ra console khi consumer gọi `drain`, không phải trên thread của producer.
+    """
+
+    def __init__(self, maxlen: int = LogSinkDefaults.QUEUE_MAXLEN,
+                 console_levels: Iterable[str] = LogSinkDefaults.CONSOLE_LEVELS,
+                 source_rate_limit: int = LogSinkDefaults.SOURCE_RATE_LIMIT):
+        self._queue = deque(maxlen=maxlen)
+        self._maxlen = maxlen
+        self.console_levels = set(console_levels)
+        self.default_rate_limit = source_rate_limit
+        self._rate_limits: Dict[str, int] = {}
+        # {source: [window_start, count_in_window, dropped_in_window]}
+        self._rate_windows: Dict[str, List] = {}
+        self._sample_every: Dict[int, int] = {}
+        self._sample_counters: Dict[int, int] = {}
+        self._listeners: List[Callable[[LogRecord], None]] = []
+        self._lock = threading.Lock()
+        self.dropped_overflow = 0
+        self.dropped_rate_limited = 0
+        self.dropped_sampled = 0
+
+    # ------------------------------------------------------------------
+    # Cấu hình
+    # ------------------------------------------------------------------
+    def set_console_level(self, level: str, enabled: bool = True):
+        """Bật/tắt in ra console cho một mức log."""
+        if enabled:
+            self.console_levels.add(level)
+        else:
+            self.console_levels.discard(level)
+
+    def set_rate_limit(self, source: str, max_per_second: Optional[int]):
+        """Giới hạn số bản ghi/giây cho một nguồn (None = dùng mặc định, 0 = không giới hạn)."""
+        with self._lock:
+            if max_per_second is None:
+                self._rate_limits.pop(source, None)
+            else:
+                self._rate_limits[source] = max_per_second
+
+    def set_sampling(self, can_id: int, every_n: int):
+        """Chỉ giữ 1 trên `every_n` bản ghi INFO của một CAN ID."""
+        with self._lock:
+            if every_n <= 1:
+                self._sample_every.pop(can_id, None)
+                self._sample_counters.pop(can_id, None)
+            else:
+                self._sample_every[can_id] = every_n
+
+    def set_sampling_range(self, start_id: int, end_id: int, every_n: int):
+        """Áp dụng `set_sampling` cho dải CAN ID [start_id, end_id]."""
+        for can_id in range(start_id, end_id + 1):
+            self.set_sampling(can_id, every_n)
+
+    def add_listener(self, listener: Callable[[LogRecord], None]):
+        """Đăng ký hàm nhận mọi bản ghi được emit (gọi trên thread của producer).
+
+        Listener được gọi trước khi lấy mẫu và giới hạn tốc độ, nên thấy cả
+        những bản ghi không được hiển thị (ví dụ: nhật ký trên đĩa). Listener
+        phải nhanh và không chặn (ví dụ: chỉ đưa vào hàng đợi).
+        """
+        if listener not in self._listeners:
+            self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener: Callable[[LogRecord], None]):
+        """Hủy đăng ký listener."""
+        self._listeners = [l for l in self._listeners if l is not listener]
+
+    # ------------------------------------------------------------------
+    # Producer
+    # ------------------------------------------------------------------
+    def emit(self, message: str, level: str = "INFO", source: str = "app",
+             can_id: Optional[int] = None) -> bool:
+        """Đưa một bản ghi vào hàng đợi.
+
+        Listener nhận mọi bản ghi; lấy mẫu và giới hạn tốc độ chỉ áp dụng cho
+        hàng đợi hiển thị.
+
+        Returns:
+            True nếu bản ghi được giữ lại, False nếu bị lấy mẫu/giới hạn tốc độ
+        """
+        now = time.time()
+        record = LogRecord(now, level, source, message, can_id)
+        for listener in self._listeners:
+            try:
+                listener(record)
+            except Exception as e:
+                print(f"[LogSink] Listener lỗi: {e}")
+
+        with self._lock:
+            if can_id is not None and level != "ERROR" and not self._sample(can_id):
+                self.dropped_sampled += 1
+                return False
+
+            if not self._within_rate(source, now):
+                self.dropped_rate_limited += 1
+                return False
+
+            if len(self._queue) >= self._maxlen:
+                self.dropped_overflow += 1
+        self._queue.append(record)
+        return True
+
+    def _push(self, record: LogRecord):
+        # Gọi khi đang giữ self._lock
+        if len(self._queue) >= self._maxlen:
+            self.dropped_overflow += 1
+        self._queue.append(record)
+
+    def _sample(self, can_id: int) -> bool:
+        # Gọi khi đang giữ self._lock
+        every_n = self._sample_every.get(can_id)
+        if every_n is None:
+            return True
+        count = self._sample_counters.get(can_id, 0)
+        self._sample_counters[can_id] = count + 1
+        return count % every_n == 0
+
+    def _within_rate(self, source: str, now: float) -> bool:
+        # Gọi khi đang giữ self._lock
+        limit = self._rate_limits.get(source, self.default_rate_limit)
+        if not limit:
+            return True
+
+        window = self._rate_windows.get(source)
+        if window is None:
+            self._rate_windows[source] = [now, 1, 0]
+            return True
+
+        if now - window[0] >= 1.0:
+            dropped = window[2]
+            window[0], window[1], window[2] = now, 1, 0
+            if dropped:
+                self._push(LogRecord(now, "WARNING", source,
+                                     f"Bỏ qua {dropped} log từ '{source}' do vượt giới hạn {limit}/s"))
+            return True
+
+        if window[1] < limit:
+            window[1] += 1
+            return True
+
+        window[2] += 1
+        return False
+
+    # ------------------------------------------------------------------
+    # Consumer
+    # ------------------------------------------------------------------
+    def drain(self, max_records: Optional[int] = None) -> List[LogRecord]:
+        """Lấy ra tối đa `max_records` bản ghi theo thứ tự (None = tất cả).
+
+        Bản ghi thuộc `console_levels` được in ra console tại đây, trên thread
+        của consumer.
+        """
+        records = []
+        popleft = self._queue.popleft
+        remaining = len(self._queue) if max_records is None else max_records
+        try:
+            while remaining > 0:
+                records.append(popleft())
+                remaining -= 1
+        except IndexError:
+            pass
+        console_levels = self.console_levels
+        if console_levels:
+            for record in records:
+                if record.level in console_levels:
+                    print(f"[{record.level}] {record.message}")
+        return records
+
+    def pending(self) -> int:
+        """Số bản ghi đang chờ."""
+        return len(self._queue)
+
+    def stats(self) -> Dict[str, int]:
+        """Thống kê bản ghi bị bỏ."""
+        with self._lock:
+            return {
+                'pending': len(self._queue),
+                'dropped_overflow': self.dropped_overflow,
+                'dropped_rate_limited': self.dropped_rate_limited,
+                'dropped_sampled': self.dropped_sampled,
+            }
+
+
+# Global instance
+log_sink = LogSink()
+
+
+def emit(message: str, level: str = "INFO", source: str = "app",
+         can_id: Optional[int] = None) -> bool:
+    """Ghi log qua sink toàn cục."""
+    return log_sink.emit(message, level, source, can_id)
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+Startup profiler - đo thời gian từ lúc chạy main.py tới màn hình điều khiển.
+
+Bật bằng `python main.py --profile-startup[=đường_dẫn_báo_cáo]`. Profiler gắn
+một finder ở đầu sys.meta_path để bọc loader của mọi module được import sau
+đó (thời gian tự thân và tích lũy, giống `python -X importtime`), bọc
+__init__ của các lớp được chỉ định, ghi các giai đoạn/mốc (QApplication,
+setupUi, khung hình đầu tiên) rồi ghi báo cáo văn bản.
+
+Module này chỉ dùng thư viện chuẩn để có thể được import trước mọi thứ khác.
+"""
+
+import functools
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_ARGUMENT = '--profile-startup'
+DEFAULT_REPORT_PATH = 'startup_profile.txt'
+
+
+def parse_profile_argument(argv: List[str]) -> Optional[str]:
+    """Lấy (và bỏ khỏi argv) tùy chọn --profile-startup[=file].
+
+    Returns:
+        Đường dẫn file báo cáo, hoặc None nếu không bật profile
+    """
+    for i, arg in enumerate(argv[1:], start=1):
+        if arg == PROFILE_ARGUMENT or arg.startswith(PROFILE_ARGUMENT + '='):
+            del argv[i]
+            return arg.partition('=')[2] or DEFAULT_REPORT_PATH
+    return None
+
+
+class _TimingStack(threading.local):
+    """Ngăn xếp đo lồng nhau theo từng thread: [tên, bắt đầu, thời gian con]."""
+
+    def __init__(self):
+        self.frames: List[list] = []
+
+
+class _Timings:
+    """Tổng thời gian tích lũy/tự thân theo tên, đo lồng nhau được."""
+
+    def __init__(self):
+        # {tên: [tích lũy, tự thân, số lần, tên thread]}
+        self.records: Dict[str, list] = {}
+        self._stack = _TimingStack()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, name: str):
+        frames = self._stack.frames
+        frame = [name, time.perf_counter(), 0.0]
+        frames.append(frame)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame[1]
+            frames.pop()
+            if frames:
+                frames[-1][2] += elapsed
+            with self._lock:
+                record = self.records.setdefault(name, [0.0, 0.0, 0, threading.current_thread().name])
+                record[0] += elapsed
+                record[1] += elapsed - frame[2]
+                record[2] += 1
+
+    def sorted_records(self) -> List[Tuple[str, list]]:
+        with self._lock:
+            return sorted(self.records.items(), key=lambda item: item[1][0], reverse=True)
+
+
+class _TimedLoader:
+    """Bọc loader gốc để đo thời gian tạo và thực thi module."""
+
+    def __init__(self, loader, timings: _Timings, name: str):
+        self._loader = loader
+        self._timings = timings
+        self._name = name
+
+    def create_module(self, spec):
+        create = getattr(self._loader, 'create_module', None)
+        if create is None:
+            return None
+        # Module mở rộng (.so/.pyd) được nạp ngay trong create_module
+        with self._timings.measure(self._name):
+            return create(spec)
+
+    def exec_module(self, module):
+        with self._timings.measure(self._name):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _ProfilingFinder:
+    """Meta path finder hỏi các finder còn lại rồi bọc loader của spec tìm được."""
+
+    def __init__(self, timings: _Timings):
+        self._timings = timings
+        self._searching = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._searching, 'active', False):
+            return None
+        self._searching.active = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+        finally:
+            self._searching.active = False
+
+        if spec is None or spec.loader is None or not hasattr(spec.loader, 'exec_module'):
+            return None
+        spec.loader = _TimedLoader(spec.loader, self._timings, fullname)
+        return spec
+
+
+class StartupProfiler:
+    """Thu thập thời gian import, khởi tạo lớp và các mốc khởi động."""
+
+    def __init__(self):
+        self.enabled = False
+        self.start_time = time.perf_counter()
+        self.imports = _Timings()
+        self.constructors = _Timings()
+        self.phases: List[Tuple[str, float, float]] = []   # (tên, bắt đầu, thời lượng) tính từ start_time
+        self.marks: List[Tuple[str, float]] = []           # (tên, thời điểm) tính từ start_time
+        self._finder: Optional[_ProfilingFinder] = None
+
+    def install(self):
+        """Bắt đầu đo: gắn finder đo import ở đầu sys.meta_path."""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.start_time = time.perf_counter()
+        self._finder = _ProfilingFinder(self.imports)
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        """Ngừng đo import (các số liệu đã thu vẫn được giữ)."""
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+        self.enabled = False
+
+    # ------------------------------------------------------------------
+    # Giai đoạn / mốc
+    # ------------------------------------------------------------------
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    @contextmanager
+    def phase(self, name: str):
+        """Đo một giai đoạn khởi động (không làm gì nếu profiler chưa bật)."""
+        if not self.enabled:
+            yield
+            return
+        start = self._elapsed()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start, self._elapsed() - start))
+
+    def mark(self, name: str):
+        """Ghi một mốc thời gian tính từ lúc bắt đầu đo."""
+        if self.enabled:
+            self.marks.append((name, self._elapsed()))
+
+    def profile_constructors(self, *classes):
+        """Bọc __init__ của các lớp để đo thời gian khởi tạo (tích lũy và tự thân)."""
+        if not self.enabled:
+            return
+        for cls in classes:
+            if getattr(cls.__init__, '_startup_profiled', False):
+                continue
+            cls.__init__ = self._timed_init(cls.__init__, f"{cls.__module__}.{cls.__qualname__}")
+
+    def _timed_init(self, original, name: str):
+        constructors = self.constructors
+
+        @functools.wraps(original)
+        def timed_init(instance, *args, **kwargs):
+            with constructors.measure(name):
+                original(instance, *args, **kwargs)
+
+        timed_init._startup_profiled = True
+        return timed_init
+
+    # ------------------------------------------------------------------
+    # Báo cáo
+    # ------------------------------------------------------------------
+    def format_report(self) -> str:
+        lines = [
+            f"Startup profile - {datetime.now():%Y-%m-%d %H:%M:%S}",
+            f"Thời gian từ lúc bắt đầu đo: {self._elapsed() * 1000:.1f} ms",
+            "",
+            "== Mốc ==",
+        ]
+        lines += [f"{at * 1000:10.1f} ms  {name}" for name, at in self.marks]
+
+        lines += ["", "== Giai đoạn ==", f"{'bắt đầu ms':>12} {'thời lượng ms':>14}  giai đoạn"]
+        lines += [f"{start * 1000:12.1f} {duration * 1000:14.1f}  {name}"
+                  for name, start, duration in self.phases]
+
+        lines += ["", "== Khởi tạo lớp ==", f"{'tích lũy ms':>12} {'tự thân ms':>11} {'lần':>5}  lớp"]
+        lines += [f"{total * 1000:12.1f} {own * 1000:11.1f} {count:5d}  {name}"
+                  for name, (total, own, count, _) in self.constructors.sorted_records()]
+
+        records = self.imports.sorted_records()
+        total_own = sum(record[1] for _, record in records)
+        lines += [
+            "",
+            f"== Import ({len(records)} module, tổng tự thân {total_own * 1000:.1f} ms) ==",
+            f"{'tích lũy ms':>12} {'tự thân ms':>11}  module [thread]",
+        ]
+        for name, (total, own, _, thread_name) in records:
+            thread = "" if thread_name == 'MainThread' else f" [{thread_name}]"
+            lines.append(f"{total * 1000:12.1f} {own * 1000:11.1f}  {name}{thread}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path: str = DEFAULT_REPORT_PATH) -> bool:
+        """Ghi báo cáo ra file văn bản."""
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.format_report())
+            print(f"Đã ghi báo cáo khởi động vào {path}")
+            return True
+        except OSError as e:
+            print(f"Không ghi được báo cáo khởi động {path}: {e}")
+            return False
+
+    def finish(self, mark_name: str, path: str = DEFAULT_REPORT_PATH) -> bool:
+        """Ghi mốc cuối, ngừng đo import và ghi báo cáo."""
+        self.mark(mark_name)
+        self.uninstall()
+        return self.write_report(path)
+
+
+# Global instance
+startup_profiler = StartupProfiler()
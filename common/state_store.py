@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Shared state store.
+
+Trạng thái dùng chung giữa receiver thread và GUI (góc/hướng pháo, khoảng
+cách, trạng thái ống phóng, các chế độ nhập, ...). Mỗi trường thuộc một nhóm
+và có kiểu cố định; mỗi lần ghi làm thay đổi giá trị thật sự sẽ tăng số thứ
+tự toàn cục và gán số đó cho nhóm bị thay đổi. Ghi giá trị không đổi không
+tạo sự kiện nào.
+
+Listener được gọi ngay trong thread ghi; GUI dùng StateSignalBridge
+(ui/components/state_bridge.py) để nhận sự kiện qua queued connection.
+Module này không dùng Qt.
+"""
+
+import math
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, NamedTuple, Tuple
+
+
+def flags(value) -> Tuple[bool, ...]:
+    """Kiểu của trường cờ trạng thái ống phóng: tuple bool bất biến."""
+    return tuple(bool(flag) for flag in value)
+
+
+class StateField(NamedTuple):
+    """Khai báo một trường trạng thái."""
+    name: str
+    group: str
+    kind: Callable[[Any], Any]
+
+
+class StateSnapshot(NamedTuple):
+    """Ảnh chụp nhất quán của toàn bộ trạng thái tại một số thứ tự."""
+    sequence: int
+    values: Mapping[str, Any]
+    versions: Mapping[str, int]
+
+    def __getattr__(self, name):
+        try:
+            return self.values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def _same(old, new) -> bool:
+    if old is new or old == new:
+        return True
+    # NaN (ví dụ góc tầm ngoài bảng bắn) không được coi là thay đổi mỗi lần ghi lại
+    return (isinstance(old, float) and isinstance(new, float)
+            and math.isnan(old) and math.isnan(new))
+
+
+class StateStore:
+    """Kho trạng thái có kiểu, đánh phiên bản theo nhóm trường.
+
+    Đọc một trường là một lần tra dict (atomic dưới GIL); ghi và chụp ảnh
+    dùng chung một lock nên snapshot() không bao giờ thấy một lần update()
+    nhiều trường bị ghi dở.
+    """
+
+    def __init__(self):
+        self._fields: Dict[str, StateField] = {}
+        self._values: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[FrozenSet[str], int], None]] = []
+
+    # ------------------------------------------------------------------
+    # Khai báo
+    # ------------------------------------------------------------------
+    def define(self, group: str, kind: Callable[[Any], Any], **defaults):
+        """Khai báo các trường của một nhóm cùng kiểu và giá trị mặc định.
+
+        Args:
+            group: Tên nhóm (đơn vị đánh phiên bản và gửi sự kiện)
+            kind: Hàm chuẩn hóa kiểu khi ghi (float, bool, flags, ...)
+            **defaults: Tên trường = giá trị mặc định
+        """
+        with self._lock:
+            for name, default in defaults.items():
+                if name in self._fields:
+                    raise ValueError(f"Trường trạng thái đã được khai báo: {name}")
+                self._fields[name] = StateField(name, group, kind)
+                self._values[name] = kind(default)
+            self._versions.setdefault(group, 0)
+
+    def has_field(self, name: str) -> bool:
+        return name in self._fields
+
+    @property
+    def fields(self) -> Mapping[str, StateField]:
+        return MappingProxyType(self._fields)
+
+    # ------------------------------------------------------------------
+    # Đọc / ghi
+    # ------------------------------------------------------------------
+    def get(self, name: str) -> Any:
+        """Giá trị hiện tại của một trường."""
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"Không có trường trạng thái: {name}") from None
+
+    def update(self, **changes) -> FrozenSet[str]:
+        """Ghi nguyên tử một hoặc nhiều trường.
+
+        Returns:
+            Tập nhóm thực sự thay đổi (rỗng nếu mọi giá trị đều như cũ)
+        """
+        normalized = {}
+        for name, value in changes.items():
+            field = self._fields.get(name)
+            if field is None:
+                raise AttributeError(f"Không có trường trạng thái: {name}")
+            normalized[name] = field.kind(value)
+
+        with self._lock:
+            groups = set()
+            for name, value in normalized.items():
+                if not _same(self._values[name], value):
+                    self._values[name] = value
+                    groups.add(self._fields[name].group)
+            if not groups:
+                return frozenset()
+            self._sequence += 1
+            sequence = self._sequence
+            for group in groups:
+                self._versions[group] = sequence
+
+        changed = frozenset(groups)
+        for listener in list(self._listeners):
+            try:
+                listener(changed, sequence)
+            except Exception as e:
+                print(f"Error in state listener: {e}")
+        return changed
+
+    def snapshot(self) -> StateSnapshot:
+        """Ảnh chụp nhất quán của mọi trường và phiên bản nhóm."""
+        with self._lock:
+            return StateSnapshot(self._sequence,
+                                 MappingProxyType(dict(self._values)),
+                                 MappingProxyType(dict(self._versions)))
+
+    @property
+    def sequence(self) -> int:
+        """Số thứ tự của lần thay đổi gần nhất."""
+        return self._sequence
+
+    def version(self, group: str) -> int:
+        """Số thứ tự của lần thay đổi gần nhất trong nhóm."""
+        return self._versions.get(group, 0)
+
+    # ------------------------------------------------------------------
+    # Listener
+    # ------------------------------------------------------------------
+    def add_listener(self, listener: Callable[[FrozenSet[str], int], None]):
+        """Đăng ký hàm listener(changed_groups, sequence), gọi trong thread ghi."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[FrozenSet[str], int], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+
+# Global instance
+state_store = StateStore()
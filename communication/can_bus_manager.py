@@ -2,7 +2,13 @@
 
 import can
 import threading
-from communication.can_config import CAN_CHANNEL, CAN_BUSTYPE, CAN_BITRATE
+from communication.can_config import CAN_CHANNEL, CAN_BUSTYPE, CAN_BITRATE, SIMULATION_CHANNEL
+from common.log_sink import log_sink
+
+# Backend phát lại file log (communication.simulation.ReplayBus)
+BACKEND_REPLAY = "replay"
+# Backend không cần phần cứng
+SIMULATED_BACKENDS = frozenset({"virtual", BACKEND_REPLAY})
 
 
 class CANBusManager:
@@ -15,6 +21,8 @@ class CANBusManager:
     _instance = None
     _lock = threading.Lock()
     _bus = None
+    # Backend cho lần tạo bus tiếp theo (mặc định: phần cứng theo can_config)
+    _config = {'interface': CAN_BUSTYPE, 'channel': CAN_CHANNEL, 'bitrate': CAN_BITRATE, 'options': {}}
     
     def __new__(cls):
         if cls._instance is None:
@@ -23,11 +31,66 @@ class CANBusManager:
                     cls._instance = super().__new__(cls)
         return cls._instance
     
+    def configure(self, interface: str = CAN_BUSTYPE, channel: str = None,
+                  bitrate: int = CAN_BITRATE, **options):
+        """Chọn backend CAN (gọi trước get_bus()).
+        
+        Args:
+            interface: Interface python-can ("socketcan", "virtual", ...) hoặc
+                BACKEND_REPLAY để phát lại file log
+            channel: Kênh (mặc định CAN_CHANNEL, hoặc SIMULATION_CHANNEL với
+                backend mô phỏng)
+            bitrate: Bitrate (bps)
+            **options: Tham số riêng của backend, ví dụ replay_file, speed, loop
+                cho BACKEND_REPLAY
+            
+        Raises:
+            RuntimeError: Nếu bus đã được khởi tạo
+        """
+        with self._lock:
+            if self._bus is not None:
+                raise RuntimeError("CAN bus đã được khởi tạo, gọi shutdown() trước khi đổi backend")
+            if channel is None:
+                channel = SIMULATION_CHANNEL if interface in SIMULATED_BACKENDS else CAN_CHANNEL
+            self._config = {'interface': interface, 'channel': channel,
+                            'bitrate': bitrate, 'options': options}
+    
+    @property
+    def backend(self) -> str:
+        """Interface của backend đang chọn."""
+        return self._config['interface']
+    
+    @property
+    def channel(self) -> str:
+        """Kênh của backend đang chọn."""
+        return self._config['channel']
+    
+    def describe(self) -> str:
+        """Mô tả ngắn backend đang chọn (dùng cho log)."""
+        config = self._config
+        if config['interface'] == BACKEND_REPLAY:
+            return f"replay {config['options'].get('replay_file')}"
+        if config['interface'] in SIMULATED_BACKENDS:
+            return f"{config['interface']} {config['channel']}"
+        return f"{config['channel']} @ {config['bitrate']}bps"
+    
+    def _create_bus(self):
+        config = self._config
+        if config['interface'] == BACKEND_REPLAY:
+            from communication.simulation import ReplayBus
+            return ReplayBus(channel=config['channel'], **config['options'])
+        return can.interface.Bus(
+            channel=config['channel'],
+            interface=config['interface'],
+            bitrate=config['bitrate'],
+            **config['options']
+        )
+    
     def get_bus(self):
         """Lấy CAN bus instance (tạo nếu chưa có).
         
         Returns:
-            can.interface.Bus: CAN bus instance
+            can.BusABC: CAN bus instance của backend đã chọn
             
         Raises:
             Exception: Nếu không thể khởi tạo CAN bus
@@ -36,30 +99,15 @@ class CANBusManager:
             with self._lock:
                 if self._bus is None:
                     try:
-                        self._bus = can.interface.Bus(
-                            channel=CAN_CHANNEL,
-                            bustype=CAN_BUSTYPE,
-                            bitrate=CAN_BITRATE
-                        )
-                        print(f"✓ CAN bus manager khởi tạo thành công trên {CAN_CHANNEL} @ {CAN_BITRATE}bps")
-                        
-                        # Ghi log thành công
-                        try:
-                            from ui.tabs.event_log_tab import LogTab
-                            LogTab.log(f"CAN bus manager khởi tạo thành công trên {CAN_CHANNEL} @ {CAN_BITRATE}bps", "SUCCESS")
-                        except:
-                            pass
+                        self._bus = self._create_bus()
+                        message = f"CAN bus manager khởi tạo thành công trên {self.describe()}"
+                        print(f"✓ {message}")
+                        log_sink.emit(message, "SUCCESS")
                             
                     except Exception as e:
                         error_msg = f"Lỗi khởi tạo CAN bus: {e}"
                         print(error_msg)
-                        
-                        # Ghi log lỗi
-                        try:
-                            from ui.tabs.event_log_tab import LogTab
-                            LogTab.log(error_msg, "ERROR")
-                        except:
-                            pass
+                        log_sink.emit(error_msg, "ERROR")
                         raise
         return self._bus
     
@@ -80,13 +128,7 @@ class CANBusManager:
                         self._bus.shutdown()
                         self._bus = None
                         print("CAN bus đã được đóng")
-                        
-                        # Ghi log
-                        try:
-                            from ui.tabs.event_log_tab import LogTab
-                            LogTab.log("CAN bus đã được đóng", "INFO")
-                        except:
-                            pass
+                        log_sink.emit("CAN bus đã được đóng", "INFO")
                     except Exception as e:
                         print(f"Lỗi khi đóng CAN bus: {e}")
 
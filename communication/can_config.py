@@ -19,6 +19,15 @@ CAN_BUSTYPE = "socketcan"
 # CAN bitrate (bps)
 CAN_BITRATE = 500000  # 500 kbps
 
+# Kênh cho backend mô phỏng (python-can "virtual" hoặc "replay" - phát lại file log)
+SIMULATION_CHANNEL = "sim0"
+
+# Cài bộ lọc CAN trong kernel (socketcan) để chỉ nhận các ID bên dưới
+CAN_KERNEL_FILTERS_ENABLED = True
+
+# Số frame tối đa đọc liên tiếp trong một lần xả buffer nhận
+CAN_RX_BURST_MAX = 256
+
 
 # =============================================================================
 # CAN IDs - Receive (Nhận dữ liệu)
@@ -40,6 +49,16 @@ CAN_ID_MODULE_DATA_START = 0x300  # ID bắt đầu của module data
 CAN_ID_MODULE_DATA_END = 0x32F    # ID kết thúc của module data
 
 
+# --- Các ID chỉ cần giá trị mới nhất trong một burst (latest wins) ---
+CAN_COALESCED_IDS = frozenset({
+    CAN_ID_DISTANCE, CAN_ID_DIRECTION,
+    CAN_ID_CANNON_LEFT, CAN_ID_CANNON_RIGHT,
+})
+
+# Mask cho CAN ID chuẩn 11-bit
+CAN_STANDARD_ID_MASK = 0x7FF
+
+
 # =============================================================================
 # CAN IDs - Send (Gửi dữ liệu)
 # =============================================================================
@@ -75,6 +94,7 @@ ANGLE_COMMAND_HEADER = 0x11       # Byte header cho gói tin góc
 COMPASS_PORT = "/dev/ttyUSB0"     # Serial port cho la bàn
 COMPASS_BAUDRATE = 4800           # Baudrate la bàn
 COMPASS_TIMEOUT = 1               # Timeout (seconds)
+COMPASS_FRAME_SIZE = 19           # Số byte của một frame hướng
 
 
 # =============================================================================
@@ -101,3 +121,32 @@ def get_can_id_for_angle(is_left: bool) -> int:
 def get_side_code(is_left: bool) -> int:
     """Lấy mã nhận dạng giàn."""
     return SIDE_CODE_LEFT if is_left else SIDE_CODE_RIGHT
+
+
+def _range_to_mask_filters(start_id: int, end_id: int) -> list:
+    """Phân rã dải CAN ID [start_id, end_id] thành các cặp (can_id, can_mask) chính xác."""
+    filters = []
+    while start_id <= end_id:
+        # Khối lớn nhất căn lề tại start_id và không vượt quá end_id
+        size = start_id & -start_id if start_id else CAN_STANDARD_ID_MASK + 1
+        while size > end_id - start_id + 1:
+            size >>= 1
+        filters.append({
+            "can_id": start_id,
+            "can_mask": CAN_STANDARD_ID_MASK & ~(size - 1),
+            "extended": False,
+        })
+        start_id += size
+    return filters
+
+
+def build_receive_filters() -> list:
+    """Tạo danh sách bộ lọc python-can cho các CAN ID mà receiver xử lý."""
+    filters = [
+        {"can_id": can_id, "can_mask": CAN_STANDARD_ID_MASK, "extended": False}
+        for can_id in (CAN_ID_DISTANCE, CAN_ID_DIRECTION,
+                       CAN_ID_CANNON_LEFT, CAN_ID_CANNON_RIGHT,
+                       CAN_ID_AMMO_STATUS)
+    ]
+    filters.extend(_range_to_mask_filters(CAN_ID_MODULE_DATA_START, CAN_ID_MODULE_DATA_END))
+    return filters
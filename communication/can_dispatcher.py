@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+CAN Dispatcher
+==============
+Bảng định tuyến CAN frame theo arbitration ID.
+
+Mỗi CAN ID (hoặc dải CAN ID) được đăng ký với đúng một handler. Khi nhận
+frame, dispatcher chỉ cần một lần tra dict để gọi handler tương ứng thay vì
+so sánh lần lượt với tất cả các ID.
+"""
+
+from typing import Callable, Dict, FrozenSet, Optional, Sequence
+
+
+class CANDispatcher:
+    """Định tuyến CAN frame tới handler đã đăng ký theo arbitration ID."""
+
+    def __init__(self, default_handler: Optional[Callable] = None):
+        """
+        Args:
+            default_handler: Handler cho các CAN ID chưa đăng ký (tùy chọn)
+        """
+        self._handlers: Dict[int, Callable] = {}
+        self._default_handler = default_handler
+
+    def register(self, can_id: int, handler: Callable):
+        """Đăng ký handler cho một CAN ID."""
+        self._handlers[can_id] = handler
+
+    def register_range(self, start_id: int, end_id: int, handler: Callable):
+        """Đăng ký cùng một handler cho dải CAN ID [start_id, end_id].
+
+        Dải được trải phẳng vào bảng tra nên chi phí dispatch vẫn là O(1).
+        """
+        if end_id < start_id:
+            raise ValueError(f"Dải CAN ID không hợp lệ: 0x{start_id:X}-0x{end_id:X}")
+        for can_id in range(start_id, end_id + 1):
+            self._handlers[can_id] = handler
+
+    def set_default_handler(self, handler: Optional[Callable]):
+        """Thiết lập handler cho các CAN ID không xác định."""
+        self._default_handler = handler
+
+    def get_handler(self, can_id: int) -> Optional[Callable]:
+        """Lấy handler cho CAN ID (hoặc default handler nếu chưa đăng ký)."""
+        return self._handlers.get(can_id, self._default_handler)
+
+    def registered_ids(self) -> FrozenSet[int]:
+        """Tập các CAN ID đã đăng ký."""
+        return frozenset(self._handlers)
+
+    def dispatch(self, msg):
+        """Gọi handler tương ứng với arbitration ID của frame.
+
+        Returns:
+            Giá trị trả về của handler, hoặc None nếu không có handler
+        """
+        handler = self._handlers.get(msg.arbitration_id, self._default_handler)
+        if handler is None:
+            return None
+        return handler(msg)
+
+
+def coalesce_latest(frames: Sequence, can_ids: FrozenSet[int],
+                    validators: Optional[Dict[int, Callable]] = None) -> Sequence:
+    """Gộp các frame trùng CAN ID trong một burst, chỉ giữ frame hợp lệ mới nhất.
+
+    Chỉ áp dụng cho các ID trong `can_ids` (dữ liệu dạng trạng thái, ví dụ góc
+    pháo, khoảng cách, hướng). Thứ tự tương đối của các frame còn lại được giữ
+    nguyên.
+
+    Args:
+        frames: Các frame của burst theo thứ tự nhận
+        can_ids: Các CAN ID được gộp
+        validators: CAN ID → hàm validator(msg) trả về True nếu handler sẽ chấp
+            nhận frame. Frame không hợp lệ không bao giờ thay thế frame hợp lệ
+            trước nó và luôn được giữ lại để handler ghi log lỗi.
+    """
+    if len(frames) < 2:
+        return frames
+
+    validators = validators or {}
+    last_index = {}
+    invalid = set()
+    for i, msg in enumerate(frames):
+        can_id = msg.arbitration_id
+        if can_id in can_ids:
+            validator = validators.get(can_id)
+            if validator is None or validator(msg):
+                last_index[can_id] = i
+            else:
+                invalid.add(i)
+
+    if not last_index:
+        return frames
+
+    return [
+        msg for i, msg in enumerate(frames)
+        if i in invalid or last_index.get(msg.arbitration_id, i) == i
+    ]
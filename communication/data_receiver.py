@@ -1,174 +1,29 @@
-import random
-import can
 import struct
 import ui.ui_config as config
-from functools import reduce
-from operator import or_
-import can
-import struct
-import ui.ui_config as config
-import math
-import numpy as np
-import pandas as pd
-import os
 from typing import List
-import serial
 import threading
 from communication.can_bus_manager import can_bus_manager
+from communication.can_dispatcher import CANDispatcher, coalesce_latest
+from common.ballistics import Ship, TargetingSystem
+from common.log_sink import log_sink
+from common.state_store import state_store
+from common.latency_trace import latency_tracer
+from common.constants import LogSinkDefaults, JournalDefaults
+from data_management.event_journal import event_journal
+from data_management.module_routing import module_routing_table
 
 # Import CAN configuration
 from communication.can_config import (
-    CAN_CHANNEL, CAN_BUSTYPE, CAN_BITRATE,
     CAN_ID_DISTANCE, CAN_ID_DIRECTION,
     CAN_ID_CANNON_LEFT, CAN_ID_CANNON_RIGHT,
     CAN_ID_AMMO_STATUS,
     CAN_ID_MODULE_DATA_START, CAN_ID_MODULE_DATA_END,
     SIDE_CODE_LEFT, SIDE_CODE_RIGHT,
-    COMPASS_PORT, COMPASS_BAUDRATE, COMPASS_TIMEOUT,
-    is_module_data_id
+    COMPASS_PORT, COMPASS_BAUDRATE, COMPASS_TIMEOUT, COMPASS_FRAME_SIZE,
+    CAN_KERNEL_FILTERS_ENABLED, CAN_RX_BURST_MAX, CAN_COALESCED_IDS,
+    is_module_data_id, build_receive_filters
 )
 
-# Thêm các lớp từ targeting system
-class Point2D:
-    """Lớp biểu diễn điểm trong không gian 2D."""
-    
-    def __init__(self, x: float, y: float):
-        self.x = x
-        self.y = y
-    
-    def distance(self, other: 'Point2D') -> float:
-        """Tính khoảng cách đến một điểm khác."""
-        return math.sqrt((self.x - other.x)**2 + (self.y - other.y)**2)
-    
-    def __str__(self) -> str:
-        return f"({self.x:.2f}, {self.y:.2f})"
-
-class Ship:
-    def __init__(self, length: float = 30, width: float = 10):
-        self.length = length
-        self.width = width
-        
-        # Quang điện tử (điểm A) 
-        self.optoelectronic = Point2D(width/4, 0)
-        
-        # Pháo B và C 
-        self.cannon_1 = Point2D(-width/2, length/4)  # Pháo bên trái (B)
-        self.cannon_2 = Point2D(width/2, length/4)   # Pháo bên phải (C)
-    
-    def get_optoelectronic(self) -> Point2D:
-        """Trả về vị trí của quang điện tử."""
-        return self.optoelectronic
-    
-    def get_cannons(self) -> List[tuple]:
-        """Trả về vị trí của các khẩu pháo."""
-        return [("cannon_1", self.cannon_1), ("cannon_2", self.cannon_2)]
-
-class FiringTableInterpolator:
-    """Nội suy bảng bắn để tìm góc tầm cho một khoảng cách."""
-    
-    def __init__(self, ranges: np.ndarray, angles: np.ndarray):
-        if len(ranges) != len(angles):
-            raise ValueError("Số lượng khoảng cách và góc tầm phải bằng nhau.")
-        self.ranges = np.array(ranges)
-        self.angles = np.array(angles)
-        # Đảm bảo các khoảng cách được sắp xếp tăng dần
-        sort_indices = np.argsort(self.ranges)
-        self.ranges = self.ranges[sort_indices]
-        self.angles = self.angles[sort_indices]
-
-    def interpolate_angle(self, target_range: float) -> float:
-        """Nội suy góc tầm cho một khoảng cách mục tiêu."""
-        if target_range < self.ranges[0] or target_range > self.ranges[-1]:
-            # Ngoại suy tuyến tính cho các giá trị ngoài cùng
-            if target_range < self.ranges[0]:
-                return np.interp(target_range, self.ranges[:2], self.angles[:2])
-            else:
-                return np.interp(target_range, self.ranges[-2:], self.angles[-2:])
-
-        return np.interp(target_range, self.ranges, self.angles)
-
-class TargetingSystem:
-    """Hệ thống nhắm mục tiêu tính toán giải pháp bắn."""
-
-    def __init__(self, ship: Ship, interpolator: FiringTableInterpolator):
-        self.ship = ship
-        self.interpolator = interpolator
-
-    def calculate_target_position(self, distance_optoelectronic: float, azimuth_optoelectronic_deg: float) -> Point2D:
-        """Tính toán vị trí mục tiêu dựa trên dữ liệu từ quang điện tử."""
-        # Chuyển góc hướng từ độ sang radian
-        azimuth_rad = math.radians(azimuth_optoelectronic_deg)
-        
-        # Lấy vị trí của quang điện tử
-        optoelectronic_pos = self.ship.get_optoelectronic()
-        
-        # Tính toán tọa độ x, y của mục tiêu
-        target_x = optoelectronic_pos.x + distance_optoelectronic * math.sin(azimuth_rad)
-        target_y = optoelectronic_pos.y + distance_optoelectronic * math.cos(azimuth_rad)
-        
-        return Point2D(target_x, target_y)
-
-    def calculate_firing_solutions(self, target_position: Point2D) -> dict:
-        """Tính toán giải pháp bắn cho từng khẩu pháo."""
-        solutions = {}
-        
-        for cannon_name, cannon_pos in self.ship.get_cannons():
-            # Tính khoảng cách từ pháo đến mục tiêu
-            distance_to_target = cannon_pos.distance(target_position)
-            
-            # Tính góc hướng của mục tiêu so với pháo
-            delta_x = target_position.x - cannon_pos.x
-            delta_y = target_position.y - cannon_pos.y
-            
-            # Tính góc bằng atan2 để xử lý đúng các góc phần tư
-            azimuth_rad = math.atan2(delta_x, delta_y)
-            azimuth_deg = math.degrees(azimuth_rad)
-            
-            # Đảm bảo góc hướng nằm trong khoảng -180 đến 180 độ
-            if azimuth_deg > 180:
-                azimuth_deg -= 360
-            elif azimuth_deg < -180:
-                azimuth_deg += 360
-            
-            # Nội suy góc tầm từ bảng bắn
-            elevation_angle_deg = self.interpolator.interpolate_angle(distance_to_target)
-            
-            # Chuyển đổi sang float tiêu chuẩn của Python
-            solutions[f"{cannon_name}_distance"] = float(distance_to_target)
-            solutions[f"{cannon_name}_azimuth"] = float(azimuth_deg)
-            solutions[f"{cannon_name}_elevation"] = float(elevation_angle_deg)
-            
-        return solutions
-
-def load_firing_table_from_csv(csv_path: str = "table1.csv"):
-    """Đọc bảng bắn từ file CSV.
-    
-    Args:
-        csv_path: Đường dẫn đến file CSV (mặc định: "table1.csv")
-        
-    Returns:
-        Tuple chứa hai mảng (khoảng cách, góc tầm)
-    """
-    try:
-        # Đọc file CSV
-        df = pd.read_csv(csv_path)
-        
-        # Kiểm tra các cột cần thiết (X là khoảng cách, P là góc tầm)
-        if 'X' not in df.columns or 'P' not in df.columns:
-            raise ValueError("File CSV phải có cột 'X' và 'P'")
-        
-        # Chuyển đổi sang numpy array (X là range, P là angle)
-        range_data = df['X'].values
-        angle_data = df['P'].values
-        
-        print(f"Đã đọc {len(range_data)} điểm dữ liệu từ {csv_path}")
-        return range_data, angle_data
-        
-    except FileNotFoundError:
-        print(f"Không tìm thấy file {csv_path}, sử dụng dữ liệu mặc định")
-    except Exception as e:
-        print(f"Lỗi đọc file CSV: {e}, sử dụng dữ liệu mặc định")
-
 def unpack_bits(n: int, width: int) -> List[bool]:
     return [bool((n>>i) & 1) for i in range(0, width)]
 
@@ -182,60 +37,91 @@ def extract_heading(binary_string: bytes) -> float:
         print(f"Lỗi gói tin compass. Raw data: {binary_string}")
         return 0.0
 
+# Hàm mở cổng la bàn; None = cổng serial thật theo can_config.
+# Chế độ mô phỏng gán hàm trả về communication.simulation.ScriptedCompass.
+compass_port_factory = None
+
+
+def _open_compass_port():
+    # pyserial chỉ cần cho la bàn, import khi thread chạy để không làm chậm khởi động
+    import serial
+
+    return serial.Serial(
+        port=COMPASS_PORT, 
+        timeout=COMPASS_TIMEOUT, 
+        baudrate=COMPASS_BAUDRATE, 
+        bytesize=serial.EIGHTBITS,
+        parity=serial.PARITY_NONE, 
+        stopbits=serial.STOPBITS_ONE
+    )
+
+
 def compass_reader_thread():
     """Thread đọc dữ liệu từ la bàn và cập nhật W_DIRECTION."""
+    port_name = COMPASS_PORT if compass_port_factory is None else "la bàn mô phỏng"
     
     try:
-        Com_Compass = serial.Serial(
-            port=COMPASS_PORT, 
-            timeout=COMPASS_TIMEOUT, 
-            baudrate=COMPASS_BAUDRATE, 
-            bytesize=serial.EIGHTBITS,
-            parity=serial.PARITY_NONE, 
-            stopbits=serial.STOPBITS_ONE
-        )
-        print(f"Compass reader đã khởi động thành công trên {COMPASS_PORT}")
+        Com_Compass = (compass_port_factory or _open_compass_port)()
         
         # Ghi log thành công
-        try:
-            from ui.tabs.event_log_tab import LogTab
-            LogTab.log(f"Compass reader đã khởi động thành công trên {COMPASS_PORT}", "SUCCESS")
-        except:
-            pass
+        _log(f"Compass reader đã khởi động thành công trên {port_name}", "SUCCESS", source=_COMPASS_LOG_SOURCE)
         
         while True:
-            if Com_Compass.in_waiting >= 19:
-                data_Compass = Com_Compass.read(19)
+            if Com_Compass.in_waiting >= COMPASS_FRAME_SIZE:
+                data_Compass = Com_Compass.read(COMPASS_FRAME_SIZE)
                 data_CP = extract_heading(data_Compass)
                 config.W_DIRECTION = data_CP
-                print(f"Compass: {data_CP:.2f}°")
+                # Mỗi lần đọc là một bản ghi INFO: bị giới hạn tốc độ theo nguồn và không in ra console
+                _log(f"Compass: {data_CP:.2f}°", "INFO", source=_COMPASS_LOG_SOURCE)
                 
-    except serial.SerialException as e:
-        error_msg = f"Lỗi Compass: Không thể mở {COMPASS_PORT}. Compass reader sẽ không hoạt động. Chi tiết: {e}"
-        print(error_msg)
-        try:
-            from ui.tabs.event_log_tab import LogTab
-            LogTab.log(error_msg, "ERROR")
-        except:
-            pass
+    except OSError as e:
+        # serial.SerialException là lớp con của OSError
+        error_msg = f"Lỗi Compass: Không thể mở {port_name}. Compass reader sẽ không hoạt động. Chi tiết: {e}"
+        _log(error_msg, "ERROR", source=_COMPASS_LOG_SOURCE)
     except Exception as e:
         error_msg = f"Lỗi không xác định trong compass reader: {e}"
-        print(error_msg)
-        try:
-            from ui.tabs.event_log_tab import LogTab
-            LogTab.log(error_msg, "ERROR")
-        except:
-            pass
+        _log(error_msg, "ERROR", source=_COMPASS_LOG_SOURCE)
     finally:
         if 'Com_Compass' in locals():
             Com_Compass.close()
-            print("Compass serial port đã được đóng")
+            _log("Compass serial port đã được đóng", "INFO", source=_COMPASS_LOG_SOURCE)
 
-# Khởi tạo targeting system
+# Khởi tạo targeting system (góc tầm từ bảng bắn dùng chung của common.ballistics)
 ship = Ship()
-range_data, angle_data = load_firing_table_from_csv()
-interpolator = FiringTableInterpolator(range_data, angle_data)
-targeting_system = TargetingSystem(ship, interpolator)
+targeting_system = TargetingSystem(ship)
+
+# Bộ giải mã CAN biên dịch sẵn (tránh parse format string mỗi frame)
+_FLOAT_STRUCT = struct.Struct("<f")            # Khoảng cách / hướng (4 bytes)
+_CANNON_STRUCT = struct.Struct("<ff")          # Góc + hướng pháo (8 bytes)
+_MODULE_DATA_STRUCT = struct.Struct(">BHHHB")  # Module data (8 bytes)
+
+# Trạng thái mục tiêu nhận từ quang điện tử
+_target_distance = 0.0
+_target_direction = 0.0
+_targeting_pending = False  # Có dữ liệu mục tiêu mới cần tính lại targeting
+_targeting_timestamp = 0.0  # msg.timestamp của frame mục tiêu mới nhất (đo độ trễ)
+
+# Nguồn log của receiver và la bàn (dùng cho giới hạn tốc độ trong log sink)
+_LOG_SOURCE = "can_rx"
+_COMPASS_LOG_SOURCE = "compass"
+
+# Module telemetry chỉ giữ 1/N bản ghi INFO cho mỗi CAN ID
+log_sink.set_sampling_range(CAN_ID_MODULE_DATA_START, CAN_ID_MODULE_DATA_END,
+                            LogSinkDefaults.MODULE_DATA_SAMPLE_EVERY)
+
+
+event_journal.set_node_resolver(module_routing_table.node_id_for)
+# Nhật ký trên đĩa ghi mọi frame; lấy mẫu chỉ khi được cấu hình trong JournalDefaults
+event_journal.set_can_sampling_range(CAN_ID_MODULE_DATA_START, CAN_ID_MODULE_DATA_END,
+                                     JournalDefaults.MODULE_FRAME_SAMPLE_EVERY)
+for _can_id, _every_n in JournalDefaults.CAN_FRAME_SAMPLE_EVERY.items():
+    event_journal.set_can_sampling(_can_id, _every_n)
+
+
+def _log(message, level="INFO", can_id=None, source=_LOG_SOURCE):
+    """Ghi log không chặn qua log sink (không chạm tới Qt từ receiver/compass thread)."""
+    log_sink.emit(message, level, source, can_id)
+
 
 def parse_module_data_from_can(msg):
     """
@@ -260,31 +146,26 @@ def parse_module_data_from_can(msg):
         
         # Check data length
         if len(msg.data) != 8:
-            print(f"[CAN] Invalid module data length: {len(msg.data)} bytes (expected 8)")
+            _log(f"[CAN] Invalid module data length: {len(msg.data)} bytes (expected 8)", "WARNING", msg.arbitration_id)
             return None
         
-        # Extract node index from CAN ID
-        node_index = msg.arbitration_id - CAN_ID_MODULE_DATA_START
+        # Parse data (Big-endian: uint8, 3 x uint16, uint8)
+        module_index, raw_voltage, raw_current, raw_power, temperature = _MODULE_DATA_STRUCT.unpack(msg.data)
+        voltage = raw_voltage * 0.01  # scale 0.01
+        current = raw_current * 0.01  # scale 0.01
+        power = raw_power * 0.1       # scale 0.1
         
-        # Parse data
-        module_index = msg.data[0]
-        voltage = struct.unpack(">H", msg.data[1:3])[0] * 0.01  # Big-endian uint16, scale 0.01
-        current = struct.unpack(">H", msg.data[3:5])[0] * 0.01  # Big-endian uint16, scale 0.01
-        power = struct.unpack(">H", msg.data[5:7])[0] * 0.1     # Big-endian uint16, scale 0.1
-        temperature = msg.data[7]  # uint8
-        
-        # Get node_id from config
-        from data_management.configuration_manager import get_node_id_from_index
-        node_id = get_node_id_from_index(node_index)
+        # Get node_id from the precompiled routing table
+        node_id = module_routing_table.node_id_for(msg.arbitration_id)
         
         if node_id is None:
-            print(f"[CAN] Unknown node index: {node_index}")
+            _log(f"[CAN] Unknown node index: {msg.arbitration_id - CAN_ID_MODULE_DATA_START}", "WARNING", msg.arbitration_id)
             return None
         
         return (node_id, module_index, voltage, current, power, temperature)
         
     except Exception as e:
-        print(f"[CAN] Error parsing module data: {e}")
+        _log(f"[CAN] Error parsing module data: {e}", "ERROR")
         return None
 
 
@@ -299,6 +180,9 @@ def update_module_from_can_message(node_id, module_index, voltage, current, powe
         current: Dòng điện (A)
         power: Công suất (W)
         temperature: Nhiệt độ (°C)
+    
+    Ghi chú: vòng nhận CAN không đi qua hàm này mà tra ModuleData trực tiếp
+    từ module_routing_table; hàm được giữ cho mã gọi theo node_id.
     """
     try:
         from data_management.module_data_manager import module_manager
@@ -307,14 +191,14 @@ def update_module_from_can_message(node_id, module_index, voltage, current, powe
         node_modules = module_manager.get_node_modules(node_id)
         
         if not node_modules:
-            print(f"[CAN] Node '{node_id}' has no modules")
+            _log(f"[CAN] Node '{node_id}' has no modules", "WARNING")
             return False
         
         # Convert dict to list to access by index
         module_list = list(node_modules.values())
         
         if module_index >= len(module_list):
-            print(f"[CAN] Module index {module_index} out of range for node '{node_id}' (has {len(module_list)} modules)")
+            _log(f"[CAN] Module index {module_index} out of range for node '{node_id}' (has {len(module_list)} modules)", "WARNING")
             return False
         
         # Get the module at the specified index
@@ -331,272 +215,313 @@ def update_module_from_can_message(node_id, module_index, voltage, current, powe
             temperature=temperature
         )
         
-        if success:
-            print(f"[CAN] Updated {node_id}[{module_index}] {target_module.name}: V={voltage:.2f}V, I={current:.2f}A, P={power:.1f}W, T={temperature}°C")
-        
         return success
         
     except Exception as e:
-        print(f"[CAN] Error updating module: {e}")
+        _log(f"[CAN] Error updating module: {e}", "ERROR")
         return False
 
 
-def run():
+# =============================================================================
+# CAN frame handlers (mỗi CAN ID được định tuyến tới đúng một handler)
+# =============================================================================
+
+def _handle_module_data(msg):
+    """Xử lý module data (CAN ID 0x300-0x32F).
+    
+    (CAN ID, byte module) được tra thẳng ra ModuleData qua bảng định tuyến
+    biên dịch sẵn, không quét cấu hình node/module cho mỗi frame.
+    """
+    can_id = msg.arbitration_id
+    if len(msg.data) != 8:
+        _log(f"[CAN] Invalid module data length: {len(msg.data)} bytes (expected 8)", "WARNING", can_id)
+        return
+    
+    module_index, raw_voltage, raw_current, raw_power, temperature = _MODULE_DATA_STRUCT.unpack(msg.data)
+    module = module_routing_table.lookup(can_id, module_index)
+    if module is None:
+        node_id = module_routing_table.node_id_for(can_id)
+        if node_id is None:
+            _log(f"[CAN] Unknown node index: {can_id - CAN_ID_MODULE_DATA_START}", "WARNING", can_id)
+        else:
+            _log(f"Lỗi cập nhật module từ CAN data - ID=0x{can_id:03X}: {node_id}[{module_index}] "
+                 f"(node có {module_routing_table.module_count(can_id)} module)", "ERROR", can_id)
+        return
+    
+    voltage = raw_voltage * 0.01  # scale 0.01
+    current = raw_current * 0.01  # scale 0.01
+    power = raw_power * 0.1       # scale 0.1
+    module.update_parameters(voltage=voltage, current=current, power=power, temperature=temperature)
+    _log(f"Nhận CAN data - ID=0x{can_id:03X} ({module.node_id}[{module_index}]): V={voltage:.2f}V, I={current:.2f}A, P={power:.1f}W, T={temperature}°C", "INFO", can_id)
+
+
+def _handle_distance(msg):
+    """Xử lý khoảng cách từ quang điện tử (CAN_ID_DISTANCE)."""
+    global _target_distance, _targeting_pending, _targeting_timestamp
+    if len(msg.data) == 4:
+        (distance_tmp,) = _FLOAT_STRUCT.unpack(msg.data)
+        latency_tracer.frame_decoded(msg.timestamp)
+        _targeting_timestamp = msg.timestamp
+        if distance_tmp > 0:
+            _target_distance = distance_tmp
+        # Log vào lịch sử
+        _log(f"Nhận CAN data - ID=0x{CAN_ID_DISTANCE:X}: Khoảng cách = {_target_distance:.2f} km", "INFO", CAN_ID_DISTANCE)
+    else:
+        _log(f"Lỗi CAN data - ID=0x{CAN_ID_DISTANCE:X}: nhận {len(msg.data)} bytes, cần 4 bytes", "ERROR")
+    _targeting_pending = True
+
+
+def _handle_direction(msg):
+    """Xử lý hướng từ quang điện tử (CAN_ID_DIRECTION)."""
+    global _target_direction, _targeting_pending, _targeting_timestamp
+    if len(msg.data) == 4:
+        (_target_direction,) = _FLOAT_STRUCT.unpack(msg.data)
+        latency_tracer.frame_decoded(msg.timestamp)
+        _targeting_timestamp = msg.timestamp
+        # Log vào lịch sử
+        _log(f"Nhận CAN data - ID=0x{CAN_ID_DIRECTION:X}: Hướng = {_target_direction:.2f}°", "INFO", CAN_ID_DIRECTION)
+    else:
+        _log(f"Lỗi CAN data - ID=0x{CAN_ID_DIRECTION:X}: nhận {len(msg.data)} bytes, cần 4 bytes", "ERROR")
+    _targeting_pending = True
+
+
+def _update_targeting():
+    """Tính toán targeting sau khi nhận CAN_ID_DISTANCE hoặc CAN_ID_DIRECTION.
+
+    Được gọi một lần cho mỗi burst, sau khi mọi frame khoảng cách/hướng đã được áp dụng.
+    """
+    try:
+        target_position = targeting_system.calculate_target_position(_target_distance, _target_direction)
+        
+        # Tính toán giải pháp bắn
+        solutions = targeting_system.calculate_firing_solutions(target_position)
+        
+        # Chỉ cập nhật khoảng cách và hướng từ CAN bus KHI Ở CHẾ ĐỘ TỰ ĐỘNG
+        # Góc tầm sẽ được tính liên tục trong UI loop
+        
+        # Chỉ cập nhật các trường ở chế độ tự động; ghi một lần để GUI
+        # không thấy giàn trái đã cập nhật còn giàn phải thì chưa
+        changes = {}
+        if config.DISTANCE_MODE_AUTO_L:
+            changes['DISTANCE_L'] = solutions["cannon_1_distance"]
+        if config.DIRECTION_MODE_AUTO_L:
+            changes['AIM_DIRECTION_L'] = solutions["cannon_1_azimuth"]
+        if config.DISTANCE_MODE_AUTO_R:
+            changes['DISTANCE_R'] = solutions["cannon_2_distance"]
+        if config.DIRECTION_MODE_AUTO_R:
+            changes['AIM_DIRECTION_R'] = solutions["cannon_2_azimuth"]
+        if changes:
+            changed = state_store.update(**changes)
+            latency_tracer.frame_stored(_targeting_timestamp, changed)
+        
+        mode_l_dist = "AUTO" if config.DISTANCE_MODE_AUTO_L else "MANUAL"
+        mode_r_dist = "AUTO" if config.DISTANCE_MODE_AUTO_R else "MANUAL"
+        mode_l_dir = "AUTO" if config.DIRECTION_MODE_AUTO_L else "MANUAL"
+        mode_r_dir = "AUTO" if config.DIRECTION_MODE_AUTO_R else "MANUAL"
+        
+        # Log thông tin tính toán targeting
+        _log(
+            f"Tính toán targeting - Trái: KC={config.DISTANCE_L:.1f}m ({mode_l_dist}), Hướng={config.AIM_DIRECTION_L:.1f}° ({mode_l_dir}) | "
+            f"Phải: KC={config.DISTANCE_R:.1f}m ({mode_r_dist}), Hướng={config.AIM_DIRECTION_R:.1f}° ({mode_r_dir})",
+            "INFO"
+        )
+    except Exception as e:
+        error_msg = f"Lỗi tính toán targeting: {e}"
+        _log(error_msg, "ERROR")
+
+
+def _handle_cannon_left(msg):
+    """Nhận góc hiện tại của pháo trái từ cảm biến (CAN_ID_CANNON_LEFT)."""
+    if len(msg.data) == 8:
+        angle, direction_cannon = _CANNON_STRUCT.unpack(msg.data)
+        latency_tracer.frame_decoded(msg.timestamp)
+        # Góc và hướng hiện tại từ cảm biến, ghi cùng lúc
+        changed = state_store.update(ANGLE_L=angle, DIRECTION_L=direction_cannon)
+        latency_tracer.frame_stored(msg.timestamp, changed)
+        # Log vào lịch sử
+        _log(f"Nhận CAN - ID=0x{CAN_ID_CANNON_LEFT:X} (Pháo Trái): Góc={angle:.2f}°, Hướng={direction_cannon:.2f}°", "INFO", msg.arbitration_id)
+    else:
+        error_msg = f"Lỗi CAN - ID=0x{CAN_ID_CANNON_LEFT:X}: nhận {len(msg.data)} bytes, cần 8 bytes"
+        _log(error_msg, "ERROR")
+
+
+def _handle_cannon_right(msg):
+    """Nhận góc hiện tại của pháo phải từ cảm biến (CAN_ID_CANNON_RIGHT)."""
+    if len(msg.data) == 8:
+        angle, direction_cannon = _CANNON_STRUCT.unpack(msg.data)
+        latency_tracer.frame_decoded(msg.timestamp)
+        # Góc và hướng hiện tại từ cảm biến, ghi cùng lúc
+        changed = state_store.update(ANGLE_R=angle, DIRECTION_R=direction_cannon)
+        latency_tracer.frame_stored(msg.timestamp, changed)
+        # Log vào lịch sử
+        _log(f"Nhận CAN - ID=0x{CAN_ID_CANNON_RIGHT:X} (Pháo Phải): Góc={angle:.2f}°, Hướng={direction_cannon:.2f}°", "INFO", msg.arbitration_id)
+    else:
+        error_msg = f"Lỗi CAN - ID=0x{CAN_ID_CANNON_RIGHT:X}: nhận {len(msg.data)} bytes, cần 8 bytes"
+        _log(error_msg, "ERROR")
+
+
+def _handle_ammo_status(msg):
+    """Nhận trạng thái ống phóng (CAN_ID_AMMO_STATUS)."""
+    try:
+        data = msg.data
+        
+        flag1 = unpack_bits(data[2], 8)
+        flag2 = unpack_bits(data[3], 8)
+        flag3 = unpack_bits(data[4], 2)
+        flags = flag1 + flag2 + flag3
+        if data[1] == SIDE_CODE_LEFT:
+            config.AMMO_L = flags
+            side_name = "Giàn Trái"
+        elif data[1] == SIDE_CODE_RIGHT:
+            config.AMMO_R = flags
+            side_name = "Giàn Phải"
+        else:
+            error_msg = f"Lỗi CAN - ID=0x{CAN_ID_AMMO_STATUS:X}: Side code không hợp lệ {data[1]:#x}"
+            _log(error_msg, "ERROR")
+            return
+            
+        # Log vào lịch sử
+        ammo_count = sum(flags)
+        _log(f"Nhận CAN - ID=0x{CAN_ID_AMMO_STATUS:X} ({side_name}): Trạng thái đạn {ammo_count}/18 sẵn sàng", "INFO", CAN_ID_AMMO_STATUS)
+    except Exception as e:
+        error_msg = f"Lỗi xử lý CAN AMMO_STATUS: {e}"
+        _log(error_msg, "ERROR")
+
+
+def _handle_unknown(msg):
+    """Log cho các CAN ID không xác định."""
+    data_hex = msg.data.hex().upper()
+    _log(f"Nhận CAN - ID=0x{msg.arbitration_id:03X} (Không xác định): DLC={len(msg.data)}, Data={data_hex}", "WARNING", msg.arbitration_id)
+
+
+def build_dispatcher() -> CANDispatcher:
+    """Tạo bảng định tuyến CAN ID → handler cho receiver."""
+    dispatcher = CANDispatcher(default_handler=_handle_unknown)
+    dispatcher.register_range(CAN_ID_MODULE_DATA_START, CAN_ID_MODULE_DATA_END, _handle_module_data)
+    dispatcher.register(CAN_ID_DISTANCE, _handle_distance)
+    dispatcher.register(CAN_ID_DIRECTION, _handle_direction)
+    dispatcher.register(CAN_ID_CANNON_LEFT, _handle_cannon_left)
+    dispatcher.register(CAN_ID_CANNON_RIGHT, _handle_cannon_right)
+    dispatcher.register(CAN_ID_AMMO_STATUS, _handle_ammo_status)
+    return dispatcher
+
+
+dispatcher = build_dispatcher()
+
+
+def _valid_distance_frame(msg) -> bool:
+    """Frame khoảng cách mà _handle_distance sẽ áp dụng (4 bytes, khoảng cách > 0)."""
+    return len(msg.data) == 4 and _FLOAT_STRUCT.unpack(msg.data)[0] > 0
+
+
+def _valid_direction_frame(msg) -> bool:
+    return len(msg.data) == 4
+
+
+def _valid_cannon_frame(msg) -> bool:
+    return len(msg.data) == 8
+
+
+# Chỉ frame hợp lệ mới được tính là "mới nhất" khi gộp burst: frame lỗi hoặc
+# khoảng cách bằng 0 đến sau không được làm mất giá trị tốt trước nó
+COALESCE_VALIDATORS = {
+    CAN_ID_DISTANCE: _valid_distance_frame,
+    CAN_ID_DIRECTION: _valid_direction_frame,
+    CAN_ID_CANNON_LEFT: _valid_cannon_frame,
+    CAN_ID_CANNON_RIGHT: _valid_cannon_frame,
+}
+
+
+def process_burst(frames):
+    """Xử lý một burst CAN frame.
+
+    Mọi frame đều được ghi vào nhật ký sự kiện. Các frame trạng thái trùng ID
+    (góc pháo, khoảng cách, hướng) được gộp lại, chỉ giữ frame hợp lệ mới nhất;
+    targeting chỉ được tính một lần sau cả burst.
+    """
+    global _targeting_pending
+    event_journal.record_frames(frames)
+    dispatch = dispatcher.dispatch
+    for msg in coalesce_latest(frames, CAN_COALESCED_IDS, COALESCE_VALIDATORS):
+        dispatch(msg)
+    if _targeting_pending:
+        _targeting_pending = False
+        _update_targeting()
+
+
+def process_frame(msg):
+    """Định tuyến một CAN frame tới handler tương ứng."""
+    process_burst((msg,))
+
+
+def _install_receive_filters(bus):
+    """Cài bộ lọc CAN (kernel/phần cứng với socketcan) theo các ID trong can_config."""
+    if not CAN_KERNEL_FILTERS_ENABLED:
+        return
+    try:
+        filters = build_receive_filters()
+        bus.set_filters(filters)
+        print(f"Đã cài {len(filters)} bộ lọc CAN trên {can_bus_manager.describe()}")
+    except Exception as e:
+        error_msg = f"Không thể cài bộ lọc CAN, nhận tất cả các ID: {e}"
+        _log(error_msg, "WARNING")
+
+
+def run(stop_event=None, on_burst=None, start_compass=True):
+    """Vòng nhận CAN trên receiver thread (backend chọn qua can_bus_manager.configure()).
+
+    Args:
+        stop_event: threading.Event để dừng vòng nhận (None = chạy tới khi thoát)
+        on_burst: Hàm (burst) gọi sau mỗi burst đã xử lý, ví dụ để đo throughput/độ trễ
+        start_compass: Khởi động thread đọc la bàn
+    """
     # Khởi động thread đọc la bàn
-    compass_thread = threading.Thread(target=compass_reader_thread, daemon=True)
-    compass_thread.start()
+    if start_compass:
+        compass_thread = threading.Thread(target=compass_reader_thread, daemon=True)
+        compass_thread.start()
     
     try:
         # Sử dụng bus chung từ manager thay vì tạo mới
         bus = can_bus_manager.get_bus()
-        print(f"Listening on {CAN_CHANNEL}...")
+        print(f"Listening on {can_bus_manager.describe()}...")
         # Ghi log thành công (đã log trong can_bus_manager)
     except OSError as e:
         if e.errno == 19:  # No such device
-            error_msg = f"Lỗi CAN: Không tìm thấy thiết bị '{CAN_CHANNEL}'. CAN receiver sẽ không hoạt động."
-            print(error_msg)
+            error_msg = f"Lỗi CAN: Không tìm thấy thiết bị '{can_bus_manager.channel}'. CAN receiver sẽ không hoạt động."
             # Ghi log vào event log
-            try:
-                from ui.tabs.event_log_tab import LogTab
-                LogTab.log(error_msg, "ERROR")
-            except:
-                pass
+            _log(error_msg, "ERROR")
         else:
             error_msg = f"Lỗi CAN OSError: {e}"
-            print(error_msg)
-            try:
-                from ui.tabs.event_log_tab import LogTab
-                LogTab.log(error_msg, "ERROR")
-            except:
-                pass
+            _log(error_msg, "ERROR")
         return  # Thoát hàm nếu không thể khởi tạo CAN bus
     except Exception as e:
         error_msg = f"Lỗi không xác định khi khởi tạo CAN bus: {e}"
-        print(error_msg)
-        try:
-            from ui.tabs.event_log_tab import LogTab
-            LogTab.log(error_msg, "ERROR")
-        except:
-            pass
+        _log(error_msg, "ERROR")
         return
     
-    # Khởi tạo biến distance và direction
-    distance = 0.0
-    direction = 0.0
+    _install_receive_filters(bus)
+    recv = bus.recv
     
     try:
-        while True:
-            msg = bus.recv(timeout=1.0)  # Timeout 1 giây
+        while stop_event is None or not stop_event.is_set():
+            msg = recv(timeout=1.0)  # Timeout 1 giây
             if msg is None:
                 continue
             
-            # Parse module data (CAN ID 0x300-0x32F)
-            module_data = parse_module_data_from_can(msg)
-            if module_data:
-                node_id, module_index, voltage, current, power, temperature = module_data
-                success = update_module_from_can_message(node_id, module_index, voltage, current, power, temperature)
-                # Log vào lịch sử
-                try:
-                    from ui.tabs.event_log_tab import LogTab
-                    if success:
-                        LogTab.log(f"Nhận CAN data - ID=0x{msg.arbitration_id:03X} ({node_id}[{module_index}]): V={voltage:.2f}V, I={current:.2f}A, P={power:.1f}W, T={temperature}°C", "INFO")
-                    else:
-                        LogTab.log(f"Lỗi cập nhật module từ CAN data - ID=0x{msg.arbitration_id:03X}: {node_id}[{module_index}]", "ERROR")
-                except:
-                    pass
-                continue  # Skip other processing for module data messages
-            
-            if msg.arbitration_id == CAN_ID_DISTANCE:
-                if len(msg.data) == 4:
-                    (distance_tmp,) = struct.unpack("<f", msg.data)
-                    if distance_tmp > 0:
-                        distance = distance_tmp
-                    print(f"Received: ID=0x{CAN_ID_DISTANCE:X}, Distance: {distance:.2f} km")
-                    # Log vào lịch sử
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        LogTab.log(f"Nhận CAN data - ID=0x{CAN_ID_DISTANCE:X}: Khoảng cách = {distance:.2f} km", "INFO")
-                    except:
-                        pass
-                else:
-                    print(f"Lỗi: ID=0x{CAN_ID_DISTANCE:X}, nhận {len(msg.data)} bytes, cần 4 bytes")
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        LogTab.log(f"Lỗi CAN data - ID=0x{CAN_ID_DISTANCE:X}: nhận {len(msg.data)} bytes, cần 4 bytes", "ERROR")
-                    except:
-                        pass
-            if msg.arbitration_id == CAN_ID_DIRECTION:
-                if len(msg.data) == 4:
-                    (direction,) = struct.unpack("<f", msg.data)
-                    print(f"Received: ID=0x{CAN_ID_DIRECTION:X}, Direction: {direction:.2f}°")
-                    # Log vào lịch sử
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        LogTab.log(f"Nhận CAN data - ID=0x{CAN_ID_DIRECTION:X}: Hướng = {direction:.2f}°", "INFO")
-                    except:
-                        pass
-                else:
-                    print(f"Lỗi: ID=0x{CAN_ID_DIRECTION:X}, nhận {len(msg.data)} bytes, cần 4 bytes")
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        LogTab.log(f"Lỗi CAN data - ID=0x{CAN_ID_DIRECTION:X}: nhận {len(msg.data)} bytes, cần 4 bytes", "ERROR")
-                    except:
-                        pass
-            
-            # Chỉ tính toán targeting khi nhận được CAN_ID_DISTANCE hoặc CAN_ID_DIRECTION
-            # và ít nhất một bên đang ở chế độ tự động
-            if msg.arbitration_id in [CAN_ID_DISTANCE, CAN_ID_DIRECTION]:
-                try:
-                    target_position = targeting_system.calculate_target_position(distance, direction)
-                    
-                    # Tính toán giải pháp bắn
-                    solutions = targeting_system.calculate_firing_solutions(target_position)
-                    
-                    # Chỉ cập nhật khoảng cách và hướng từ CAN bus KHI Ở CHẾ ĐỘ TỰ ĐỘNG
-                    # Góc tầm sẽ được tính liên tục trong UI loop
-                    
-                    # Giàn trái - chỉ cập nhật khi ở chế độ tự động
-                    if config.DISTANCE_MODE_AUTO_L:
-                        config.DISTANCE_L = solutions["cannon_1_distance"]
-                    if config.DIRECTION_MODE_AUTO_L:
-                        config.AIM_DIRECTION_L = solutions["cannon_1_azimuth"]
-                    
-                    # Giàn phải - chỉ cập nhật khi ở chế độ tự động
-                    if config.DISTANCE_MODE_AUTO_R:
-                        config.DISTANCE_R = solutions["cannon_2_distance"]
-                    if config.DIRECTION_MODE_AUTO_R:
-                        config.AIM_DIRECTION_R = solutions["cannon_2_azimuth"]
-                    
-                    mode_l_dist = "AUTO" if config.DISTANCE_MODE_AUTO_L else "MANUAL"
-                    mode_r_dist = "AUTO" if config.DISTANCE_MODE_AUTO_R else "MANUAL"
-                    mode_l_dir = "AUTO" if config.DIRECTION_MODE_AUTO_L else "MANUAL"
-                    mode_r_dir = "AUTO" if config.DIRECTION_MODE_AUTO_R else "MANUAL"
-                    
-                    # Log thông tin tính toán targeting
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        LogTab.log(
-                            f"Tính toán targeting - Trái: KC={config.DISTANCE_L:.1f}m ({mode_l_dist}), Hướng={config.AIM_DIRECTION_L:.1f}° ({mode_l_dir}) | "
-                            f"Phải: KC={config.DISTANCE_R:.1f}m ({mode_r_dist}), Hướng={config.AIM_DIRECTION_R:.1f}° ({mode_r_dir})",
-                            "INFO"
-                        )
-                    except:
-                        pass
-                except Exception as e:
-                    error_msg = f"Lỗi tính toán targeting: {e}"
-                    print(error_msg)
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        LogTab.log(error_msg, "ERROR")
-                    except:
-                        pass
-            # Nhận góc hiện tại của pháo từ CAN bus (góc từ cảm biến)
-            if msg.arbitration_id == CAN_ID_CANNON_LEFT:  # Góc pháo trái
-                if len(msg.data) == 8:
-                    angle, direction_cannon = struct.unpack("<ff", msg.data)
-                    config.ANGLE_L = angle  # Góc hiện tại từ cảm biến
-                    config.DIRECTION_L = direction_cannon  # Hướng hiện tại từ cảm biến
-                    print(f"Received cannon_left - angle: {angle:.2f}°, direction: {direction_cannon:.2f}°")
-                    # Log vào lịch sử
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        LogTab.log(f"Nhận CAN - ID=0x{CAN_ID_CANNON_LEFT:X} (Pháo Trái): Góc={angle:.2f}°, Hướng={direction_cannon:.2f}°", "INFO")
-                    except:
-                        pass
-                else:
-                    error_msg = f"Lỗi CAN - ID=0x{CAN_ID_CANNON_LEFT:X}: nhận {len(msg.data)} bytes, cần 8 bytes"
-                    print(error_msg)
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        LogTab.log(error_msg, "ERROR")
-                    except:
-                        pass
-            
-            if msg.arbitration_id == CAN_ID_CANNON_RIGHT:  # Góc pháo phải
-                if len(msg.data) == 8:
-                    angle, direction_cannon = struct.unpack("<ff", msg.data)
-                    config.ANGLE_R = angle  # Góc hiện tại từ cảm biến
-                    config.DIRECTION_R = direction_cannon  # Hướng hiện tại từ cảm biến
-                    print(f"Received cannon_right - angle: {angle:.2f}°, direction: {direction_cannon:.2f}°")
-                    # Log vào lịch sử
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        LogTab.log(f"Nhận CAN - ID=0x{CAN_ID_CANNON_RIGHT:X} (Pháo Phải): Góc={angle:.2f}°, Hướng={direction_cannon:.2f}°", "INFO")
-                    except:
-                        pass
-                else:
-                    error_msg = f"Lỗi CAN - ID=0x{CAN_ID_CANNON_RIGHT:X}: nhận {len(msg.data)} bytes, cần 8 bytes"
-                    print(error_msg)
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        LogTab.log(error_msg, "ERROR")
-                    except:
-                        pass
-
-            if msg.arbitration_id == CAN_ID_AMMO_STATUS:
-                try:
-                    #if can't run change msg['data'] to msg.data
-                    data = msg.data
-                    print(data)
-                    
-                    flag1 = unpack_bits(data[2], 8)
-                    flag2 = unpack_bits(data[3], 8)
-                    flag3 = unpack_bits(data[4], 2)
-                    flags = flag1 + flag2 + flag3
-                    if data[1] == SIDE_CODE_LEFT:
-                        config.AMMO_L = flags
-                        side_name = "Giàn Trái"
-                    elif data[1] == SIDE_CODE_RIGHT:
-                        config.AMMO_R = flags
-                        side_name = "Giàn Phải"
-                    else:
-                        error_msg = f"Lỗi CAN - ID=0x{CAN_ID_AMMO_STATUS:X}: Side code không hợp lệ {data[1]:#x}"
-                        print(error_msg)
-                        try:
-                            from ui.tabs.event_log_tab import LogTab
-                            LogTab.log(error_msg, "ERROR")
-                        except:
-                            pass
-                        continue
-                        
-                    print(f"Ammo L: {config.AMMO_L}")
-                    print(f"Ammo R: {config.AMMO_R}")
-                    # Log vào lịch sử
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        ammo_count = sum(flags)
-                        LogTab.log(f"Nhận CAN - ID=0x{CAN_ID_AMMO_STATUS:X} ({side_name}): Trạng thái đạn {ammo_count}/18 sẵn sàng", "INFO")
-                    except:
-                        pass
-                except Exception as e:
-                    error_msg = f"Lỗi xử lý CAN AMMO_STATUS: {e}"
-                    print(error_msg)
-                    try:
-                        from ui.tabs.event_log_tab import LogTab
-                        LogTab.log(error_msg, "ERROR")
-                    except:
-                        pass
+            # Xả toàn bộ frame đang chờ trong buffer thành một burst
+            burst = [msg]
+            while len(burst) < CAN_RX_BURST_MAX:
+                msg = recv(timeout=0.0)
+                if msg is None:
+                    break
+                burst.append(msg)
             
-            # Log cho các CAN ID không xác định (không phải module data)
-            if (msg.arbitration_id not in [CAN_ID_DISTANCE, CAN_ID_DIRECTION, 
-                                          CAN_ID_CANNON_LEFT, CAN_ID_CANNON_RIGHT, 
-                                          CAN_ID_AMMO_STATUS] and 
-                not is_module_data_id(msg.arbitration_id)):
-                data_hex = msg.data.hex().upper()
-                try:
-                    from ui.tabs.event_log_tab import LogTab
-                    LogTab.log(f"Nhận CAN - ID=0x{msg.arbitration_id:03X} (Không xác định): DLC={len(msg.data)}, Data={data_hex}", "WARNING")
-                except:
-                    pass
-                print(f"Unknown CAN ID: 0x{msg.arbitration_id:03X}, DLC={len(msg.data)}, Data={data_hex}")
+            process_burst(burst)
+            if on_burst is not None:
+                on_burst(burst)
                         
     except KeyboardInterrupt:
         print("Stopped receiving")
     except Exception as e:
-        print(f"Lỗi khi nhận dữ liệu CAN: {e}")
-        try:
-            from ui.tabs.event_log_tab import LogTab
-            LogTab.log(f"Lỗi khi nhận dữ liệu CAN: {e}", "ERROR")
-        except:
-            pass
+        _log(f"Lỗi khi nhận dữ liệu CAN: {e}", "ERROR")
     # KHÔNG shutdown bus ở đây - bus được quản lý bởi can_bus_manager
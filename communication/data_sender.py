@@ -2,6 +2,7 @@ import can
 import time
 from ui.tabs.event_log_tab import LogTab
 from communication.can_bus_manager import can_bus_manager
+from common.latency_trace import latency_tracer
 
 # Import CAN configuration
 from communication.can_config import (
@@ -54,7 +55,9 @@ def sender_ammo_status(idx, data):
             is_extended_id=False
         )
         print('CAN message sent successfully')
+        send_started = time.perf_counter()
         bus.send(msg_launch)
+        latency_tracer.command_sent(send_started)
         # KHÔNG shutdown bus ở đây!
         time.sleep(0.001)  # Delay 1ms để tránh bus overload
         return True
@@ -120,7 +123,9 @@ def sender_angle_direction(angle, direction, idx=CAN_ID_ANGLE_RIGHT):
         LogTab.log(message, "INFO")
         print(message)
         
+        send_started = time.perf_counter()
         bus.send(msg_launch)
+        latency_tracer.command_sent(send_started)
         # KHÔNG shutdown bus ở đây!
         time.sleep(0.001)  # Delay 1ms để tránh bus overload
         return True
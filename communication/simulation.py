@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Simulation backends
+===================
+Thành phần thay thế phần cứng để chạy và đo pipeline nhận dữ liệu mà không
+cần CAN/la bàn thật:
+
+- ReplayBus: bus python-can phát lại file log (candump .log, .asc, .blf, ...)
+  với tốc độ điều chỉnh được (1×, 10×, nhanh nhất có thể).
+- TrafficGenerator: phát luồng frame tổng hợp (có seed) lên bus `virtual`.
+- ScriptedCompass: giả lập cổng serial của la bàn theo kịch bản hướng.
+
+Được chọn qua can_bus_manager.configure() và data_receiver.compass_port_factory
+(xem headless.py).
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Optional, Sequence, Union
+
+import can
+
+from communication.can_config import (
+    CAN_ID_DISTANCE, CAN_ID_DIRECTION,
+    CAN_ID_CANNON_LEFT, CAN_ID_CANNON_RIGHT,
+    CAN_ID_AMMO_STATUS, CAN_ID_MODULE_DATA_START,
+    COMPASS_FRAME_SIZE, SIMULATION_CHANNEL,
+)
+
+# Tốc độ phát lại "nhanh nhất có thể"
+REPLAY_SPEED_MAX = 0.0
+
+
+def parse_replay_speed(text: str) -> float:
+    """'1', '10x', '2.5' → hệ số tốc độ; 'max'/'0' → REPLAY_SPEED_MAX."""
+    text = text.strip().lower()
+    if text in ('max', 'asap', 'inf'):
+        return REPLAY_SPEED_MAX
+    speed = float(text.rstrip('x×'))
+    if speed == 0:
+        return REPLAY_SPEED_MAX
+    if speed < 0:
+        raise ValueError(f"Tốc độ phát lại không hợp lệ: {text}")
+    return speed
+
+
+class ReplayBus(can.BusABC):
+    """Bus chỉ nhận, phát lại frame từ file log theo nhịp thời gian gốc.
+
+    Timestamp của frame được đặt lại theo đồng hồ hiện tại (time.time()) tại
+    thời điểm frame *đến hạn*, nên độ trễ đo từ msg.timestamp bao gồm cả thời
+    gian frame phải chờ trong hàng đợi nhận như với bus thật. Frame gửi đi chỉ
+    được đếm, không được truyền đi đâu.
+    """
+
+    def __init__(self, channel: str = SIMULATION_CHANNEL, replay_file: str = None,
+                 speed: float = 1.0, loop: bool = False, **kwargs):
+        if not replay_file:
+            raise ValueError("Cần đường dẫn file log để phát lại")
+        super().__init__(channel=channel, **kwargs)
+        self.channel_info = f"replay: {replay_file}"
+        self.replay_file = replay_file
+        self.speed = speed
+        self.loop = loop
+        self.sent_count = 0
+        self.replayed_count = 0
+        self.finished = threading.Event()
+
+        self._messages = [msg for msg in can.LogReader(replay_file) if not msg.is_error_frame]
+        if not self._messages:
+            raise ValueError(f"File log không có frame dữ liệu: {replay_file}")
+        self._index = 0
+        self._restart_clock()
+        print(f"Phát lại {len(self._messages)} frame từ {replay_file} "
+              f"(tốc độ {'tối đa' if speed == REPLAY_SPEED_MAX else f'{speed:g}×'})")
+
+    def _restart_clock(self):
+        self._log_start = self._messages[0].timestamp
+        self._wall_start = time.time()
+
+    def _due_time(self, msg: can.Message) -> float:
+        return self._wall_start + (msg.timestamp - self._log_start) / self.speed
+
+    def _recv_internal(self, timeout: Optional[float]):
+        if self._index >= len(self._messages):
+            if not self.loop:
+                self.finished.set()
+                if timeout:
+                    time.sleep(timeout)
+                return None, False
+            self._index = 0
+            self._restart_clock()
+
+        source = self._messages[self._index]
+        if self.speed == REPLAY_SPEED_MAX:
+            due = time.time()
+        else:
+            due = self._due_time(source)
+            wait = due - time.time()
+            if wait > 0:
+                if timeout is not None and wait > timeout:
+                    time.sleep(timeout)
+                    return None, False
+                time.sleep(wait)
+
+        self._index += 1
+        self.replayed_count += 1
+        msg = can.Message(
+            timestamp=due,
+            arbitration_id=source.arbitration_id,
+            is_extended_id=source.is_extended_id,
+            is_remote_frame=source.is_remote_frame,
+            is_fd=source.is_fd,
+            dlc=source.dlc,
+            data=source.data,
+            channel=self.channel_info,
+        )
+        return msg, False
+
+    def send(self, msg: can.Message, timeout: Optional[float] = None) -> None:
+        self.sent_count += 1
+
+
+def synthetic_frames(count: int, seed: int = 0):
+    """Luồng frame tổng hợp giống tải thực: phần lớn là module telemetry."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.85:
+            can_id = rng.randint(CAN_ID_MODULE_DATA_START, CAN_ID_MODULE_DATA_START + 11)
+            data = [rng.randint(0, 1), 0x04, 0xB0, 0x00, 0xC8, 0x00, 0xF0, rng.randint(25, 45)]
+        elif roll < 0.90:
+            can_id = rng.choice([CAN_ID_CANNON_LEFT, CAN_ID_CANNON_RIGHT])
+            data = [0] * 8
+        elif roll < 0.95:
+            can_id = rng.choice([CAN_ID_DISTANCE, CAN_ID_DIRECTION])
+            data = [0, 0, 0x80, 0x3F]
+        elif roll < 0.97:
+            can_id = CAN_ID_AMMO_STATUS
+            data = [0x31, 0x31, 0xFF, 0xFF, 0x03, 0x11]
+        else:
+            can_id = rng.randint(0x400, 0x4FF)
+            data = [0] * 8
+        yield can.Message(arbitration_id=can_id, data=data, is_extended_id=False)
+
+
+class TrafficGenerator:
+    """Thread phát frame tổng hợp lên một kênh python-can `virtual`.
+
+    rate = 0 nghĩa là phát nhanh nhất có thể.
+    """
+
+    def __init__(self, count: int, rate: float = 0.0, seed: int = 0,
+                 channel: str = SIMULATION_CHANNEL):
+        self.count = count
+        self.rate = rate
+        self.seed = seed
+        self.channel = channel
+        self.sent_count = 0
+        self.finished = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="TrafficGenerator", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        bus = can.interface.Bus(channel=self.channel, interface='virtual')
+        try:
+            interval = 1.0 / self.rate if self.rate > 0 else 0.0
+            next_send = time.perf_counter()
+            for msg in synthetic_frames(self.count, self.seed):
+                if interval:
+                    wait = next_send - time.perf_counter()
+                    if wait > 0:
+                        time.sleep(wait)
+                    next_send += interval
+                msg.timestamp = time.time()
+                bus.send(msg)
+                self.sent_count += 1
+        finally:
+            bus.shutdown()
+            self.finished.set()
+
+
+class ScriptedCompass:
+    """Cổng serial giả của la bàn, phát frame hướng theo kịch bản.
+
+    Frame có dạng "$HEHDT,<hướng>,T" đệm tới COMPASS_FRAME_SIZE byte, đúng
+    định dạng extract_heading() đọc (trường thứ hai sau dấu phẩy).
+
+    Args:
+        script: Hàm hướng(t giây) → độ, hoặc dãy hướng được phát lần lượt
+            (lặp lại khi hết)
+        rate_hz: Số frame mỗi giây
+    """
+
+    def __init__(self, script: Union[Callable[[float], float], Sequence[float]] = (0.0,),
+                 rate_hz: float = 10.0):
+        if rate_hz <= 0:
+            raise ValueError(f"Tần số la bàn không hợp lệ: {rate_hz}")
+        self.script = script
+        self.interval = 1.0 / rate_hz
+        self.frames_sent = 0
+        self._start = time.monotonic()
+        self._buffer = b""
+        self.is_open = True
+
+    @classmethod
+    def sweep(cls, degrees_per_second: float, start: float = 0.0, rate_hz: float = 10.0) -> 'ScriptedCompass':
+        """La bàn quay đều (ví dụ tàu chuyển hướng)."""
+        return cls(lambda t: (start + degrees_per_second * t) % 360.0, rate_hz)
+
+    def _heading(self, index: int) -> float:
+        if callable(self.script):
+            return float(self.script(index * self.interval))
+        return float(self.script[index % len(self.script)])
+
+    @staticmethod
+    def format_frame(heading: float) -> bytes:
+        text = f"$HEHDT,{heading:.2f},T"
+        return text.encode().ljust(COMPASS_FRAME_SIZE - 2)[:COMPASS_FRAME_SIZE - 2] + b"\r\n"
+
+    def _fill(self):
+        due = int((time.monotonic() - self._start) / self.interval) + 1
+        while self.frames_sent < due:
+            self._buffer += self.format_frame(self._heading(self.frames_sent))
+            self.frames_sent += 1
+
+    @property
+    def in_waiting(self) -> int:
+        self._fill()
+        if len(self._buffer) < COMPASS_FRAME_SIZE:
+            # Chờ tới frame kế tiếp thay vì để reader quay vòng bận
+            next_due = self._start + self.frames_sent * self.interval
+            time.sleep(max(0.0, min(self.interval, next_due - time.monotonic())))
+            self._fill()
+        return len(self._buffer)
+
+    def read(self, size: int = 1) -> bytes:
+        self._fill()
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def close(self):
+        self.is_open = False
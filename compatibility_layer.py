@@ -2,8 +2,16 @@
 """
 Backwards compatibility layer for renamed files.
 This ensures old import statements continue to work during transition.
+
+Old module names are registered as lazy aliases: nothing is imported when
+this layer loads (the finder classes deliberately avoid importlib.abc, which
+alone pulls in importlib.resources and typing). The first import of an old name imports the new module
+and registers it under both names, so startup only pays for the modules
+the application actually uses.
 """
 
+import importlib
+import importlib.machinery
 import sys
 import os
 
@@ -12,78 +20,89 @@ project_root = os.path.dirname(os.path.abspath(__file__))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-# Import new modules and map them to old names
-try:
+# Old module name -> new module name
+MODULE_ALIASES = {
     # Data management aliases
-    import data_management.system_configuration as system_config
-    import data_management.module_data_manager as module_data
-    import data_management.configuration_manager as config_manager
-    import data_management.node_data_manager as node_data
-    import data_management.unified_threshold_manager as module_thresholds
-    import data_management.node_mapping_manager as node_mapping
-
-    # Register old module names in sys.modules for backwards compatibility
-    sys.modules['data.system_config'] = system_config
-    sys.modules['data.module_data'] = module_data
-    sys.modules['data.config_manager'] = config_manager
-    sys.modules['data.node_data'] = node_data
-    sys.modules['data.module_thresholds'] = module_thresholds
-    sys.modules['data.node_mapping'] = node_mapping
+    'data.system_config': 'data_management.system_configuration',
+    'data.module_data': 'data_management.module_data_manager',
+    'data.config_manager': 'data_management.configuration_manager',
+    'data.node_data': 'data_management.node_data_manager',
+    'data.module_thresholds': 'data_management.unified_threshold_manager',
+    'data.node_mapping': 'data_management.node_mapping_manager',
 
     # UI component aliases
-    import ui.components.ui_utilities as control_panel_utils
-    import ui.widgets.compass_widget as compass
-    import ui.widgets.half_compass_widget as half_compass
-    import ui.widgets.ammunition_widget as bullet_widget
-    import ui.widgets.numeric_display_widget as numeric_data
-    import ui.widgets.custom_message_box_widget as custom_message_box
-    import ui.components.grid_background_renderer as grid_background
-    import ui.components.system_diagram_renderer as system_diagram_renderer
-    import ui.components.info_panel_renderer as info_panel_renderer
-    import ui.components.event_handler as event_handler
-
-    # Register old component names
-    sys.modules['control_panel.components.utils'] = control_panel_utils
-    sys.modules['control_panel.components.compass'] = compass
-    sys.modules['control_panel.components.half_compass'] = half_compass
-    sys.modules['control_panel.components.bullet_widget'] = bullet_widget
-    sys.modules['control_panel.components.numeric_data'] = numeric_data
-    sys.modules['control_panel.components.custom_message_box'] = custom_message_box
-    sys.modules['control_panel.components.grid_background'] = grid_background
-    sys.modules['control_panel.components.system_diagram_renderer'] = system_diagram_renderer
-    sys.modules['control_panel.components.info_panel_renderer'] = info_panel_renderer
-    sys.modules['control_panel.components.event_handler'] = event_handler
+    'control_panel.components.utils': 'ui.components.ui_utilities',
+    'control_panel.components.compass': 'ui.widgets.compass_widget',
+    'control_panel.components.half_compass': 'ui.widgets.half_compass_widget',
+    'control_panel.components.bullet_widget': 'ui.widgets.ammunition_widget',
+    'control_panel.components.numeric_data': 'ui.widgets.numeric_display_widget',
+    'control_panel.components.custom_message_box': 'ui.widgets.custom_message_box_widget',
+    'control_panel.components.grid_background': 'ui.components.grid_background_renderer',
+    'control_panel.components.system_diagram_renderer': 'ui.components.system_diagram_renderer',
+    'control_panel.components.info_panel_renderer': 'ui.components.info_panel_renderer',
+    'control_panel.components.event_handler': 'ui.components.event_handler',
 
     # Tab aliases
-    import ui.tabs.main_control_tab as main_tab
-    import ui.tabs.system_info_tab as info_tab
-    import ui.tabs.event_log_tab as log_tab
-    import ui.tabs.settings_tab as setting_tab
-
-    sys.modules['control_panel.main_tab'] = main_tab
-    sys.modules['control_panel.info_tab'] = info_tab
-    sys.modules['control_panel.log_tab'] = log_tab
-    sys.modules['control_panel.setting_tab'] = setting_tab
+    'control_panel.main_tab': 'ui.tabs.main_control_tab',
+    'control_panel.info_tab': 'ui.tabs.system_info_tab',
+    'control_panel.log_tab': 'ui.tabs.event_log_tab',
+    'control_panel.setting_tab': 'ui.tabs.settings_tab',
 
     # Communication aliases
-    import communication.data_sender as sender
-    import communication.data_receiver as receiver
-
-    sys.modules['control_panel.sender'] = sender
-    sys.modules['control_panel.receiver'] = receiver
+    'control_panel.sender': 'communication.data_sender',
+    'control_panel.receiver': 'communication.data_receiver',
 
     # UI config alias
-    import ui.ui_config as ui_config
-    sys.modules['control_panel.config'] = ui_config
+    'control_panel.config': 'ui.ui_config',
+}
+
+
+class _AliasLoader:
+    """Loader that imports the new module and returns it for an old name."""
+
+    def __init__(self, target):
+        self.target = target
+
+    def create_module(self, spec):
+        return importlib.import_module(self.target)
+
+    def exec_module(self, module):
+        # The new module was executed by its own import
+        pass
+
+
+class _PlaceholderPackageLoader:
+    """Loader for an empty package that only holds old module names."""
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        pass
+
+
+class LegacyModuleFinder:
+    """Meta path finder that resolves old module names on first import."""
+
+    def __init__(self, aliases):
+        self.aliases = dict(aliases)
+        # Parent packages of the old names (e.g. 'data', 'control_panel.components')
+        self.parents = {alias.rpartition('.')[0] for alias in self.aliases}
+
+    def find_spec(self, fullname, path, target=None):
+        module_target = self.aliases.get(fullname)
+        if module_target is not None:
+            return importlib.machinery.ModuleSpec(fullname, _AliasLoader(module_target))
 
-    print("✅ Backwards compatibility layer loaded successfully")
+        if fullname in self.parents:
+            # Only stand in for a parent package that does not exist on disk
+            if importlib.machinery.PathFinder.find_spec(fullname, path) is not None:
+                return None
+            return importlib.machinery.ModuleSpec(fullname, _PlaceholderPackageLoader(), is_package=True)
+        return None
 
-except ImportError as e:
-    print(f"⚠️  Warning: Could not load all modules for backwards compatibility: {e}")
-    print("Some old import statements may not work. Consider updating imports.")
 
-except Exception as e:
-    print(f"❌ Error setting up backwards compatibility: {e}")
+_finder = None
 
 
 def enable_legacy_imports():
@@ -91,8 +110,16 @@ def enable_legacy_imports():
     Call this function to ensure legacy import statements work.
     This is automatically called when this module is imported.
     """
-    pass
+    global _finder
+    if _finder is not None and _finder in sys.meta_path:
+        return
+    try:
+        _finder = LegacyModuleFinder(MODULE_ALIASES)
+        sys.meta_path.insert(0, _finder)
+        print("✅ Backwards compatibility layer loaded successfully")
+    except Exception as e:
+        print(f"❌ Error setting up backwards compatibility: {e}")
 
 
 # Auto-enable when imported
-enable_legacy_imports()
\ No newline at end of file
+enable_legacy_imports()
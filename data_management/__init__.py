@@ -4,6 +4,8 @@ from .configuration_manager import config_manager
 from .node_data_manager import SystemDataManager, NodeData, system_data_manager
 from .node_mapping_manager import get_node_id_for_compartment, NODE_NAME_TO_ID
 from .unified_threshold_manager import unified_threshold_manager
+from .event_journal import event_journal
+from .module_routing import module_routing_table
 
 # Maintain backwards compatibility
 import sys
@@ -0,0 +1,493 @@
+"""
+Nhật ký sự kiện lưu trên đĩa (append-only, SQLite).
+
+Mọi bản ghi log (qua log sink) và CAN frame nhận được đều được đưa vào hàng
+đợi không khóa, sau đó một writer thread ghi theo lô và commit (fsync) theo
+chu kỳ. File được xoay vòng theo kích thước; tra cứu theo thời gian, mức log,
+CAN ID và node_id dùng index và phân trang kiểu keyset, nên không cần giữ
+toàn bộ lịch sử trong RAM. Mặc định mọi CAN frame đều được ghi; lấy mẫu theo
+ID (set_can_sampling) chỉ bật khi được cấu hình. Thời gian lưu thực tế theo
+tải bus được ghi chú ở JournalDefaults.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from common.constants import JournalDefaults
+from common.log_sink import LogRecord, log_sink
+
+KIND_LOG = 0
+KIND_CAN = 1
+
+# Mức hiển thị của bản ghi CAN frame
+CAN_FRAME_LEVEL = "CAN"
+
+_SEGMENT_PREFIX = "events_"
+_SEGMENT_SUFFIX = ".db"
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        kind INTEGER NOT NULL,
+        level TEXT,
+        source TEXT,
+        can_id INTEGER,
+        node_id TEXT,
+        message TEXT,
+        data BLOB
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_level_ts ON events(level, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_can_ts ON events(can_id, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_node_ts ON events(node_id, ts)",
+)
+
+_INSERT = ("INSERT INTO events (ts, kind, level, source, can_id, node_id, message, data) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+class JournalCursor(NamedTuple):
+    """Vị trí tiếp tục tra cứu (keyset): segment và (ts, id) của dòng cuối trang."""
+    segment: str
+    ts: float
+    row_id: int
+
+
+class JournalPage(NamedTuple):
+    """Một trang kết quả tra cứu (mới nhất trước)."""
+    records: List[LogRecord]
+    cursor: Optional[JournalCursor]
+
+
+class JournalQuery(NamedTuple):
+    """Điều kiện tra cứu nhật ký. Trường None = không lọc."""
+    start: Optional[float] = None
+    end: Optional[float] = None
+    levels: Optional[Sequence[str]] = None
+    can_id: Optional[int] = None
+    node_id: Optional[str] = None
+    text: Optional[str] = None
+
+
+def format_can_frame(can_id: int, data: bytes, node_id: Optional[str] = None) -> str:
+    """Dạng văn bản của một CAN frame trong nhật ký."""
+    text = f"CAN 0x{can_id:03X} [{' '.join(f'{b:02X}' for b in data)}]"
+    if node_id:
+        text += f" {node_id}"
+    return text
+
+
+class EventJournal:
+    """Nhật ký sự kiện append-only với writer thread riêng."""
+
+    def __init__(self, directory: Optional[str] = None,
+                 flush_interval: float = JournalDefaults.FLUSH_INTERVAL_S,
+                 max_segment_bytes: int = JournalDefaults.MAX_SEGMENT_BYTES,
+                 max_segments: int = JournalDefaults.MAX_SEGMENTS,
+                 queue_maxlen: int = JournalDefaults.QUEUE_MAXLEN):
+        if directory is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            directory = os.path.join(base_dir, JournalDefaults.DIRECTORY)
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self.record_can_frames = JournalDefaults.RECORD_CAN_FRAMES
+
+        self._queue = deque(maxlen=queue_maxlen)
+        self._queue_maxlen = queue_maxlen
+        self._node_resolver: Optional[Callable[[int], Optional[str]]] = None
+        self._can_sample_every: Dict[int, int] = {}
+        self._can_sample_counts: Dict[int, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._segment_path: Optional[str] = None
+        # Khoảng thời gian (min_ts, max_ts) của các segment đã đóng
+        self._segment_bounds: Dict[str, tuple] = {}
+
+        self.written = 0
+        self.dropped = 0
+
+    # ------------------------------------------------------------------
+    # Vòng đời
+    # ------------------------------------------------------------------
+    def start(self):
+        """Khởi động writer thread và bắt đầu nhận bản ghi từ log sink."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="EventJournal", daemon=True)
+        self._thread.start()
+        log_sink.add_listener(self.record_log)
+
+    def stop(self, timeout: float = 5.0):
+        """Ghi nốt hàng đợi, đóng file và dừng writer thread."""
+        log_sink.remove_listener(self.record_log)
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def set_node_resolver(self, resolver: Optional[Callable[[int], Optional[str]]]):
+        """Hàm tra node_id từ CAN ID (dùng cho CAN frame và log có can_id)."""
+        self._node_resolver = resolver
+
+    def set_can_sampling(self, can_id: int, every_n: int):
+        """Chỉ ghi 1 trên `every_n` CAN frame của một CAN ID (0 = không ghi)."""
+        if every_n == 1:
+            self._can_sample_every.pop(can_id, None)
+        else:
+            self._can_sample_every[can_id] = max(0, every_n)
+        self._can_sample_counts.pop(can_id, None)
+
+    def set_can_sampling_range(self, start_id: int, end_id: int, every_n: int):
+        """Áp dụng `set_can_sampling` cho dải CAN ID [start_id, end_id]."""
+        for can_id in range(start_id, end_id + 1):
+            self.set_can_sampling(can_id, every_n)
+
+    # ------------------------------------------------------------------
+    # Producer (mọi thread)
+    # ------------------------------------------------------------------
+    def record_log(self, record: LogRecord):
+        """Đưa một bản ghi log vào hàng đợi ghi."""
+        if len(self._queue) >= self._queue_maxlen:
+            self.dropped += 1
+        self._queue.append((KIND_LOG, record))
+
+    def record_frames(self, frames: Iterable):
+        """Đưa một burst CAN frame vào hàng đợi ghi."""
+        if not self.record_can_frames or self._thread is None:
+            return
+        before = len(self._queue)
+        now = time.time()
+        sample_every = self._can_sample_every
+        if sample_every:
+            # Chỉ receiver thread gọi hàm này nên bộ đếm không cần lock
+            counts = self._can_sample_counts
+            kept = []
+            for msg in frames:
+                every = sample_every.get(msg.arbitration_id)
+                if every is not None:
+                    count = counts.get(msg.arbitration_id, 0)
+                    counts[msg.arbitration_id] = count + 1
+                    if not every or count % every:
+                        continue
+                kept.append(msg)
+            frames = kept
+        entries = [(KIND_CAN, msg.timestamp or now, msg.arbitration_id, bytes(msg.data))
+                   for msg in frames]
+        overflow = before + len(entries) - self._queue_maxlen
+        if overflow > 0:
+            self.dropped += overflow
+        self._queue.extend(entries)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _run(self):
+        try:
+            self._open_segment()
+        except Exception as e:
+            print(f"[EventJournal] Không thể mở nhật ký tại {self.directory}: {e}")
+            return
+
+        while not self._stop_event.wait(self.flush_interval):
+            self._flush_safely()
+        self._flush_safely()
+        self._close_segment()
+
+    def _flush_safely(self):
+        try:
+            self._flush()
+        except Exception as e:
+            print(f"[EventJournal] Lỗi ghi nhật ký: {e}")
+
+    def _flush(self):
+        entries = []
+        popleft = self._queue.popleft
+        try:
+            for _ in range(len(self._queue)):
+                entries.append(popleft())
+        except IndexError:
+            pass
+        if not entries:
+            return
+
+        resolver = self._node_resolver
+        node_cache: Dict[int, Optional[str]] = {}
+
+        def node_for(can_id):
+            if can_id is None or resolver is None:
+                return None
+            if can_id in node_cache:
+                return node_cache[can_id]
+            node_id = node_cache[can_id] = resolver(can_id)
+            return node_id
+
+        rows = []
+        for entry in entries:
+            if entry[0] == KIND_LOG:
+                record = entry[1]
+                rows.append((record.timestamp, KIND_LOG, record.level, record.source,
+                             record.can_id, node_for(record.can_id), record.message, None))
+            else:
+                _, ts, can_id, data = entry
+                rows.append((ts, KIND_CAN, CAN_FRAME_LEVEL, None, can_id, node_for(can_id), None, data))
+
+        # Một transaction cho cả lô; synchronous=FULL nên commit sẽ fsync
+        with self._conn:
+            self._conn.executemany(_INSERT, rows)
+        self.written += len(rows)
+
+        if self._segment_size() >= self.max_segment_bytes:
+            self._rotate()
+
+    def _open_segment(self):
+        now = time.time()
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(now))
+        path = os.path.join(self.directory,
+                            f"{_SEGMENT_PREFIX}{stamp}_{int(now * 1000) % 1000:03d}{_SEGMENT_SUFFIX}")
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        self._conn = conn
+        self._segment_path = path
+
+    def _close_segment(self):
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.close()
+        except sqlite3.Error as e:
+            print(f"[EventJournal] Lỗi đóng segment {self._segment_path}: {e}")
+        self._conn = None
+
+    def _segment_size(self) -> int:
+        size = 0
+        for path in (self._segment_path, self._segment_path + "-wal"):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _rotate(self):
+        self._close_segment()
+        self._open_segment()
+        segments = self.segments()
+        for path in segments[:max(0, len(segments) - self.max_segments)]:
+            self._segment_bounds.pop(path, None)
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(path + suffix)
+                except OSError:
+                    pass
+
+    # ------------------------------------------------------------------
+    # Tra cứu
+    # ------------------------------------------------------------------
+    def segments(self) -> List[str]:
+        """Danh sách file segment, cũ nhất trước."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [os.path.join(self.directory, name) for name in sorted(names)
+                if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX)]
+
+    def search(self, query: JournalQuery = JournalQuery(),
+               page_size: int = JournalDefaults.PAGE_SIZE,
+               cursor: Optional[JournalCursor] = None) -> JournalPage:
+        """Tra cứu nhật ký, mới nhất trước.
+
+        Args:
+            query: Điều kiện lọc
+            page_size: Số bản ghi tối đa mỗi trang
+            cursor: Vị trí tiếp tục (từ trang trước), None = từ đầu
+
+        Returns:
+            JournalPage: bản ghi và cursor cho trang kế tiếp (None nếu hết)
+        """
+        where, params = self._build_where(query)
+        records: List[LogRecord] = []
+        last = None
+
+        for path in reversed(self.segments()):
+            segment = os.path.basename(path)
+            if cursor is not None and segment > cursor.segment:
+                continue
+            if not self._segment_overlaps(path, query):
+                continue
+
+            clauses, args = list(where), list(params)
+            if cursor is not None and segment == cursor.segment:
+                clauses.append("(ts < ? OR (ts = ? AND id < ?))")
+                args.extend((cursor.ts, cursor.ts, cursor.row_id))
+            sql = "SELECT id, ts, kind, level, source, can_id, node_id, message, data FROM events"
+            if clauses:
+                sql += " WHERE " + " AND ".join(clauses)
+            sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+            args.append(page_size - len(records))
+
+            try:
+                conn = sqlite3.connect(path, timeout=1.0)
+                try:
+                    rows = conn.execute(sql, args).fetchall()
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"[EventJournal] Lỗi tra cứu {segment}: {e}")
+                continue
+
+            for row_id, ts, kind, level, source, can_id, node_id, message, data in rows:
+                if kind == KIND_CAN:
+                    message = format_can_frame(can_id, data or b"", node_id)
+                records.append(LogRecord(ts, level, source or "can_rx", message, can_id))
+                last = JournalCursor(segment, ts, row_id)
+
+            if len(records) >= page_size:
+                return JournalPage(records, last)
+
+        return JournalPage(records, None)
+
+    @staticmethod
+    def _build_where(query: JournalQuery):
+        clauses, params = [], []
+        if query.start is not None:
+            clauses.append("ts >= ?")
+            params.append(query.start)
+        if query.end is not None:
+            clauses.append("ts <= ?")
+            params.append(query.end)
+        if query.levels:
+            clauses.append(f"level IN ({', '.join('?' * len(query.levels))})")
+            params.extend(query.levels)
+        if query.can_id is not None:
+            clauses.append("can_id = ?")
+            params.append(query.can_id)
+        if query.node_id:
+            clauses.append("node_id = ?")
+            params.append(query.node_id)
+        if query.text:
+            escaped = query.text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("message LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        return clauses, params
+
+    def _segment_overlaps(self, path: str, query: JournalQuery) -> bool:
+        """Bỏ qua segment nằm ngoài khoảng thời gian tra cứu."""
+        if query.start is None and query.end is None:
+            return True
+        bounds = self._segment_bounds.get(path)
+        if bounds is None:
+            try:
+                conn = sqlite3.connect(path, timeout=1.0)
+                try:
+                    bounds = conn.execute("SELECT MIN(ts), MAX(ts) FROM events").fetchone()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                return True
+            # Segment đang ghi còn thay đổi nên không cache
+            if path != self._segment_path:
+                self._segment_bounds[path] = bounds
+        min_ts, max_ts = bounds
+        if min_ts is None:
+            return False
+        if query.start is not None and max_ts < query.start:
+            return False
+        if query.end is not None and min_ts > query.end:
+            return False
+        return True
+
+    def stats(self) -> Dict[str, object]:
+        """Thống kê writer."""
+        return {
+            'pending': len(self._queue),
+            'written': self.written,
+            'dropped': self.dropped,
+            'segment': self._segment_path,
+        }
+
+
+_RELATIVE_TIME = re.compile(r"^-(\d+(?:\.\d+)?)([smhd])$")
+_TIME_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def _parse_time(value: str, now: float) -> float:
+    """Chuyển '-30m', '-2h', '14:05', '2024-05-01T14:05' thành epoch."""
+    match = _RELATIVE_TIME.match(value)
+    if match:
+        return now - float(match.group(1)) * _TIME_UNITS[match.group(2)]
+    for fmt in ("%H:%M", "%H:%M:%S"):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        today = datetime.fromtimestamp(now)
+        parsed = today.replace(hour=parsed.hour, minute=parsed.minute,
+                               second=parsed.second, microsecond=0)
+        if parsed > today:
+            parsed -= timedelta(days=1)
+        return parsed.timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+def parse_journal_query(text: str, now: Optional[float] = None) -> JournalQuery:
+    """Phân tích chuỗi tra cứu của người dùng.
+
+    Cú pháp: các token `key:value` và phần còn lại là chuỗi tìm trong nội dung.
+        level:ERROR[,WARNING]  can:0x300  node:NODE-001
+        from:-2h  to:14:30  (hoặc ISO 2024-05-01T14:05)
+
+    Tìm theo nội dung không dùng được index, nên nếu không có from: thì chỉ
+    tìm trong JournalDefaults.TEXT_SEARCH_WINDOW_S gần nhất (trước `to:` nếu có).
+
+    Raises:
+        ValueError: Nếu giá trị của token không hợp lệ
+    """
+    now = time.time() if now is None else now
+    fields = {}
+    words = []
+    for token in text.split():
+        key, sep, value = token.partition(":")
+        key = key.lower()
+        if not sep or not value or key not in ("level", "can", "node", "from", "to"):
+            words.append(token)
+            continue
+        if key == "level":
+            fields['levels'] = tuple(v.upper() for v in value.split(",") if v)
+        elif key == "can":
+            fields['can_id'] = int(value, 0)
+        elif key == "node":
+            fields['node_id'] = value
+        elif key == "from":
+            fields['start'] = _parse_time(value, now)
+        else:
+            fields['end'] = _parse_time(value, now)
+    if words:
+        fields['text'] = " ".join(words)
+        if 'start' not in fields:
+            fields['start'] = fields.get('end', now) - JournalDefaults.TEXT_SEARCH_WINDOW_S
+    return JournalQuery(**fields)
+
+
+# Global instance (writer thread được khởi động trong main.py)
+event_journal = EventJournal()
@@ -10,6 +10,11 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 from dataclasses import dataclass, asdict
 
+import numpy as np
+
+from .telemetry_store import telemetry_store
+from .threshold_matrix import threshold_matrix
+
 @dataclass
 class ModuleParameters:
     """Class lưu trữ các thông số của một module."""
@@ -36,9 +41,17 @@ class ModuleData:
         self.node_id = node_id
         self.config_id = config_id  # ID từ config file (ví dụ: MOD-001)
         self.parameters = ModuleParameters()
-        self.parameter_history: List[Dict[str, Any]] = []
+        # Lịch sử thông số nằm trong kho dạng cột dùng chung (ring buffer NumPy)
+        self._history_slot = telemetry_store.register((node_id, module_id))
+        telemetry_store.reset(self._history_slot)
+        threshold_matrix.register(self._history_slot, name)
         self.status = "normal"  # normal, error
-        self.error_messages: List[str] = []
+        # Bitmask lỗi (xem threshold_matrix); thông báo lỗi được định dạng khi cần
+        self.error_mask = 0
+        self._error_messages: Optional[List[str]] = []
+        # Trạng thái lỗi mà node cha đang tính cho module này
+        self._counted_error = False
+        self._node = None
         self.last_update = time.time()
         
         # Ngưỡng validation (sẽ được set từ config)
@@ -54,131 +67,108 @@ class ModuleData:
             if hasattr(self.parameters, key):
                 setattr(self.parameters, key, value)
         
-        # Lưu vào lịch sử
-        self.parameter_history.append({
-            'timestamp': datetime.now().isoformat(),
-            'time_seconds': time.time(),
-            'parameters': self.parameters.to_dict()
-        })
-        
-        # Giữ lại 1000 records gần nhất
-        if len(self.parameter_history) > 1000:
-            self.parameter_history.pop(0)
+        # Lưu vào lịch sử (ghi O(1) vào ring buffer, giữ 1000 mẫu gần nhất)
+        now = time.time()
+        params = self.parameters
+        telemetry_store.append(self._history_slot, now, params.voltage, params.current,
+                               params.power, params.temperature)
             
-        self.last_update = time.time()
+        self.last_update = now
         self._check_status()
         
+    def get_history(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Lịch sử N mẫu gần nhất dạng cột (view, không sao chép).
+        
+        Returns:
+            {'t', 'voltage', 'current', 'power', 'temperature'}: mảng cũ nhất trước
+        """
+        return telemetry_store.window_all(self._history_slot, n)
+        
+    def get_history_stats(self, parameter: str, n: Optional[int] = None) -> Optional[Dict[str, float]]:
+        """min/max/mean của một thông số trong N mẫu gần nhất."""
+        return telemetry_store.window_stats(self._history_slot, parameter, n)
+        
+    @property
+    def parameter_history(self) -> List[Dict[str, Any]]:
+        """Lịch sử dạng list dict như trước (tương thích, sao chép toàn bộ - không dùng trong vòng lặp nóng)."""
+        history = self.get_history()
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(t).isoformat(),
+                'time_seconds': t,
+                'parameters': {
+                    'voltage': float(v), 'current': float(c),
+                    'power': float(p), 'temperature': float(temp)
+                }
+            }
+            for t, v, c, p, temp in zip(history['t'].tolist(), history['voltage'], history['current'],
+                                        history['power'], history['temperature'])
+        ]
+        
+    def _parameter_values(self):
+        params = self.parameters
+        return (params.voltage, params.current, params.power, params.temperature)
+
     def _check_status(self):
-        """Kiểm tra trạng thái module dựa trên thông số và ngưỡng từ threshold manager."""
-        self.clear_errors()  # Xóa lỗi cũ trước
-        has_errors = False
+        """Kiểm tra trạng thái module dựa trên ma trận ngưỡng biên dịch sẵn."""
+        self.apply_error_mask(threshold_matrix.evaluate(self._history_slot, self._parameter_values()))
+
+    def apply_error_mask(self, mask: int):
+        """Cập nhật trạng thái từ bitmask lỗi (thông báo lỗi sẽ được định dạng lại khi cần)."""
+        self.error_mask = int(mask)
+        self._error_messages = None
+
+        # Xác định trạng thái cuối cùng - chỉ normal hoặc error
+        self.status = "error" if mask else "normal"
+
+        # Chỉ báo node cha khi trạng thái thực sự đổi
+        self._sync_parent_error(bool(mask))
+
+    @property
+    def error_messages(self) -> List[str]:
+        """Danh sách thông báo lỗi (định dạng từ bitmask ở lần truy cập đầu tiên)."""
+        if self._error_messages is None:
+            self._error_messages = threshold_matrix.format_errors(
+                self._history_slot, self.error_mask, self._parameter_values()
+            )
+        return self._error_messages
+
+    @error_messages.setter
+    def error_messages(self, messages: List[str]):
+        self._error_messages = list(messages)
+        self._sync_parent_error(self.status == "error" or bool(self._error_messages))
 
-        # Import unified threshold manager để lấy ngưỡng mới nhất
-        try:
-            from .unified_threshold_manager import is_parameter_normal, get_threshold_for_parameter
-
-            # Kiểm tra điện áp
-            if not is_parameter_normal(self.name, "Điện áp", self.parameters.voltage):
-                threshold = get_threshold_for_parameter(self.name, "Điện áp")
-                min_val, max_val = threshold['min_normal'], threshold['max_normal']
-                if self.parameters.voltage < min_val:
-                    has_errors = True
-                    self.add_error(f"Điện áp thấp ({self.parameters.voltage:.1f}V < {min_val}V)")
-                elif self.parameters.voltage > max_val:
-                    has_errors = True
-                    self.add_error(f"Điện áp cao ({self.parameters.voltage:.1f}V > {max_val}V)")
-
-            # Kiểm tra dòng điện
-            if not is_parameter_normal(self.name, "Dòng điện", self.parameters.current):
-                threshold = get_threshold_for_parameter(self.name, "Dòng điện")
-                min_val, max_val = threshold['min_normal'], threshold['max_normal']
-                if self.parameters.current < min_val:
-                    has_errors = True
-                    self.add_error(f"Dòng điện thấp ({self.parameters.current:.1f}A < {min_val}A)")
-                elif self.parameters.current > max_val:
-                    has_errors = True
-                    self.add_error(f"Dòng điện cao ({self.parameters.current:.1f}A > {max_val}A)")
-
-            # Kiểm tra công suất
-            if not is_parameter_normal(self.name, "Công suất", self.parameters.power):
-                threshold = get_threshold_for_parameter(self.name, "Công suất")
-                min_val, max_val = threshold['min_normal'], threshold['max_normal']
-                if self.parameters.power < min_val:
-                    has_errors = True
-                    self.add_error(f"Công suất thấp ({self.parameters.power:.1f}W < {min_val}W)")
-                elif self.parameters.power > max_val:
-                    has_errors = True
-                    self.add_error(f"Công suất cao ({self.parameters.power:.1f}W > {max_val}W)")
-
-            # Kiểm tra nhiệt độ
-            if not is_parameter_normal(self.name, "Nhiệt độ", self.parameters.temperature):
-                threshold = get_threshold_for_parameter(self.name, "Nhiệt độ")
-                min_val, max_val = threshold['min_normal'], threshold['max_normal']
-                if self.parameters.temperature < min_val:
-                    has_errors = True
-                    self.add_error(f"Nhiệt độ thấp ({self.parameters.temperature:.1f}°C < {min_val}°C)")
-                elif self.parameters.temperature > max_val:
-                    has_errors = True
-                    self.add_error(f"Nhiệt độ cao ({self.parameters.temperature:.1f}°C > {max_val}°C)")
-
-            # Xác định trạng thái cuối cùng - chỉ normal hoặc error
-            if has_errors:
-                self.status = "error"
-            else:
-                self.status = "normal"
-
-            # Cập nhật trạng thái lỗi của node parent
-            self._update_parent_node_status()
-
-        except ImportError:
-            # Fallback to old system if threshold manager not available
-            has_errors = False
-
-            if self.parameters.voltage < self.min_voltage:
-                has_errors = True
-                self.add_error(f"Điện áp thấp ({self.parameters.voltage:.1f}V < {self.min_voltage}V)")
-            if self.parameters.voltage > self.max_voltage:
-                has_errors = True
-                self.add_error(f"Điện áp cao ({self.parameters.voltage:.1f}V > {self.max_voltage}V)")
-            if self.parameters.current > self.max_current:
-                has_errors = True
-                self.add_error(f"Dòng điện cao ({self.parameters.current:.1f}A > {self.max_current}A)")
-            if self.parameters.temperature > self.max_temperature:
-                has_errors = True
-                self.add_error(f"Nhiệt độ cao ({self.parameters.temperature:.1f}°C > {self.max_temperature}°C)")
-
-            # Xác định trạng thái cuối cùng - chỉ normal hoặc error
-            if has_errors:
-                self.status = "error"
-            else:
-                self.status = "normal"
-
-            # Cập nhật trạng thái lỗi của node parent
-            self._update_parent_node_status()
-    
     def add_error(self, message: str):
         """Thêm thông báo lỗi."""
-        if message not in self.error_messages:
-            self.error_messages.append(message)
+        messages = self.error_messages
+        if message not in messages:
+            messages.append(message)
+        self._sync_parent_error(True)
             
     def clear_errors(self):
         """Xóa tất cả lỗi."""
-        self.error_messages.clear()
-
-    def _update_parent_node_status(self):
-        """Cập nhật trạng thái lỗi của node chứa module này."""
-        try:
-            from .node_data_manager import system_data_manager
-
-            # Lấy node parent
-            parent_node = system_data_manager.get_node(self.node_id)
-            if parent_node:
-                # Cập nhật trạng thái lỗi của node dựa trên modules
-                parent_node.update_error_status_from_modules()
-
-        except ImportError:
-            # Không thể import system_data_manager
-            pass
+        self._error_messages = []
+        self._sync_parent_error(self.status == "error")
+
+    def _sync_parent_error(self, in_error: bool):
+        """Cập nhật số module lỗi của node cha khi module chuyển lỗi <-> bình thường."""
+        if in_error == self._counted_error:
+            return
+        self._counted_error = in_error
+        node = self._parent_node()
+        if node is not None:
+            node.module_status_changed(in_error)
+
+    def _parent_node(self):
+        """Node chứa module này (tra một lần rồi giữ lại)."""
+        if self._node is None:
+            try:
+                from .node_data_manager import system_data_manager
+                self._node = system_data_manager.get_node(self.node_id)
+            except ImportError:
+                # Không thể import system_data_manager
+                pass
+        return self._node
         
     def get_latest_parameters(self) -> ModuleParameters:
         """Lấy thông số mới nhất."""
@@ -300,6 +290,17 @@ class ModuleManager:
         # Vô hiệu hóa simulation - dùng dữ liệu thật từ CAN
         pass
                 
+    def refresh_all_statuses(self):
+        """Kiểm tra lại trạng thái mọi module trong một lần tính vector hóa."""
+        modules = [module for node_modules in self.modules.values() for module in node_modules.values()]
+        if not modules:
+            return
+        slots = np.fromiter((module._history_slot for module in modules), dtype=np.int64, count=len(modules))
+        values = np.array([module._parameter_values() for module in modules], dtype=np.float64)
+        masks = threshold_matrix.evaluate_all(values, slots)
+        for module, mask in zip(modules, masks.tolist()):
+            module.apply_error_mask(mask)
+
     def get_modules_by_status(self, status: str) -> List[ModuleData]:
         """Lấy tất cả modules theo trạng thái."""
         result = []
@@ -357,6 +358,10 @@ class ModuleManager:
                         print(f"Warning: Error importing module {module_id}: {e}")
 
             print(f"Successfully imported {imported_count} modules from {filepath}")
+
+            # Các đối tượng ModuleData đã bị thay, dựng lại bảng định tuyến CAN
+            from .module_routing import module_routing_table
+            module_routing_table.rebuild()
             return True
 
         except json.JSONDecodeError as e:
@@ -0,0 +1,84 @@
+"""
+Bảng định tuyến CAN telemetry tới module.
+
+Bảng được biên dịch một lần từ `node_index_mapping` trong
+config/unified_module_config.json và danh sách module của ModuleManager:
+(CAN ID, byte module) trỏ thẳng tới đối tượng ModuleData, nên mỗi frame chỉ
+cần một lần tra dict và một lần truy cập tuple. Khi cấu hình được tải lại,
+bảng mới được dựng xong rồi mới thay thế bảng cũ bằng một phép gán duy nhất,
+nên receiver thread không bao giờ thấy bảng dựng dở.
+"""
+
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from communication.can_config import CAN_ID_MODULE_DATA_START, CAN_ID_MODULE_DATA_END
+from .module_data_manager import ModuleData, module_manager
+from .unified_threshold_manager import unified_threshold_manager
+
+
+class ModuleRoutes(NamedTuple):
+    """Bảng định tuyến đã biên dịch (không thay đổi sau khi dựng)."""
+    # {can_id: (ModuleData theo thứ tự byte module, ...)}
+    slots: Dict[int, Tuple[ModuleData, ...]]
+    # {can_id: node_id}
+    nodes: Dict[int, str]
+
+
+class ModuleRoutingTable:
+    """Tra ModuleData từ CAN ID và byte module trong O(1)."""
+
+    def __init__(self, can_id_start: int = CAN_ID_MODULE_DATA_START,
+                 can_id_end: int = CAN_ID_MODULE_DATA_END):
+        self.can_id_start = can_id_start
+        self.can_id_end = can_id_end
+        self._routes = ModuleRoutes({}, {})
+        self.rebuild()
+
+    def rebuild(self) -> ModuleRoutes:
+        """Dựng lại bảng từ cấu hình hiện tại và thay thế bảng cũ."""
+        node_index_mapping = unified_threshold_manager.config_data.get('node_index_mapping', {})
+        slots = {}
+        nodes = {}
+        for node_id, node_info in node_index_mapping.items():
+            index = node_info.get('index')
+            if index is None:
+                continue
+            can_id = self.can_id_start + index
+            if can_id > self.can_id_end:
+                print(f"[ModuleRouting] Node '{node_id}' index {index} nằm ngoài dải CAN module")
+                continue
+            if can_id in nodes:
+                print(f"[ModuleRouting] Trùng index {index}: '{nodes[can_id]}' và '{node_id}', giữ '{nodes[can_id]}'")
+                continue
+            nodes[can_id] = node_id
+            # Byte module là vị trí của module trong node (theo thứ tự cấu hình)
+            slots[can_id] = tuple(module_manager.get_node_modules(node_id).values())
+
+        routes = ModuleRoutes(slots, nodes)
+        self._routes = routes
+        return routes
+
+    def lookup(self, can_id: int, module_index: int) -> Optional[ModuleData]:
+        """ModuleData cho (CAN ID, byte module), hoặc None nếu không định tuyến được."""
+        modules = self._routes.slots.get(can_id)  # một lần đọc snapshot
+        if modules is None or module_index >= len(modules):
+            return None
+        return modules[module_index]
+
+    def node_id_for(self, can_id: int) -> Optional[str]:
+        """node_id ứng với CAN ID module telemetry."""
+        return self._routes.nodes.get(can_id)
+
+    def module_count(self, can_id: int) -> int:
+        """Số module của node ứng với CAN ID."""
+        return len(self._routes.slots.get(can_id, ()))
+
+    @property
+    def routes(self) -> ModuleRoutes:
+        """Bảng hiện tại (snapshot nhất quán)."""
+        return self._routes
+
+
+# Global instance
+module_routing_table = ModuleRoutingTable()
+unified_threshold_manager.add_reload_listener(module_routing_table.rebuild)
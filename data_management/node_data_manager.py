@@ -4,7 +4,7 @@ Mỗi node có thông tin điện áp theo thời gian, thông báo lỗi và m
 """
 
 import time
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List
 from datetime import datetime
 
 class NodeData:
@@ -18,6 +18,9 @@ class NodeData:
         self.error_messages: List[str] = []
         self.error_codes: List[str] = []
         self.has_error = False
+        # Số module đang lỗi, cập nhật tăng dần khi module đổi trạng thái
+        self.module_error_count = 0
+        self._status_listener = None
         self.last_update = time.time()
         
     def add_voltage_reading(self, voltage: float):
@@ -39,7 +42,7 @@ class NodeData:
         """Thêm lỗi mới."""
         self.error_codes.append(error_code)
         self.error_messages.append(error_message)
-        self.has_error = True
+        self._set_has_error(True)
         
         # Giữ lại 50 lỗi gần nhất
         if len(self.error_codes) > 50:
@@ -50,29 +53,33 @@ class NodeData:
         """Xóa tất cả lỗi."""
         self.error_codes.clear()
         self.error_messages.clear()
-        self.has_error = False
+        self._set_has_error(self.module_error_count > 0)
+
+    def _set_has_error(self, has_error: bool):
+        """Đặt trạng thái lỗi, chỉ thông báo khi trạng thái thực sự đổi."""
+        if has_error == self.has_error:
+            return
+        self.has_error = has_error
+        if self._status_listener is not None:
+            self._status_listener(self)
+
+    def module_status_changed(self, in_error: bool):
+        """Một module của node vừa chuyển sang lỗi (True) hoặc hết lỗi (False)."""
+        self.module_error_count = max(0, self.module_error_count + (1 if in_error else -1))
+        self._set_has_error(self.module_error_count > 0 or bool(self.error_messages))
 
     def update_error_status_from_modules(self):
-        """Cập nhật trạng thái lỗi của node dựa trên trạng thái của các module."""
+        """Đồng bộ lại số module lỗi bằng cách đếm toàn bộ module của node.
+
+        Không cần gọi trong luồng telemetry (số module lỗi đã được cập nhật tăng
+        dần); dùng để kiểm tra nhất quán sau các thay đổi hàng loạt.
+        """
         try:
             from .module_data_manager import module_manager
 
-            # Lấy tất cả modules của node này
             node_modules = module_manager.get_node_modules(self.node_id)
-
-            # Kiểm tra xem có module nào có lỗi không
-            has_module_errors = False
-            for module in node_modules.values():
-                if module.status == "error" or module.error_messages:
-                    has_module_errors = True
-                    break
-
-            # Cập nhật trạng thái lỗi node
-            if has_module_errors:
-                self.has_error = True
-            elif not has_module_errors and not self.error_messages:
-                # Clear lỗi nếu không có lỗi module và không có lỗi node riêng
-                self.has_error = False
+            self.module_error_count = sum(1 for module in node_modules.values() if module._counted_error)
+            self._set_has_error(self.module_error_count > 0 or bool(self.error_messages))
 
         except ImportError:
             # Không thể import module_manager
@@ -95,6 +102,9 @@ class SystemDataManager:
     
     def __init__(self):
         self.nodes: Dict[str, NodeData] = {}
+        # Tăng mỗi khi một node đổi trạng thái lỗi (UI so sánh để biết cần vẽ lại)
+        self.status_version = 0
+        self._status_listeners: List[Callable[[str, bool], None]] = []
         self._initialize_nodes()
         
     def _initialize_nodes(self):
@@ -147,7 +157,30 @@ class SystemDataManager:
         # Tạo tất cả nodes
         all_nodes = compartment1_nodes + compartment2_nodes + compartment3_nodes + sight_column_nodes + motor_cabinets
         for node_id, name, config_id in all_nodes:
-            self.nodes[node_id] = NodeData(node_id, name, config_id)
+            node = NodeData(node_id, name, config_id)
+            node._status_listener = self._on_node_status_changed
+            self.nodes[node_id] = node
+
+    def add_status_listener(self, listener: Callable[[str, bool], None]):
+        """Đăng ký hàm nhận (node_id, has_error) mỗi khi một node đổi trạng thái lỗi.
+
+        Listener được gọi trên thread cập nhật dữ liệu (thường là CAN receiver).
+        """
+        if listener not in self._status_listeners:
+            self._status_listeners.append(listener)
+
+    def remove_status_listener(self, listener: Callable[[str, bool], None]):
+        """Hủy đăng ký listener."""
+        if listener in self._status_listeners:
+            self._status_listeners.remove(listener)
+
+    def _on_node_status_changed(self, node: NodeData):
+        self.status_version += 1
+        for listener in list(self._status_listeners):
+            try:
+                listener(node.node_id, node.has_error)
+            except Exception as e:
+                print(f"Lỗi trong status listener của node {node.node_id}: {e}")
             
     def get_node(self, node_id: str) -> NodeData:
         """Lấy node theo ID."""
@@ -0,0 +1,170 @@
+"""
+Kho lịch sử telemetry dạng cột (NumPy ring buffer).
+
+Mỗi thông số (t, voltage, current, power, temperature) là một mảng NumPy cấp
+phát sẵn, mỗi module chiếm một hàng (slot). Mỗi mẫu được ghi hai lần (vị trí
+i và i + capacity) để mọi cửa sổ N mẫu gần nhất luôn là một lát cắt liên tục:
+ghi O(1), đọc cửa sổ không sao chép, thống kê min/max/mean vector hóa.
+"""
+
+import threading
+import warnings
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from common.constants import TelemetryDefaults
+
+COLUMNS = ("t", "voltage", "current", "power", "temperature")
+_COLUMN_INDEX = {name: i for i, name in enumerate(COLUMNS)}
+
+
+class TelemetryStore:
+    """Ring buffer dạng cột cho lịch sử thông số của nhiều module.
+
+    Một writer (receiver thread) và nhiều reader (GUI) có thể dùng đồng thời;
+    reader đọc view trực tiếp nên có thể thấy mẫu đang được ghi dở ở cuối cửa sổ.
+    Các mảng được công bố cùng nhau trong một tuple bất biến `(data, heads,
+    counts)`; `append` và reader chỉ đọc tuple này một lần, nên việc mở rộng
+    (register) không bao giờ làm lệch mảng dữ liệu với head/count. Mẫu được ghi
+    vào khối cũ đúng lúc đang sao chép có thể bị bỏ; INITIAL_SLOTS cấp phát sẵn
+    đủ cho cấu hình thông thường để đường ghi không gặp trường hợp này.
+    """
+
+    def __init__(self, capacity: int = TelemetryDefaults.HISTORY_CAPACITY,
+                 initial_slots: int = TelemetryDefaults.INITIAL_SLOTS):
+        if capacity <= 0:
+            raise ValueError(f"Dung lượng lịch sử không hợp lệ: {capacity}")
+        self.capacity = capacity
+        self._slots: Dict[Hashable, int] = {}
+        self._register_lock = threading.Lock()
+        self._allocate(max(1, initial_slots))
+
+    def _allocate(self, n_slots: int):
+        data = np.zeros((len(COLUMNS), n_slots, 2 * self.capacity), dtype=np.float64)
+        heads = np.zeros(n_slots, dtype=np.int64)
+        counts = np.zeros(n_slots, dtype=np.int64)
+        old = getattr(self, '_state', None)
+        if old is not None:
+            old_data, old_heads, old_counts = old
+            used = old_data.shape[1]
+            data[:, :used] = old_data
+            heads[:used] = old_heads
+            counts[:used] = old_counts
+        # Công bố cả ba mảng bằng một phép gán duy nhất
+        self._state = (data, heads, counts)
+        # Một mảng cho mỗi thông số (view vào khối dữ liệu chung)
+        self.columns = {name: data[i] for i, name in enumerate(COLUMNS)}
+
+    # ------------------------------------------------------------------
+    # Slot
+    # ------------------------------------------------------------------
+    def register(self, key: Hashable) -> int:
+        """Cấp (hoặc trả lại) slot cho một khóa, ví dụ (node_id, module_id)."""
+        slot = self._slots.get(key)
+        if slot is not None:
+            return slot
+        with self._register_lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = len(self._slots)
+                capacity = self._state[0].shape[1]
+                if slot >= capacity:
+                    self._allocate(capacity * 2)
+                self._slots[key] = slot
+        return slot
+
+    def slot_of(self, key: Hashable) -> Optional[int]:
+        return self._slots.get(key)
+
+    def reset(self, slot: int):
+        """Xóa lịch sử của một slot."""
+        _, heads, counts = self._state
+        heads[slot] = 0
+        counts[slot] = 0
+
+    # ------------------------------------------------------------------
+    # Ghi
+    # ------------------------------------------------------------------
+    def append(self, slot: int, t: float, voltage: float, current: float,
+               power: float, temperature: float):
+        """Ghi một mẫu (O(1), không cấp phát)."""
+        data, heads, counts = self._state
+        head = heads[slot]
+        sample = (t, voltage, current, power, temperature)
+        data[:, slot, head] = sample
+        data[:, slot, head + self.capacity] = sample
+        head += 1
+        heads[slot] = 0 if head == self.capacity else head
+        if counts[slot] < self.capacity:
+            counts[slot] += 1
+
+    # ------------------------------------------------------------------
+    # Đọc
+    # ------------------------------------------------------------------
+    def count(self, slot: int) -> int:
+        """Số mẫu đang lưu của slot."""
+        return int(self._state[2][slot])
+
+    def _window_bounds(self, state, slot: int, n: Optional[int]) -> Tuple[int, int]:
+        _, heads, counts = state
+        available = int(counts[slot])
+        n = available if n is None else min(n, available)
+        end = int(heads[slot]) + self.capacity
+        return end - n, end
+
+    def window(self, slot: int, column: str, n: Optional[int] = None) -> np.ndarray:
+        """View (không sao chép) N mẫu gần nhất của một thông số, cũ nhất trước."""
+        state = self._state
+        start, end = self._window_bounds(state, slot, n)
+        return state[0][_COLUMN_INDEX[column], slot, start:end]
+
+    def window_all(self, slot: int, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """View N mẫu gần nhất của mọi thông số."""
+        state = self._state
+        start, end = self._window_bounds(state, slot, n)
+        block = state[0][:, slot, start:end]
+        return {name: block[i] for i, name in enumerate(COLUMNS)}
+
+    def latest(self, slot: int) -> Optional[Dict[str, float]]:
+        """Mẫu mới nhất của slot (None nếu chưa có)."""
+        data, heads, counts = self._state
+        if not counts[slot]:
+            return None
+        index = int(heads[slot]) + self.capacity - 1
+        return {name: float(data[i, slot, index]) for i, name in enumerate(COLUMNS)}
+
+    def window_stats(self, slot: int, column: str, n: Optional[int] = None) -> Optional[Dict[str, float]]:
+        """min/max/mean của N mẫu gần nhất (None nếu chưa có mẫu)."""
+        values = self.window(slot, column, n)
+        if not values.size:
+            return None
+        return {'min': float(values.min()), 'max': float(values.max()), 'mean': float(values.mean())}
+
+    def window_stats_all(self, column: str, n: int) -> Dict[str, np.ndarray]:
+        """min/max/mean của N mẫu gần nhất cho mọi slot cùng lúc.
+
+        Slot có ít hơn N mẫu chỉ tính trên số mẫu đang có; slot chưa có mẫu cho NaN.
+        """
+        n = max(1, min(n, self.capacity))
+        data, heads, counts = self._state
+        n_slots = min(len(self._slots), data.shape[1])
+        heads = heads[:n_slots]
+        counts = counts[:n_slots]
+        offsets = np.arange(n)
+        indices = (heads + self.capacity - n)[:, None] + offsets
+        values = np.take_along_axis(data[_COLUMN_INDEX[column], :n_slots], indices, axis=1)
+        valid = offsets >= (n - counts)[:, None]
+        masked = np.where(valid, values, np.nan)
+        with warnings.catch_warnings():
+            # Slot chưa có mẫu: "All-NaN slice" / "Mean of empty slice"
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return {
+                'min': np.nanmin(masked, axis=1),
+                'max': np.nanmax(masked, axis=1),
+                'mean': np.nanmean(masked, axis=1),
+            }
+
+
+# Global instance
+telemetry_store = TelemetryStore()
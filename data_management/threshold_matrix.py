@@ -0,0 +1,165 @@
+"""
+Ma trận ngưỡng biên dịch sẵn cho kiểm tra trạng thái module.
+
+Ngưỡng hiệu lực (custom ghi đè default) của mỗi module × thông số được tra một
+lần từ UnifiedThresholdManager và lưu thành mảng min/max. Kết quả kiểm tra là
+bitmask lỗi (mỗi thông số hai bit: thấp/cao); thông báo lỗi chỉ được định dạng
+khi giao diện cần hiển thị. Ma trận được dựng lại khi cấu hình được tải lại hoặc
+ngưỡng custom thay đổi.
+"""
+
+import threading
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .unified_threshold_manager import unified_threshold_manager
+
+
+class ParameterSpec(NamedTuple):
+    attribute: str      # Tên thuộc tính trong ModuleParameters
+    config_name: str    # Tên thông số trong unified_module_config.json
+    unit: str
+
+
+PARAMETERS: Tuple[ParameterSpec, ...] = (
+    ParameterSpec("voltage", "Điện áp", "V"),
+    ParameterSpec("current", "Dòng điện", "A"),
+    ParameterSpec("power", "Công suất", "W"),
+    ParameterSpec("temperature", "Nhiệt độ", "°C"),
+)
+
+# Bit lỗi: thông số k chiếm bit 2k (thấp) và 2k+1 (cao)
+LOW_BITS = np.array([1 << (2 * k) for k in range(len(PARAMETERS))], dtype=np.int64)
+HIGH_BITS = np.array([1 << (2 * k + 1) for k in range(len(PARAMETERS))], dtype=np.int64)
+
+
+def low_bit(parameter_index: int) -> int:
+    return 1 << (2 * parameter_index)
+
+
+def high_bit(parameter_index: int) -> int:
+    return 1 << (2 * parameter_index + 1)
+
+
+class _Compiled(NamedTuple):
+    """Ảnh chụp ma trận ngưỡng (không thay đổi sau khi dựng)."""
+    # Giá trị gốc từ cấu hình, mỗi slot: (min0, max0, min1, max1, ...)
+    bounds: List[Optional[Tuple]]
+    mins: np.ndarray    # (n_slots, n_params)
+    maxs: np.ndarray    # (n_slots, n_params)
+
+
+class ThresholdMatrix:
+    """Ma trận ngưỡng module × thông số, đánh chỉ số theo slot của telemetry_store."""
+
+    def __init__(self):
+        self._module_names: List[Optional[str]] = []
+        self._lock = threading.Lock()
+        self._compiled = _Compiled([], np.empty((0, len(PARAMETERS))), np.empty((0, len(PARAMETERS))))
+
+    @staticmethod
+    def _threshold_row(module_name: str) -> Tuple:
+        row = []
+        for spec in PARAMETERS:
+            threshold = unified_threshold_manager.get_effective_threshold(module_name, spec.config_name)
+            row.append(threshold["min_normal"])
+            row.append(threshold["max_normal"])
+        return tuple(row)
+
+    def _compile(self, module_names: Sequence[Optional[str]]) -> _Compiled:
+        bounds = [self._threshold_row(name) if name is not None else None for name in module_names]
+        n_params = len(PARAMETERS)
+        mins = np.full((len(bounds), n_params), -np.inf)
+        maxs = np.full((len(bounds), n_params), np.inf)
+        for slot, row in enumerate(bounds):
+            if row is not None:
+                mins[slot] = row[0::2]
+                maxs[slot] = row[1::2]
+        return _Compiled(bounds, mins, maxs)
+
+    def register(self, slot: int, module_name: str):
+        """Gắn slot với tên module và biên dịch ngưỡng cho slot đó."""
+        row = self._threshold_row(module_name)
+        with self._lock:
+            names = list(self._module_names)
+            compiled = self._compiled
+            bounds = list(compiled.bounds)
+            if slot >= len(names):
+                grow = slot + 1 - len(names)
+                names.extend([None] * grow)
+                bounds.extend([None] * grow)
+            names[slot] = module_name
+            bounds[slot] = row
+
+            n_params = len(PARAMETERS)
+            mins = np.full((len(bounds), n_params), -np.inf)
+            maxs = np.full((len(bounds), n_params), np.inf)
+            mins[:len(compiled.mins)] = compiled.mins
+            maxs[:len(compiled.maxs)] = compiled.maxs
+            mins[slot] = row[0::2]
+            maxs[slot] = row[1::2]
+
+            self._module_names = names
+            self._compiled = _Compiled(bounds, mins, maxs)
+
+    def rebuild(self):
+        """Biên dịch lại toàn bộ ma trận từ ngưỡng hiện tại và thay thế bản cũ."""
+        with self._lock:
+            self._compiled = self._compile(self._module_names)
+
+    # ------------------------------------------------------------------
+    # Kiểm tra
+    # ------------------------------------------------------------------
+    def evaluate(self, slot: int, values: Sequence[float]) -> int:
+        """Bitmask lỗi của một module (giá trị theo thứ tự PARAMETERS)."""
+        bounds = self._compiled.bounds[slot]
+        mask = 0
+        bit = 1
+        for i, value in enumerate(values):
+            if value < bounds[2 * i]:
+                mask |= bit
+            elif value > bounds[2 * i + 1]:
+                mask |= bit << 1
+            bit <<= 2
+        return mask
+
+    def evaluate_all(self, values: np.ndarray, slots: Optional[np.ndarray] = None) -> np.ndarray:
+        """Bitmask lỗi cho nhiều module trong một lần tính vector hóa.
+
+        Args:
+            values: Mảng (n, n_params) giá trị thông số
+            slots: Slot tương ứng từng hàng (None = hàng i là slot i)
+
+        Returns:
+            Mảng int64 (n,) bitmask lỗi
+        """
+        compiled = self._compiled
+        mins, maxs = compiled.mins, compiled.maxs
+        if slots is not None:
+            mins, maxs = mins[slots], maxs[slots]
+        values = np.asarray(values, dtype=np.float64)
+        return (values < mins) @ LOW_BITS + (values > maxs) @ HIGH_BITS
+
+    def thresholds(self, slot: int) -> Optional[Tuple]:
+        """Ngưỡng gốc của slot: (min0, max0, min1, max1, ...)."""
+        return self._compiled.bounds[slot]
+
+    def format_errors(self, slot: int, mask: int, values: Sequence[float]) -> List[str]:
+        """Định dạng thông báo lỗi từ bitmask (chỉ gọi khi cần hiển thị)."""
+        if not mask:
+            return []
+        bounds = self._compiled.bounds[slot]
+        messages = []
+        for i, spec in enumerate(PARAMETERS):
+            value = values[i]
+            if mask & low_bit(i):
+                messages.append(f"{spec.config_name} thấp ({value:.1f}{spec.unit} < {bounds[2 * i]}{spec.unit})")
+            elif mask & high_bit(i):
+                messages.append(f"{spec.config_name} cao ({value:.1f}{spec.unit} > {bounds[2 * i + 1]}{spec.unit})")
+        return messages
+
+
+# Global instance
+threshold_matrix = ThresholdMatrix()
+unified_threshold_manager.add_reload_listener(threshold_matrix.rebuild)
@@ -5,7 +5,7 @@ Manages both default and custom thresholds in a single JSON configuration file.
 
 import json
 import os
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional
 
 class UnifiedThresholdManager:
     """Manages module configurations and thresholds from unified JSON file."""
@@ -17,15 +17,30 @@ class UnifiedThresholdManager:
             'unified_module_config.json'
         )
         self.config_data = {}
+        self._reload_listeners: List[Callable[[], Any]] = []
         self.load_config()
 
+    def add_reload_listener(self, listener: Callable[[], Any]):
+        """Register a callback invoked after the configuration is (re)loaded."""
+        if listener not in self._reload_listeners:
+            self._reload_listeners.append(listener)
+
+    def _notify_reload(self):
+        for listener in list(self._reload_listeners):
+            try:
+                listener()
+            except Exception as e:
+                print(f"Error in config reload listener: {e}")
+
     def load_config(self) -> bool:
         """Load configuration from JSON file."""
         try:
             if os.path.exists(self.config_file):
                 with open(self.config_file, 'r', encoding='utf-8') as f:
-                    self.config_data = json.load(f)
+                    config_data = json.load(f)
+                self.config_data = config_data
                 print(f"Loaded unified config from: {self.config_file}")
+                self._notify_reload()
                 return True
             else:
                 print(f"Config file not found: {self.config_file}")
@@ -230,13 +245,13 @@ class UnifiedThresholdManager:
     def _refresh_all_module_statuses(self):
         """Refresh status of all modules after threshold change."""
         try:
+            from .threshold_matrix import threshold_matrix
             from .module_data_manager import module_manager
             from .node_data_manager import system_data_manager
 
-            for node_modules in module_manager.modules.values():
-                for module in node_modules.values():
-                    # Force recheck status with new thresholds
-                    module._check_status()
+            # Recompile thresholds, then recheck every module in one vectorized pass
+            threshold_matrix.rebuild()
+            module_manager.refresh_all_statuses()
 
             # Also refresh node error statuses
             system_data_manager.refresh_all_node_error_statuses()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Chế độ headless: chạy receiver và các data manager không cần Qt/phần cứng,
+đo throughput và độ trễ (từ msg.timestamp tới lúc burst xử lý xong).
+
+Chạy:
+    python headless.py --backend replay --replay-file capture.log --speed 10
+    python headless.py --backend replay --replay-file capture.asc --speed max
+    python headless.py --backend virtual --generate 50000 --rate 5000
+    python headless.py --backend socketcan --duration 60
+
+La bàn (--compass): "none", "serial" (cổng thật), "sweep:<độ/giây>" hoặc
+danh sách hướng "0,90,180,270".
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from communication.can_bus_manager import can_bus_manager, BACKEND_REPLAY
+from communication.simulation import ScriptedCompass, TrafficGenerator, parse_replay_speed
+from common.log_sink import log_sink
+from common.latency_trace import latency_tracer
+
+
+# Thời gian không có burst mới sau khi nguồn frame kết thúc thì coi như đã xử lý hết
+IDLE_TIMEOUT_S = 0.5
+
+
+class ReceiverStats:
+    """Số frame/burst và độ trễ từng frame do receiver thread ghi nhận."""
+
+    def __init__(self):
+        self.frames = 0
+        self.bursts = 0
+        self.latencies = []
+        self.first_time = None
+        self.last_time = None
+
+    def record_burst(self, burst):
+        now = time.time()
+        if self.first_time is None:
+            self.first_time = now
+        self.last_time = now
+        self.bursts += 1
+        self.frames += len(burst)
+        self.latencies.extend(now - msg.timestamp for msg in burst if msg.timestamp)
+
+    def idle_for(self) -> float:
+        """Số giây kể từ burst cuối cùng."""
+        return time.time() - self.last_time if self.last_time is not None else 0.0
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(p / 100.0 * len(latencies)))] * 1000
+
+        active = (self.last_time - self.first_time) if self.frames > 1 else 0.0
+        return {
+            'frames': self.frames,
+            'bursts': self.bursts,
+            'elapsed_s': elapsed,
+            'throughput_fps': self.frames / active if active > 0 else None,
+            'mean_burst': self.frames / self.bursts if self.bursts else 0.0,
+            'latency_ms': {
+                'p50': percentile(50),
+                'p90': percentile(90),
+                'p99': percentile(99),
+                'max': latencies[-1] * 1000 if latencies else None,
+            },
+        }
+
+
+def parse_compass(spec: str):
+    """Hàm tạo cổng la bàn theo tùy chọn --compass (None = cổng serial thật)."""
+    if spec == 'serial':
+        return None
+    if spec.startswith('sweep:'):
+        rate = float(spec.partition(':')[2])
+        return lambda: ScriptedCompass.sweep(rate)
+    headings = [float(value) for value in spec.split(',')]
+    return lambda: ScriptedCompass(headings)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Chạy receiver không cần Qt/phần cứng")
+    parser.add_argument('--backend', default='virtual',
+                        help="Interface python-can (virtual, socketcan, ...) hoặc 'replay'")
+    parser.add_argument('--channel', default=None, help="Kênh CAN (mặc định theo backend)")
+    parser.add_argument('--replay-file', help="File log để phát lại (.log candump, .asc, .blf, ...)")
+    parser.add_argument('--speed', default='1', help="Tốc độ phát lại: 1, 10x, max")
+    parser.add_argument('--loop', action='store_true', help="Lặp lại file log khi hết")
+    parser.add_argument('--generate', type=int, default=0,
+                        help="Số frame tổng hợp phát lên bus virtual")
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help="Tốc độ phát frame tổng hợp (frame/s, 0 = tối đa)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed cho frame tổng hợp")
+    parser.add_argument('--compass', default='none', help="none | serial | sweep:<độ/s> | h1,h2,...")
+    parser.add_argument('--duration', type=float, default=0.0,
+                        help="Thời gian chạy tối đa (giây, 0 = tới khi nguồn frame kết thúc)")
+    parser.add_argument('--journal', action='store_true', help="Ghi nhật ký sự kiện ra đĩa")
+    parser.add_argument('--json', dest='json_path', help="Ghi kết quả ra file JSON")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    options = {}
+    if args.backend == BACKEND_REPLAY:
+        if not args.replay_file:
+            print("--backend replay cần --replay-file")
+            return 2
+        options = {'replay_file': args.replay_file, 'speed': parse_replay_speed(args.speed), 'loop': args.loop}
+    can_bus_manager.configure(args.backend, args.channel, **options)
+
+    # Import sau khi chọn backend; kéo theo module/threshold manager, không có Qt
+    from communication import data_receiver as receiver
+    from data_management.event_journal import event_journal
+
+    if args.compass != 'none':
+        receiver.compass_port_factory = parse_compass(args.compass)
+    if args.journal:
+        event_journal.start()
+
+    stats = ReceiverStats()
+    stop_event = threading.Event()
+    receiver_thread = threading.Thread(
+        target=receiver.run, name="CANReceiver",
+        kwargs={'stop_event': stop_event, 'on_burst': stats.record_burst,
+                'start_compass': args.compass != 'none'},
+        daemon=True,
+    )
+    start = time.time()
+    receiver_thread.start()
+
+    generator = None
+    if args.generate:
+        # Đợi receiver mở bus trước khi phát để không mất frame đầu
+        while not can_bus_manager.is_connected() and receiver_thread.is_alive():
+            time.sleep(0.01)
+        generator = TrafficGenerator(args.generate, args.rate, args.seed,
+                                     channel=can_bus_manager.channel)
+        generator.start()
+
+    try:
+        while receiver_thread.is_alive():
+            if args.duration and time.time() - start >= args.duration:
+                break
+            bus = can_bus_manager.get_bus() if can_bus_manager.is_connected() else None
+            if bus is not None and getattr(bus, 'finished', None) is not None and bus.finished.is_set():
+                break
+            if generator is not None and generator.finished.is_set() and stats.idle_for() >= IDLE_TIMEOUT_S:
+                # Frame bị bộ lọc nhận loại bỏ không bao giờ tới receiver
+                break
+            # Xả log như GUI; drain() tự in các mức trong console_levels
+            log_sink.drain()
+            time.sleep(0.05)
+    except KeyboardInterrupt:
+        pass
+
+    stop_event.set()
+    receiver_thread.join(2.0)
+    log_sink.drain()
+    elapsed = time.time() - start
+    if args.journal:
+        event_journal.stop()
+    can_bus_manager.shutdown()
+
+    result = stats.summary(elapsed)
+    result['backend'] = can_bus_manager.describe()
+    result['log_sink'] = log_sink.stats()
+    result['latency_trace'] = latency_tracer.summary()
+    latency = result['latency_ms']
+    throughput = result['throughput_fps']
+    print(f"Backend: {result['backend']}")
+    print(f"Frame: {result['frames']} trong {result['bursts']} burst "
+          f"(trung bình {result['mean_burst']:.1f} frame/burst), {elapsed:.2f} s")
+    if throughput:
+        print(f"Throughput: {throughput:,.0f} frame/s")
+    if latency['p50'] is not None:
+        print(f"Độ trễ (ms): p50={latency['p50']:.3f} p90={latency['p90']:.3f} "
+              f"p99={latency['p99']:.3f} max={latency['max']:.3f}")
+    for stage, summary in result['latency_trace']['stages'].items():
+        print(f"  {stage}: n={summary['count']} p50={summary['p50_ms']:.3f} "
+              f"p99={summary['p99_ms']:.3f} max={summary['max_ms']:.3f} ms")
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"Đã ghi kết quả vào {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
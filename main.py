@@ -3,14 +3,26 @@ import sys
 import os
 import time
 import threading
-from PyQt5 import QtWidgets
+
+# --profile-startup[=file]: đo thời gian import/khởi tạo tới khung hình đầu tiên
+from common.startup_profiler import startup_profiler, parse_profile_argument
+profile_report_path = parse_profile_argument(sys.argv)
+if profile_report_path:
+    startup_profiler.install()
+
+from PyQt5 import QtCore, QtWidgets
 
 # Enable backwards compatibility for renamed files
 import compatibility_layer
 
 # Import project modules - Updated for new structure
-from control_panel import FireControl
-from communication import data_receiver as receiver
+with startup_profiler.phase("import control_panel"):
+    from control_panel import FireControl
+with startup_profiler.phase("import data_receiver"):
+    from communication import data_receiver as receiver
+from data_management import event_journal
+from ui.components.asset_cache import asset_cache
+from common.constants import AssetCacheDefaults
 
 # Import common constants
 try:
@@ -20,15 +32,33 @@ except ImportError:
     DEFAULT_WINDOW_WIDTH = 1280
     DEFAULT_WINDOW_HEIGHT = 800
 
+if startup_profiler.enabled:
+    from ui.tabs.main_control_tab import MainTab
+    from ui.tabs.system_info_tab import InfoTab
+    from ui.tabs.event_log_tab import LogTab
+    from ui.tabs.settings_tab import SettingTab
+    startup_profiler.profile_constructors(FireControl, MainTab, InfoTab, LogTab, SettingTab)
+    startup_profiler.mark("imports done")
+
+event_journal.start()
 threading.Thread(target=receiver.run, daemon=True).start()
-app = QtWidgets.QApplication(sys.argv)
+with startup_profiler.phase("QApplication"):
+    app = QtWidgets.QApplication(sys.argv)
+app.aboutToQuit.connect(event_journal.stop)
+if AssetCacheDefaults.PRELOAD:
+    # Giải mã ảnh/icon trên thread nền trong lúc dựng giao diện
+    asset_cache.preload()
 MainWindow = QtWidgets.QMainWindow()
 ui = FireControl()
-ui.setupUi(MainWindow)
+with startup_profiler.phase("FireControl.setupUi"):
+    ui.setupUi(MainWindow)
 MainWindow.show()
 try:
-    ui.main_tab.update_data()
-    time.sleep(1)
+    with startup_profiler.phase("MainTab.update_data"):
+        ui.main_tab.update_data()
 except Exception as e:
     print(f"An error occurred: {e}")
+if startup_profiler.enabled:
+    # Chạy ở lượt đầu tiên của event loop, sau khi cửa sổ đã được vẽ
+    QtCore.QTimer.singleShot(0, lambda: startup_profiler.finish("first frame", profile_report_path))
 sys.exit(app.exec_())
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Gộp frame trong burst: frame hợp lệ mới nhất thắng."""
+
+import struct
+
+import can
+
+from communication import data_receiver
+from communication.can_config import CAN_ID_DISTANCE, CAN_ID_CANNON_LEFT, CAN_COALESCED_IDS
+from communication.can_dispatcher import coalesce_latest
+import ui.ui_config as config
+
+
+def _distance_frame(value):
+    return can.Message(arbitration_id=CAN_ID_DISTANCE, data=struct.pack("<f", value), is_extended_id=False)
+
+
+def test_zero_distance_after_valid_keeps_valid_value():
+    data_receiver._target_distance = 5000.0
+    data_receiver.process_burst([_distance_frame(7000.0), _distance_frame(0.0)])
+    assert data_receiver._target_distance == 7000.0
+
+
+def test_malformed_distance_after_valid_keeps_valid_value():
+    data_receiver._target_distance = 5000.0
+    malformed = can.Message(arbitration_id=CAN_ID_DISTANCE, data=[0, 0, 0x80], is_extended_id=False)
+    data_receiver.process_burst([_distance_frame(7000.0), malformed])
+    assert data_receiver._target_distance == 7000.0
+
+
+def test_malformed_cannon_after_valid_keeps_valid_value():
+    valid = can.Message(arbitration_id=CAN_ID_CANNON_LEFT, data=struct.pack("<ff", 12.5, 40.0), is_extended_id=False)
+    malformed = can.Message(arbitration_id=CAN_ID_CANNON_LEFT, data=[0] * 7, is_extended_id=False)
+    data_receiver.process_burst([valid, malformed])
+    assert config.ANGLE_L == 12.5
+    assert config.DIRECTION_L == 40.0
+
+
+def test_invalid_frames_are_kept_for_error_logging():
+    frames = [_distance_frame(7000.0), _distance_frame(0.0), _distance_frame(6000.0), _distance_frame(-1.0)]
+    kept = coalesce_latest(frames, CAN_COALESCED_IDS, data_receiver.COALESCE_VALIDATORS)
+    assert kept == [frames[1], frames[2], frames[3]]
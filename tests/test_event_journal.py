@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Nhật ký trên đĩa: node_id cho bản ghi log, lấy mẫu CAN frame, giới hạn thời gian tra cứu."""
+
+import time
+
+import can
+import pytest
+
+from common.constants import JournalDefaults
+from common.log_sink import LogRecord, LogSink
+from data_management.event_journal import EventJournal, parse_journal_query
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = EventJournal(str(tmp_path), flush_interval=0.02)
+    journal.set_node_resolver(lambda can_id: "NODE-001" if can_id == 0x300 else None)
+    journal.start()
+    yield journal
+    journal.stop()
+
+
+def _wait_written(journal, count, timeout=2.0):
+    deadline = time.time() + timeout
+    while journal.written < count and time.time() < deadline:
+        time.sleep(0.02)
+    assert journal.written == count
+
+
+def test_log_records_with_can_id_are_indexed_by_node(journal):
+    journal.record_log(LogRecord(time.time(), "ERROR", "can_rx", "Quá áp", 0x300))
+    journal.record_log(LogRecord(time.time(), "INFO", "app", "Khởi động", None))
+    _wait_written(journal, 2)
+    page = journal.search(parse_journal_query("node:NODE-001"))
+    assert [record.message for record in page.records] == ["Quá áp"]
+
+
+def test_sink_records_are_journaled_before_sampling_and_rate_limit(journal):
+    sink = LogSink(console_levels=(), source_rate_limit=2)
+    sink.set_sampling(0x300, 10)
+    sink.add_listener(journal.record_log)
+    for _ in range(20):
+        sink.emit("Module", "INFO", "can_rx", 0x300)
+    _wait_written(journal, 20)
+    assert len(sink.drain()) == 2
+    assert len(journal.search(parse_journal_query("node:NODE-001")).records) == 20
+
+
+def test_can_frames_are_kept_unless_sampling_is_configured(journal):
+    frames = [can.Message(arbitration_id=0x300, data=[0] * 8) for _ in range(20)]
+    journal.record_frames(frames)
+    _wait_written(journal, 20)
+    assert len(journal.search(parse_journal_query("can:0x300")).records) == 20
+
+
+def test_can_frames_are_sampled_per_id(journal):
+    journal.set_can_sampling(0x300, 10)
+    journal.set_can_sampling(0x301, 0)
+    frames = [can.Message(arbitration_id=can_id, data=[0] * 8)
+              for can_id in (0x300, 0x301, 0x020) for _ in range(20)]
+    journal.record_frames(frames)
+    _wait_written(journal, 2 + 20)
+    assert len(journal.search(parse_journal_query("can:0x300")).records) == 2
+    assert journal.search(parse_journal_query("can:0x301")).records == []
+
+
+def test_text_search_defaults_to_recent_window():
+    now = 1_000_000.0
+    query = parse_journal_query("quá áp", now=now)
+    assert query.start == now - JournalDefaults.TEXT_SEARCH_WINDOW_S
+    assert parse_journal_query("quá áp from:-30d", now=now).start == now - 30 * 86400
+    assert parse_journal_query("level:ERROR", now=now).start is None
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""LUT góc tầm phải cho cùng kết quả với np.interp, kể cả với đầu vào không hữu hạn."""
+
+import math
+
+import pytest
+
+from common.ballistics import get_firing_table_interpolator
+
+
+@pytest.fixture(scope="module")
+def interpolator():
+    interpolator = get_firing_table_interpolator()
+    if not interpolator.has_angle_lut:
+        interpolator.compile_angle_lut()
+    return interpolator
+
+
+def _exact(interpolator, target_range):
+    lut = interpolator._angle_lut
+    interpolator.disable_angle_lut()
+    try:
+        return interpolator.interpolate_angle(target_range)
+    finally:
+        interpolator._angle_lut = lut
+
+
+def test_nan_range_returns_nan(interpolator):
+    assert math.isnan(interpolator.interpolate_angle(float("nan")))
+
+
+@pytest.mark.parametrize("target_range", [float("inf"), float("-inf"), -1.0, 0.0, 1e9])
+def test_out_of_table_ranges_match_exact_path(interpolator, target_range):
+    assert interpolator.interpolate_angle(target_range) == pytest.approx(_exact(interpolator, target_range))
+
+
+def test_lut_error_report_within_tolerance(interpolator):
+    report = interpolator.angle_lut_error_report()
+    assert report.max_abs_error < 1e-6
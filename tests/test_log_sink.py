@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Log sink: bộ đếm an toàn khi nhiều producer, in console khi drain."""
+
+import threading
+
+from common.log_sink import LogSink
+
+
+def test_sampling_counts_are_exact_across_producer_threads():
+    sink = LogSink(console_levels=(), source_rate_limit=0)
+    sink.set_sampling(0x300, 10)
+    barrier = threading.Barrier(8)
+
+    def produce():
+        barrier.wait()
+        for _ in range(5000):
+            sink.emit("Module", "INFO", "can_rx", 0x300)
+
+    threads = [threading.Thread(target=produce) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sink.drain()) == 4000
+    assert sink.stats()['dropped_sampled'] == 36000
+
+
+def test_console_output_is_written_on_drain(capsys):
+    sink = LogSink(console_levels=("ERROR",))
+    sink.emit("Quá áp", "ERROR", "can_rx")
+    sink.emit("Khởi động", "INFO", "app")
+    assert capsys.readouterr().out == ""
+    sink.drain()
+    assert capsys.readouterr().out == "[ERROR] Quá áp\n"
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Kho telemetry: mở rộng slot trong khi receiver thread đang ghi."""
+
+import threading
+
+from data_management.telemetry_store import TelemetryStore
+
+
+def test_growth_while_appending_keeps_arrays_consistent():
+    store = TelemetryStore(capacity=64, initial_slots=1)
+    slot = store.register(("NODE-001", "M0"))
+    stop = threading.Event()
+    errors = []
+
+    def write():
+        i = 0
+        try:
+            while not stop.is_set():
+                store.append(slot, float(i), 12.0, 1.0, 12.0, 25.0)
+                i += 1
+        except Exception as e:
+            errors.append(e)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    for index in range(1, 512):
+        store.register(("NODE-002", f"M{index}"))
+    stop.set()
+    writer.join()
+
+    assert errors == []
+    assert store.columns["t"].shape[0] >= 512
+    assert store.count(slot) == 64
+    window = store.window(slot, "voltage")
+    assert window.size == 64 and (window == 12.0).all()
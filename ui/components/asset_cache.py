@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Asset cache - giải mã ảnh/icon một lần cho mọi đường vẽ.
+
+Ảnh gốc được giải mã thành QImage (an toàn khi dùng ngoài GUI thread, nên
+preload chạy được trên thread nền). Các biến thể QPixmap đã scale/đổi màu
+được tạo trong GUI thread khi cần lần đầu và giữ trong QPixmapCache theo
+khóa (đường dẫn, kích thước, màu), nên paintEvent chỉ còn drawPixmap.
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, Optional
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor, QImage, QPainter, QPixmap, QPixmapCache
+
+from common.constants import AssetCacheDefaults
+from common.utils import resource_path
+
+
+class AssetCache:
+    """Cache ảnh gốc (QImage) và biến thể pixmap (QPixmapCache) dùng chung."""
+
+    def __init__(self):
+        self._images: Dict[str, QImage] = {}
+        self._lock = threading.Lock()
+        self._preload_thread: Optional[threading.Thread] = None
+        self._cache_limit_set = False
+        self.decoded = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def resolve(path: str) -> str:
+        """Chuẩn hóa đường dẫn (tương đối theo thư mục ứng dụng) làm khóa cache."""
+        if not os.path.isabs(path):
+            path = resource_path(path)
+        return os.path.normpath(path.replace("\\", "/"))
+
+    # ------------------------------------------------------------------
+    # Ảnh gốc
+    # ------------------------------------------------------------------
+    def image(self, path: str) -> QImage:
+        """Ảnh gốc đã giải mã; ảnh lỗi trả về QImage rỗng (cũng được cache)."""
+        key = self.resolve(path)
+        with self._lock:
+            image = self._images.get(key)
+        if image is None:
+            image = self._decode(key)
+        return image
+
+    def _decode(self, key: str) -> QImage:
+        image = QImage(key)
+        with self._lock:
+            # Thread khác có thể đã giải mã xong trước
+            image = self._images.setdefault(key, image)
+            self.decoded += 1
+        return image
+
+    def preload(self, directories: Iterable[str] = AssetCacheDefaults.PRELOAD_DIRECTORIES,
+                extensions: Iterable[str] = AssetCacheDefaults.PRELOAD_EXTENSIONS) -> None:
+        """Giải mã trước các ảnh trong thư mục trên một thread nền."""
+        if self._preload_thread is not None:
+            return
+        paths = []
+        extensions = tuple(ext.lower() for ext in extensions)
+        for directory in directories:
+            full_directory = resource_path(directory)
+            try:
+                names = sorted(os.listdir(full_directory))
+            except OSError as e:
+                print(f"Không preload được ảnh trong {full_directory}: {e}")
+                continue
+            paths += [os.path.join(full_directory, name) for name in names
+                      if name.lower().endswith(extensions)]
+
+        self._preload_thread = threading.Thread(
+            target=self._preload_worker, args=(paths,), name="AssetPreload", daemon=True)
+        self._preload_thread.start()
+
+    def _preload_worker(self, paths):
+        for path in paths:
+            key = self.resolve(path)
+            with self._lock:
+                if key in self._images:
+                    continue
+            if self._decode(key).isNull():
+                print(f"Error: Unable to decode image {key}")
+
+    def wait_for_preload(self, timeout: Optional[float] = None) -> bool:
+        """Chờ thread preload kết thúc (dùng cho đo đạc/kiểm thử)."""
+        if self._preload_thread is None:
+            return True
+        self._preload_thread.join(timeout)
+        return not self._preload_thread.is_alive()
+
+    # ------------------------------------------------------------------
+    # Biến thể pixmap (chỉ gọi từ GUI thread)
+    # ------------------------------------------------------------------
+    def _cached(self, key: str, build) -> QPixmap:
+        if not self._cache_limit_set:
+            QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), AssetCacheDefaults.PIXMAP_CACHE_LIMIT_KB))
+            self._cache_limit_set = True
+
+        pixmap = QPixmapCache.find(key)
+        if pixmap is not None and not pixmap.isNull():
+            self.hits += 1
+            return pixmap
+
+        self.misses += 1
+        pixmap = build()
+        if not pixmap.isNull():
+            QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    def pixmap(self, path: str) -> QPixmap:
+        """Pixmap ở kích thước gốc."""
+        key = self.resolve(path)
+        return self._cached(f"asset:{key}", lambda: QPixmap.fromImage(self.image(key)))
+
+    def scaled(self, path: str, width: int, height: int,
+               aspect_mode=Qt.KeepAspectRatio) -> QPixmap:
+        """Pixmap đã scale mượt vào khung width × height."""
+        key = self.resolve(path)
+        width, height = max(1, int(width)), max(1, int(height))
+
+        def build():
+            source = self.pixmap(key)
+            if source.isNull():
+                return source
+            return source.scaled(width, height, aspect_mode, Qt.SmoothTransformation)
+
+        return self._cached(f"asset:{key}:{width}x{height}:{int(aspect_mode)}", build)
+
+    def tinted(self, path: str, width: int, height: int, color,
+               aspect_mode=Qt.KeepAspectRatio) -> QPixmap:
+        """Pixmap đã scale và tô một màu, giữ nguyên kênh alpha của ảnh."""
+        key = self.resolve(path)
+        color = QColor(color)
+        width, height = max(1, int(width)), max(1, int(height))
+
+        def build():
+            source = self.scaled(key, width, height, aspect_mode)
+            if source.isNull():
+                return source
+            tinted = QPixmap(source.size())
+            tinted.fill(Qt.transparent)
+            painter = QPainter(tinted)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.drawPixmap(0, 0, source)
+            # Chỉ tô lên các điểm ảnh đã có (SourceAtop giữ alpha)
+            painter.setCompositionMode(QPainter.CompositionMode_SourceAtop)
+            painter.fillRect(tinted.rect(), color)
+            painter.end()
+            return tinted
+
+        return self._cached(f"asset:{key}:{width}x{height}:{int(aspect_mode)}:{color.name(QColor.HexArgb)}", build)
+
+    def clear(self):
+        """Xóa toàn bộ ảnh gốc và biến thể (ví dụ khi file asset thay đổi)."""
+        with self._lock:
+            self._images.clear()
+        QPixmapCache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            images = len(self._images)
+        return {'images': images, 'decoded': self.decoded, 'hits': self.hits, 'misses': self.misses}
+
+
+# Global instance
+asset_cache = AssetCache()
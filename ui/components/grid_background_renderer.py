@@ -1,113 +1,209 @@
+from collections import OrderedDict
+
+import numpy as np
 from PyQt5 import QtWidgets, QtCore
-from PyQt5.QtCore import Qt, QRectF, QTimer
-from PyQt5.QtGui import QPainter, QPen, QColor, QBrush
-import math
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QPainterPath, QPixmap
+
+
+class _GridLayer:
+    """Phần tĩnh của nền lưới cho một kích thước: pixmap đường kẻ và các dot.
+
+    Alpha của một dot chỉ phụ thuộc vào đường chéo (col + row) chứa nó, nên các
+    dot được gom thành một QPainterPath cho mỗi đường chéo kèm pha sóng tương ứng.
+    """
+
+    def __init__(self, lines, phases, dot_paths):
+        self.lines = lines          # QPixmap đường kẻ lưới
+        self.phases = phases        # np.ndarray pha sóng theo đường chéo
+        self.dot_paths = dot_paths  # QPainterPath theo đường chéo (cùng thứ tự)
+
+
+class GridBackgroundRenderer(QtCore.QObject):
+    """Engine nền lưới dùng chung cho toàn bộ app với hiệu ứng dot nhấp nháy.
+
+    Đường kẻ lưới được vẽ sẵn một lần cho mỗi kích thước; mỗi frame chỉ tính
+    alpha theo mảng pha đã tính trước và tô các dot. Một timer duy nhất điều
+    khiển animation cho mọi widget nền đang hiển thị; timer dừng khi không còn
+    widget nào hiển thị. Mỗi frame, renderer gọi `background_frame()` của
+    widget để chính widget quyết định vùng cần vẽ lại.
+    """
+
+    INTERVAL_MS = 50    # Chu kỳ animation
+    MAX_LAYERS = 4      # Số kích thước được cache
+
+    def __init__(self, grid_spacing=50, wave_speed=0.05, wave_frequency=0.5, parent=None):
+        super().__init__(parent)
+        self.grid_spacing = grid_spacing
+        self.wave_speed = wave_speed          # Tốc độ sóng chạy
+        self.wave_frequency = wave_frequency  # Độ lệch pha giữa các đường chéo
+        self.margin = 20                      # Không vẽ dot sát viền
+        self.dot_size = 2.5
+        self.time_offset = 0
+
+        self._widgets = []
+        self._timer = None
+        self._layers = OrderedDict()
+        # Màu dot theo alpha: xanh lam nhạt
+        self._dot_brushes = [QBrush(QColor(100, 150, 255, alpha)) for alpha in range(256)]
+
+    # ------------------------------------------------------------------
+    # Animation
+    # ------------------------------------------------------------------
+    def attach(self, widget):
+        """Đăng ký widget đang hiển thị để nhận frame animation (qua `background_frame()`)."""
+        if widget in self._widgets:
+            return
+        self._widgets.append(widget)
+        if self._timer is None:
+            self._timer = QtCore.QTimer(self)
+            self._timer.timeout.connect(self._tick)
+        if not self._timer.isActive():
+            self._timer.start(self.INTERVAL_MS)
+
+    def detach(self, widget):
+        """Hủy đăng ký widget (bị ẩn hoặc tắt animation)."""
+        if widget in self._widgets:
+            self._widgets.remove(widget)
+        if not self._widgets and self._timer is not None:
+            try:
+                self._timer.stop()
+            except RuntimeError:
+                # Timer đã bị hủy khi ứng dụng thoát
+                self._timer = None
+
+    def is_animating(self):
+        return bool(self._widgets)
+
+    def _tick(self):
+        self.time_offset += 1
+        for widget in list(self._widgets):
+            try:
+                widget.background_frame()
+            except RuntimeError:
+                # Widget đã bị hủy phía C++
+                self.detach(widget)
+
+    # ------------------------------------------------------------------
+    # Vẽ
+    # ------------------------------------------------------------------
+    def _build_layer(self, width, height, device_pixel_ratio):
+        spacing = self.grid_spacing
+
+        lines = QPixmap(max(1, round(width * device_pixel_ratio)),
+                        max(1, round(height * device_pixel_ratio)))
+        lines.setDevicePixelRatio(device_pixel_ratio)
+        lines.fill(Qt.transparent)
+        painter = QPainter(lines)
+        painter.setRenderHint(QPainter.Antialiasing)
+        # Đường kẻ ngang và dọc màu xám trắng mỏng
+        painter.setPen(QPen(QColor(220, 220, 220, 80), 0.5))
+        for x in range(0, width, spacing):
+            painter.drawLine(x, 0, x, height)
+        for y in range(0, height, spacing):
+            painter.drawLine(0, y, width, y)
+        painter.end()
+
+        # Gom các giao điểm hợp lệ (tránh viền) theo đường chéo col + row
+        cols = width // spacing + 1
+        rows = height // spacing + 1
+        half = self.dot_size / 2
+        paths = {}
+        for row in range(rows):
+            y = row * spacing
+            if not self.margin <= y <= height - self.margin:
+                continue
+            for col in range(cols):
+                x = col * spacing
+                if self.margin <= x <= width - self.margin:
+                    path = paths.get(col + row)
+                    if path is None:
+                        path = paths[col + row] = QPainterPath()
+                    path.addEllipse(QRectF(x - half, y - half, self.dot_size, self.dot_size))
+
+        diagonals = sorted(paths)
+        phases = -np.array(diagonals, dtype=np.float64) * self.wave_frequency
+        return _GridLayer(lines, phases, [paths[d] for d in diagonals])
+
+    def _layer(self, width, height, device_pixel_ratio):
+        key = (width, height, device_pixel_ratio)
+        layer = self._layers.get(key)
+        if layer is None:
+            layer = self._build_layer(width, height, device_pixel_ratio)
+            self._layers[key] = layer
+            while len(self._layers) > self.MAX_LAYERS:
+                self._layers.popitem(last=False)
+        else:
+            self._layers.move_to_end(key)
+        return layer
+
+    def paint(self, painter, width, height, device_pixel_ratio=1.0):
+        """Vẽ nền lưới và dot nhấp nháy ở frame hiện tại."""
+        layer = self._layer(width, height, device_pixel_ratio)
+        painter.drawPixmap(0, 0, layer.lines)
+
+        if not layer.dot_paths:
+            return
+        # Alpha từ 80 đến 255 theo sóng sin, cắt về [0, 255]
+        alphas = np.clip((80 + 175 * np.sin(self.time_offset * self.wave_speed + layer.phases)).astype(np.int64),
+                         0, 255)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        brushes = self._dot_brushes
+        for path, alpha in zip(layer.dot_paths, alphas.tolist()):
+            if alpha:
+                painter.fillPath(path, brushes[alpha])
 
 
 class GridBackgroundWidget(QtWidgets.QWidget):
-    """Widget với grid background cho toàn bộ app với hiệu ứng dot nhấp nháy."""
+    """Widget với grid background cho toàn bộ app với hiệu ứng dot nhấp nháy.
+
+    Việc vẽ và animation do `grid_background_renderer` dùng chung đảm nhận;
+    widget chỉ nhận frame khi đang hiển thị.
+    """
 
     def __init__(self, parent=None, enable_animation=True):
         super().__init__(parent)
         self.enable_animation = enable_animation
-        self.grid_spacing = 50
-        self.dot_clusters = []
-        self.animation_timer = QtCore.QTimer()
-        self.animation_timer.timeout.connect(self.update_animation)
-        if self.enable_animation:
-            self.animation_timer.start(50)  # Giảm xuống 50ms để animation mượt hơn
-        self.time_offset = 0
-        self._initialize_dot_clusters()
+        self.grid_spacing = grid_background_renderer.grid_spacing
 
     def set_animation_enabled(self, enabled):
         """Bật/tắt hiệu ứng animation."""
         self.enable_animation = enabled
-        if enabled:
-            self.animation_timer.start(50)
-        else:
-            self.animation_timer.stop()
+        self._sync_background_animation()
         self.update()  # Cập nhật để vẽ lại
 
-    def _initialize_dot_clusters(self):
-        """Khởi tạo hiệu ứng sóng từ trái trên xuống phải dưới."""
-        # Không cần clusters nữa, chỉ cần thông số sóng
-        self.wave_speed = 0.05  # Tăng tốc độ sóng chạy để rõ ràng hơn
-        self.wave_frequency = 0.5  # Tăng tần số để tạo sự khác biệt rõ rệt giữa các dot
+    def background_frame(self):
+        """Hook cho mỗi frame animation nền; mặc định vẽ lại toàn bộ widget.
 
-    def update_animation(self):
-        """Cập nhật animation cho dot nhấp nháy."""
-        if self.enable_animation:
-            self.time_offset += 1
-            self.update()  # Trigger repaint
+        Widget có animation riêng có thể override để gộp frame nền vào chu kỳ
+        vẽ lại của chính nó.
+        """
+        self.update()
+
+    def _sync_background_animation(self):
+        if self.enable_animation and self.isVisible():
+            grid_background_renderer.attach(self)
+        else:
+            grid_background_renderer.detach(self)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._sync_background_animation()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        grid_background_renderer.detach(self)
 
     def paintEvent(self, event):
         """Vẽ grid background với dot nhấp nháy."""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-
         if not self.enable_animation:
             # Chỉ vẽ background đơn giản nếu animation bị tắt
             return
 
-        # Vẽ lưới background với đường kẻ ngang và dọc màu xám trắng mỏng
-        painter.setPen(QPen(QColor(220, 220, 220, 80), 0.5))
-
-        # Vẽ các đường kẻ dọc
-        for x in range(0, self.width(), self.grid_spacing):
-            painter.drawLine(x, 0, x, self.height())
-
-        # Vẽ các đường kẻ ngang
-        for y in range(0, self.height(), self.grid_spacing):
-            painter.drawLine(0, y, self.width(), y)
-
-        # Vẽ các dot nhấp nháy tại giao điểm
-        self._draw_blinking_dots(painter)
-
-    def _draw_blinking_dots(self, painter):
-        """Vẽ các dot nhấp nháy theo dạng sóng từ trái trên xuống phải dưới."""
-        painter.setPen(Qt.NoPen)
+        painter = QPainter(self)
+        grid_background_renderer.paint(painter, self.width(), self.height(), self.devicePixelRatioF())
 
-        # Tính toán số lượng giao điểm
-        cols = self.width() // self.grid_spacing + 1
-        rows = self.height() // self.grid_spacing + 1
 
-        # Tạo danh sách tất cả giao điểm hợp lệ (tránh viền)
-        margin = 20
-        for row in range(rows):
-            for col in range(cols):
-                x = col * self.grid_spacing
-                y = row * self.grid_spacing
-
-                # Kiểm tra nếu giao điểm nằm trong vùng hợp lệ
-                if margin <= x <= self.width() - margin and margin <= y <= self.height() - margin:
-                    # Tính toán khoảng cách diagonal từ góc trái trên (0,0)
-                    # Sử dụng tổng col + row để tạo diagonal
-                    diagonal_distance = col + row
-
-                    # Tạo sóng chạy theo thời gian với công thức rõ ràng hơn
-                    wave_phase = self.time_offset * self.wave_speed - diagonal_distance * self.wave_frequency
-
-                    # Tính alpha dựa trên sóng sin với biên độ lớn hơn
-                    alpha = int(80 + 175 * math.sin(wave_phase))  # Alpha từ 80 đến 255 để rõ ràng hơn
-
-                    # Đảm bảo alpha trong khoảng hợp lệ
-                    alpha = max(0, min(255, alpha))
-
-                    # Màu dot: xanh lam nhạt với alpha theo sóng
-                    color = QColor(100, 150, 255, alpha)
-                    painter.setBrush(QBrush(color))
-
-                    # Vẽ dot nhỏ tại chính xác giao điểm
-                    dot_size = 2.5
-                    dot_rect = QRectF(
-                        x - dot_size/2,
-                        y - dot_size/2,
-                        dot_size,
-                        dot_size
-                    )
-                    painter.drawEllipse(dot_rect)
-
-    def resizeEvent(self, event):
-        """Khởi tạo lại dot clusters khi resize."""
-        super().resizeEvent(event)
-        self._initialize_dot_clusters()
\ No newline at end of file
+# Global instance
+grid_background_renderer = GridBackgroundRenderer()
@@ -6,6 +6,7 @@ from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QFont, QFontMetrics, QPi
 # Import from data_management module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from data_management import module_manager
+from .asset_cache import asset_cache
 
 
 def resource_path(relative_path):
@@ -146,10 +147,9 @@ class InfoPanelRenderer:
         image_path = resource_path(f'assets/image/{image_file}')
 
         try:
-            pixmap = QPixmap(image_path)
-            if not pixmap.isNull():
-                # Scale ảnh cho vừa với rect
-                scaled_pixmap = pixmap.scaled(rect.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            # Ảnh đã giải mã và scale theo kích thước rect được giữ trong asset_cache
+            scaled_pixmap = asset_cache.scaled(image_path, rect.width(), rect.height())
+            if not scaled_pixmap.isNull():
 
                 # Căn giữa ảnh trong rect
                 x_offset = (rect.width() - scaled_pixmap.width()) // 2
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+Log view model
+==============
+Model/view cho tab lịch sử sự kiện.
+
+Bản ghi log (LogRecord) được giữ trong một ring buffer dung lượng cố định và
+hiển thị qua QAbstractListModel + delegate tự vẽ. View chỉ vẽ các dòng đang
+nhìn thấy, nên chi phí thêm log không tăng theo số bản ghi đã lưu.
+Lọc theo mức log và theo chuỗi được thực hiện ngay trong model.
+
+PagedLogModel hiển thị kết quả tra cứu nhật ký trên đĩa, tải từng trang khi
+người dùng cuộn tới cuối; mỗi trang được truy vấn trên thread nền để GUI
+không bị treo khi quét nhiều segment.
+"""
+
+import threading
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, pyqtSignal
+from PyQt5.QtGui import QColor, QFontMetrics, QPen
+from PyQt5.QtWidgets import QStyle, QStyledItemDelegate
+
+from common.log_sink import LogRecord
+
+LOG_LEVELS = ("INFO", "SUCCESS", "WARNING", "ERROR")
+
+# Màu và biểu tượng theo mức log (giống định dạng HTML cũ của LogTab)
+LEVEL_STYLES = {
+    "ERROR": ("#EF4444", "❌"),
+    "WARNING": ("#F59E0B", "⚠️"),
+    "SUCCESS": ("#10B981", "✅"),
+    "INFO": ("#3B82F6", "ℹ️"),
+    "CAN": ("#A78BFA", "📡"),
+}
+
+RecordRole = Qt.UserRole + 1
+
+
+class LogRecordBuffer:
+    """Ring buffer dung lượng cố định cho LogRecord.
+
+    Mỗi bản ghi được gán một số thứ tự (seq) tăng dần. Bản ghi có seq nằm
+    trong [first_seq, next_seq) còn được giữ; truy cập theo seq là O(1).
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"Dung lượng ring buffer không hợp lệ: {capacity}")
+        self.capacity = capacity
+        self._items: List[Optional[LogRecord]] = [None] * capacity
+        self.first_seq = 0
+        self.next_seq = 0
+
+    def __len__(self):
+        return self.next_seq - self.first_seq
+
+    def append(self, record: LogRecord) -> int:
+        """Thêm bản ghi, ghi đè bản ghi cũ nhất khi đầy. Trả về seq."""
+        seq = self.next_seq
+        self._items[seq % self.capacity] = record
+        self.next_seq = seq + 1
+        if self.next_seq - self.first_seq > self.capacity:
+            self.first_seq = self.next_seq - self.capacity
+        return seq
+
+    def get(self, seq: int) -> LogRecord:
+        """Lấy bản ghi theo seq (seq phải còn trong buffer)."""
+        return self._items[seq % self.capacity]
+
+    def clear(self):
+        self._items = [None] * self.capacity
+        self.first_seq = self.next_seq
+
+
+class LogListModel(QAbstractListModel):
+    """Model danh sách log có giới hạn, hỗ trợ lọc theo mức và chuỗi."""
+
+    def __init__(self, capacity: int, parent=None):
+        super().__init__(parent)
+        self._buffer = LogRecordBuffer(capacity)
+        # Danh sách seq của các dòng đang hiển thị; các phần tử trước
+        # _row_head đã bị loại và được dọn dần (tránh list.pop(0))
+        self._rows: List[int] = []
+        self._row_head = 0
+        self._levels = set(LOG_LEVELS)
+        self._text = ""
+
+    # ------------------------------------------------------------------
+    # QAbstractListModel
+    # ------------------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows) - self._row_head
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.record_at(index.row())
+        if role == RecordRole:
+            return record
+        if role == Qt.DisplayRole or role == Qt.ToolTipRole:
+            return format_record_text(record)
+        return None
+
+    # ------------------------------------------------------------------
+    # Truy cập
+    # ------------------------------------------------------------------
+    @property
+    def capacity(self) -> int:
+        return self._buffer.capacity
+
+    def total_records(self) -> int:
+        """Số bản ghi đang được lưu (chưa lọc)."""
+        return len(self._buffer)
+
+    def record_at(self, row: int) -> LogRecord:
+        return self._buffer.get(self._rows[self._row_head + row])
+
+    # ------------------------------------------------------------------
+    # Thêm / xóa
+    # ------------------------------------------------------------------
+    def append_records(self, records: Iterable[LogRecord]):
+        """Thêm một lô bản ghi; bản ghi cũ nhất bị loại khi vượt dung lượng."""
+        records = list(records)
+        if not records:
+            return
+
+        buffer = self._buffer
+        new_first = max(buffer.first_seq, buffer.next_seq + len(records) - buffer.capacity)
+        self._evict_rows_before(new_first)
+
+        first_new_seq = buffer.next_seq
+        for record in records:
+            buffer.append(record)
+
+        matching = [
+            seq for seq in range(max(first_new_seq, buffer.first_seq), buffer.next_seq)
+            if self._matches(buffer.get(seq))
+        ]
+        if matching:
+            row = self.rowCount()
+            self.beginInsertRows(QModelIndex(), row, row + len(matching) - 1)
+            self._rows.extend(matching)
+            self.endInsertRows()
+
+    def clear(self):
+        """Xóa toàn bộ bản ghi."""
+        self.beginResetModel()
+        self._buffer.clear()
+        self._rows = []
+        self._row_head = 0
+        self.endResetModel()
+
+    def _evict_rows_before(self, first_seq: int):
+        """Loại các dòng hiển thị có seq < first_seq (luôn nằm ở đầu danh sách)."""
+        rows = self._rows
+        head = self._row_head
+        end = head
+        while end < len(rows) and rows[end] < first_seq:
+            end += 1
+        if end == head:
+            return
+
+        self.beginRemoveRows(QModelIndex(), 0, end - head - 1)
+        self._row_head = end
+        if end > len(rows) // 2:
+            del rows[:end]
+            self._row_head = 0
+        self.endRemoveRows()
+
+    # ------------------------------------------------------------------
+    # Lọc
+    # ------------------------------------------------------------------
+    def set_level_filter(self, levels: Iterable[str]):
+        """Chỉ hiển thị các mức log trong `levels`."""
+        levels = set(levels)
+        if levels != self._levels:
+            self._levels = levels
+            self._refilter()
+
+    def set_text_filter(self, text: str):
+        """Chỉ hiển thị bản ghi có message/source chứa `text` (không phân biệt hoa thường)."""
+        text = text.strip().lower()
+        if text != self._text:
+            self._text = text
+            self._refilter()
+
+    def _matches(self, record: LogRecord) -> bool:
+        if record.level not in self._levels:
+            return False
+        if self._text:
+            return self._text in record.message.lower() or self._text in record.source.lower()
+        return True
+
+    def _refilter(self):
+        buffer = self._buffer
+        self.beginResetModel()
+        self._rows = [
+            seq for seq in range(buffer.first_seq, buffer.next_seq)
+            if self._matches(buffer.get(seq))
+        ]
+        self._row_head = 0
+        self.endResetModel()
+
+
+class PagedLogModel(QAbstractListModel):
+    """Model kết quả tra cứu, tải thêm từng trang khi view cuộn tới cuối.
+
+    `fetch_page(cursor)` trả về (records, next_cursor); next_cursor None nghĩa
+    là đã hết kết quả. fetch_page được gọi trên thread nền, mỗi lần một trang;
+    kết quả của lượt tra cứu cũ (đã set_source lại) bị bỏ qua.
+    """
+
+    loadingChanged = pyqtSignal(bool)
+    _pageLoaded = pyqtSignal(int, object, object)  # generation, records, cursor
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._records: List[LogRecord] = []
+        self._fetch_page: Optional[Callable] = None
+        self._cursor = None
+        self._exhausted = True
+        self._loading = False
+        self._generation = 0
+        self._pageLoaded.connect(self._on_page_loaded, Qt.QueuedConnection)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self._records[index.row()]
+        if role == RecordRole:
+            return record
+        if role == Qt.DisplayRole or role == Qt.ToolTipRole:
+            return format_record_text(record)
+        return None
+
+    def record_at(self, row: int) -> LogRecord:
+        return self._records[row]
+
+    def is_exhausted(self) -> bool:
+        return self._exhausted
+
+    def is_loading(self) -> bool:
+        return self._loading
+
+    def set_source(self, fetch_page: Optional[Callable]):
+        """Bắt đầu một lượt tra cứu mới và tải trang đầu tiên."""
+        self.beginResetModel()
+        self._generation += 1
+        self._records = []
+        self._fetch_page = fetch_page
+        self._cursor = None
+        self._exhausted = fetch_page is None
+        self.endResetModel()
+        self._set_loading(False)
+        if fetch_page is not None:
+            self.fetchMore(QModelIndex())
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._loading:
+            return
+        self._set_loading(True)
+        threading.Thread(target=self._load_page, name="JournalSearch", daemon=True,
+                         args=(self._generation, self._fetch_page, self._cursor)).start()
+
+    def _load_page(self, generation, fetch_page, cursor):
+        try:
+            records, cursor = fetch_page(cursor)
+        except Exception as e:
+            print(f"Lỗi tra cứu nhật ký: {e}")
+            records, cursor = [], None
+        try:
+            self._pageLoaded.emit(generation, records, cursor)
+        except RuntimeError:
+            pass  # Model đã bị hủy khi ứng dụng thoát
+
+    def _on_page_loaded(self, generation, records, cursor):
+        if generation != self._generation:
+            return
+        self._cursor = cursor
+        self._exhausted = cursor is None
+        if records:
+            row = len(self._records)
+            self.beginInsertRows(QModelIndex(), row, row + len(records) - 1)
+            self._records.extend(records)
+            self.endInsertRows()
+        self._set_loading(False)
+
+    def _set_loading(self, loading: bool):
+        if loading != self._loading:
+            self._loading = loading
+            self.loadingChanged.emit(loading)
+
+
+def format_record_text(record: LogRecord) -> str:
+    """Dạng văn bản thuần của một bản ghi (dùng cho tooltip/copy)."""
+    time_text = datetime.fromtimestamp(record.timestamp).strftime("%Y-%m-%d %H:%M:%S")
+    icon = LEVEL_STYLES.get(record.level, LEVEL_STYLES["INFO"])[1]
+    return f"[{time_text}] {icon} [{record.level}] {record.message}"
+
+
+class LogItemDelegate(QStyledItemDelegate):
+    """Vẽ một dòng log: thời gian (xám), mức log (màu theo mức), nội dung."""
+
+    TIME_COLOR = QColor("#94A3B8")
+    TEXT_COLOR = QColor("#F1F5F9")
+    SELECTED_BACKGROUND = QColor("#334155")
+    PADDING = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._level_colors = {level: QColor(color) for level, (color, _) in LEVEL_STYLES.items()}
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), QFontMetrics(option.font).height() + 4)
+
+    def paint(self, painter, option, index):
+        record = index.data(RecordRole)
+        if record is None:
+            return
+
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, self.SELECTED_BACKGROUND)
+
+        metrics = QFontMetrics(option.font)
+        painter.setFont(option.font)
+        rect = option.rect.adjusted(self.PADDING, 0, -self.PADDING, 0)
+        x = rect.left()
+
+        time_text = datetime.fromtimestamp(record.timestamp).strftime("[%Y-%m-%d %H:%M:%S] ")
+        color, icon = LEVEL_STYLES.get(record.level, LEVEL_STYLES["INFO"])
+        level_text = f"{icon} [{record.level}] "
+
+        for text, pen_color in ((time_text, self.TIME_COLOR),
+                                (level_text, self._level_colors.get(record.level, QColor(color)))):
+            width = metrics.horizontalAdvance(text)
+            painter.setPen(QPen(pen_color))
+            painter.drawText(QRect(x, rect.top(), width, rect.height()),
+                             Qt.AlignVCenter | Qt.AlignLeft, text)
+            x += width
+
+        message_rect = QRect(x, rect.top(), max(0, rect.right() - x), rect.height())
+        painter.setPen(QPen(self.TEXT_COLOR))
+        painter.drawText(message_rect, Qt.AlignVCenter | Qt.AlignLeft,
+                         metrics.elidedText(record.message, Qt.ElideRight, message_rect.width()))
+        painter.restore()
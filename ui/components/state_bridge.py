@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Cầu nối state_store → Qt.
+
+Listener của state_store chạy trong thread ghi (receiver, compass, ...) chỉ
+gom tên nhóm thay đổi và đánh thức GUI thread qua queued connection, mỗi lần
+gom chỉ đăng một sự kiện. GUI thread phát stateChanged tối đa một lần mỗi
+chu kỳ làm tươi màn hình, với tập nhóm đã thay đổi kể từ lần phát trước, nên
+widget chỉ làm việc (và vẽ lại) khi có dữ liệu mới.
+"""
+
+import math
+import threading
+import time
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QGuiApplication
+
+from common.state_store import state_store
+
+DEFAULT_REFRESH_RATE_HZ = 60.0
+
+
+class StateSignalBridge(QtCore.QObject):
+    """Phát stateChanged(frozenset nhóm) trong GUI thread, gộp theo vsync."""
+
+    stateChanged = pyqtSignal(frozenset)
+    _wake = pyqtSignal()
+
+    def __init__(self, store=state_store, parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._wake_posted = False
+        self._frame_interval = None   # giây, đọc từ màn hình ở lần đầu cần
+        self._last_dispatch = 0.0
+        self.events = 0               # Số lần store báo thay đổi
+        self.dispatches = 0           # Số lần stateChanged được phát
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._dispatch)
+        self._wake.connect(self._on_wake, Qt.QueuedConnection)
+        store.add_listener(self._on_store_changed)
+
+    # ------------------------------------------------------------------
+    # Thread bất kỳ
+    # ------------------------------------------------------------------
+    def _on_store_changed(self, groups, sequence):
+        self.invalidate(*groups)
+
+    def invalidate(self, *groups: str):
+        """Đánh dấu nhóm cần làm mới (cũng dùng cho trạng thái cục bộ của GUI)."""
+        with self._lock:
+            self.events += 1
+            self._pending.update(groups)
+            if self._wake_posted:
+                return
+            self._wake_posted = True
+        try:
+            self._wake.emit()
+        except RuntimeError:
+            # QObject đã bị hủy khi ứng dụng thoát
+            self._store.remove_listener(self._on_store_changed)
+
+    # ------------------------------------------------------------------
+    # GUI thread
+    # ------------------------------------------------------------------
+    def frame_interval(self) -> float:
+        """Chu kỳ làm tươi của màn hình chính (giây)."""
+        if self._frame_interval is None:
+            screen = QGuiApplication.primaryScreen()
+            rate = screen.refreshRate() if screen is not None else 0.0
+            self._frame_interval = 1.0 / (rate if rate > 0 else DEFAULT_REFRESH_RATE_HZ)
+        return self._frame_interval
+
+    def _on_wake(self):
+        if self._timer.isActive():
+            return
+        wait = self._last_dispatch + self.frame_interval() - time.monotonic()
+        if wait > 0:
+            self._timer.start(max(1, math.ceil(wait * 1000)))
+        else:
+            self._dispatch()
+
+    def _dispatch(self):
+        with self._lock:
+            groups = frozenset(self._pending)
+            self._pending.clear()
+            self._wake_posted = False
+        if not groups:
+            return
+        self._last_dispatch = time.monotonic()
+        self.dispatches += 1
+        self.stateChanged.emit(groups)
+
+    def stats(self) -> dict:
+        return {'events': self.events, 'dispatches': self.dispatches,
+                'frame_interval_ms': (self._frame_interval or 0.0) * 1000}
+
+
+# Global instance
+state_bridge = StateSignalBridge()
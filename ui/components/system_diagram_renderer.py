@@ -2,7 +2,7 @@ import sys
 import os
 import time
 from PyQt5.QtCore import Qt, QRect, QTimer
-from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QFont, QFontMetrics, QLinearGradient
+from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QFont, QFontMetrics, QLinearGradient, QPixmap
 import math
 
 # Import from data_management module
@@ -11,7 +11,13 @@ from data_management import system_data_manager, get_node_id_for_compartment
 
 
 class SystemDiagramRenderer:
-    """Handles rendering of the fire control system diagram."""
+    """Handles rendering of the fire control system diagram.
+
+    Sơ đồ được vẽ theo hai lớp: lớp tĩnh (khoang, hộp, đường kết nối nền) được
+    cache trong một QPixmap và chỉ dựng lại khi kích thước widget hoặc trạng
+    thái lỗi của node thay đổi; mỗi frame animation chỉ vẽ thêm lớp sóng trên
+    các đường kết nối.
+    """
 
     def __init__(self):
         self.node_regions = []
@@ -21,7 +27,71 @@ class SystemDiagramRenderer:
         self.wave_length = 80  # Length of the gradient wave - reduced for more frequent waves
         self.animation_enabled = True
 
+        # Lớp tĩnh đã cache và khóa của nó (kích thước, DPR, status_version, animation)
+        self._static_layer = None
+        self._static_key = None
+        # Đường kết nối ghi lại khi dựng lớp tĩnh: (segment_info, total_length, base_color)
+        self._connection_paths = []
+        # Vùng bao các đường kết nối (vùng cần vẽ lại mỗi frame animation)
+        self.connection_bounds = QRect()
+
+    def _static_layer_key(self, widget_size, device_pixel_ratio=1.0):
+        return (widget_size.width(), widget_size.height(), device_pixel_ratio,
+                system_data_manager.status_version, self.animation_enabled)
+
+    def is_static_layer_stale(self, widget_size, device_pixel_ratio=1.0):
+        """True nếu lớp tĩnh cần dựng lại (đổi kích thước hoặc trạng thái node)."""
+        return self._static_key != self._static_layer_key(widget_size, device_pixel_ratio)
+
+    def invalidate_static_layer(self):
+        """Buộc dựng lại lớp tĩnh ở lần vẽ kế tiếp."""
+        self._static_key = None
+
     def draw_system_diagram(self, painter, widget_size):
+        """Vẽ sơ đồ hệ thống fire control (lớp tĩnh từ cache + lớp sóng)."""
+        device_pixel_ratio = painter.device().devicePixelRatioF()
+        if self.is_static_layer_stale(widget_size, device_pixel_ratio):
+            self._build_static_layer(widget_size, device_pixel_ratio)
+
+        painter.drawPixmap(0, 0, self._static_layer)
+        painter.setFont(QFont("Arial", 10, QFont.Normal))
+
+        if self.animation_enabled:
+            elapsed_time = time.time() - self.animation_start_time
+            for segment_info, total_length, base_color in self._connection_paths:
+                self._draw_wave_overlay(painter, segment_info, total_length, base_color, elapsed_time)
+
+    def _build_static_layer(self, widget_size, device_pixel_ratio):
+        """Vẽ toàn bộ phần tĩnh của sơ đồ vào pixmap cache."""
+        # Đọc khóa trước khi vẽ: nếu trạng thái đổi trong lúc vẽ, lần sau sẽ dựng lại
+        key = self._static_layer_key(widget_size, device_pixel_ratio)
+
+        pixmap = QPixmap(max(1, round(widget_size.width() * device_pixel_ratio)),
+                         max(1, round(widget_size.height() * device_pixel_ratio)))
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        pixmap.fill(Qt.transparent)
+
+        self._connection_paths = []
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        try:
+            self._draw_static_diagram(painter, widget_size)
+        finally:
+            painter.end()
+
+        bounds = QRect()
+        for segment_info, _, _ in self._connection_paths:
+            for segment in segment_info:
+                x1, y1, x2, y2 = segment['coords']
+                bounds = bounds.united(QRect(min(x1, x2), min(y1, y2),
+                                             abs(x2 - x1) + 1, abs(y2 - y1) + 1))
+        # Nới thêm độ dày nét vẽ sóng
+        self.connection_bounds = bounds.adjusted(-3, -3, 3, 3) if not bounds.isNull() else bounds
+
+        self._static_layer = pixmap
+        self._static_key = key
+
+    def _draw_static_diagram(self, painter, widget_size):
         """Vẽ sơ đồ hệ thống fire control."""
         # Reset danh sách vùng clickable
         self.node_regions = []
@@ -580,7 +650,7 @@ class SystemDiagramRenderer:
         return base_name
 
     def _draw_animated_connection_path(self, painter, path_segments, base_color=None):
-        """Vẽ đường kết nối hoàn chỉnh với hiệu ứng wave liên tục."""
+        """Vẽ nét nền của đường kết nối vào lớp tĩnh và ghi lại đường để vẽ sóng."""
         if not self.animation_enabled or not path_segments:
             # Fallback to normal lines if animation disabled
             for x1, y1, x2, y2 in path_segments:
@@ -607,10 +677,18 @@ class SystemDiagramRenderer:
         if total_length == 0:
             return
 
-        # Calculate current animation time and wave position
-        current_time = time.time()
-        elapsed_time = current_time - self.animation_start_time
+        # Nét nền (màu mờ) nằm trong lớp tĩnh; sóng được vẽ đè mỗi frame
+        normal_color = QColor(base_color)
+        normal_color.setAlpha(60)
+        painter.setPen(QPen(normal_color, 3))
+        for segment in segment_info:
+            if segment['length'] > 0:
+                painter.drawLine(*segment['coords'])
+
+        self._connection_paths.append((segment_info, total_length, QColor(base_color)))
 
+    def _draw_wave_overlay(self, painter, segment_info, total_length, base_color, elapsed_time):
+        """Vẽ hiệu ứng wave liên tục trên một đường kết nối đã ghi lại."""
         # Wave parameters for continuous flow
         wave_length = 60  # Wave length in pixels
         wave_half_length = wave_length / 2
@@ -633,9 +711,9 @@ class SystemDiagramRenderer:
             wave_pos = base_position - wave_offset
             wave_positions.append(wave_pos)
 
-        # Colors
-        normal_color = QColor(base_color)
-        normal_color.setAlpha(60)
+        # Colors (hai đầu gradient trong suốt để lộ nét nền của lớp tĩnh)
+        clear_color = QColor(base_color)
+        clear_color.setAlpha(0)
 
         bright_r = min(255, base_color.red() + 50)
         bright_g = min(255, base_color.green() + 50)
@@ -656,81 +734,51 @@ class SystemDiagramRenderer:
             if seg_length == 0:
                 continue
 
-            # Check if any wave affects this segment
-            affecting_waves = []
+            # Create gradient stops for all waves whose center is on this segment
+            gradient_stops = {}  # position -> color
+
             for wave_pos in wave_positions:
-                wave_start_abs = wave_pos - wave_half_length
-                wave_end_abs = wave_pos + wave_half_length
-
-                # Check if this wave overlaps with segment and is in valid range
-                wave_overlaps = not (wave_end_abs < seg_start or wave_start_abs > seg_end)
-                wave_in_valid_range = 0 <= wave_pos <= total_length
-
-                if wave_overlaps and wave_in_valid_range:
-                    affecting_waves.append({
-                        'position': wave_pos,
-                        'start': wave_start_abs,
-                        'end': wave_end_abs
-                    })
-
-            if not affecting_waves:
-                # No waves on this segment - draw normal line
-                pen = QPen(normal_color, 3)
-                painter.setPen(pen)
-                painter.drawLine(x1, y1, x2, y2)
-            else:
-                # One or more waves affect this segment - create combined gradient
-                gradient = QLinearGradient(x1, y1, x2, y2)
-
-                # Start with base color
-                gradient.setColorAt(0.0, normal_color)
-                gradient.setColorAt(1.0, normal_color)
-
-                # Create gradient stops for all affecting waves
-                gradient_stops = {}  # position -> color
-
-                for wave in affecting_waves:
-                    wave_pos = wave['position']
-                    wave_start_abs = wave['start']
-                    wave_end_abs = wave['end']
-
-                    # Convert to segment coordinates
-                    wave_seg_start = max(0.0, (wave_start_abs - seg_start) / seg_length)
-                    wave_seg_end = min(1.0, (wave_end_abs - seg_start) / seg_length)
-                    wave_seg_center = max(0.0, min(1.0, (wave_pos - seg_start) / seg_length))
-
-                    # Add gradient stops for this wave if center is in segment
-                    if 0.0 <= wave_seg_center <= 1.0 and seg_start <= wave_pos <= seg_end:
-                        wave_quarter_size = 0.06
-
-                        # Calculate wave influence points
-                        leading_edge = max(0.0, wave_seg_center - wave_quarter_size)
-                        trailing_edge = min(1.0, wave_seg_center + wave_quarter_size)
-
-                        # Add to gradient stops (brightest wins if overlap)
-                        if leading_edge > 0:
-                            pos_key = round(leading_edge * 1000)  # Avoid float precision issues
-                            if pos_key not in gradient_stops or gradient_stops[pos_key].alpha() < medium_color.alpha():
-                                gradient_stops[pos_key] = medium_color
-
-                        center_key = round(wave_seg_center * 1000)
-                        if center_key not in gradient_stops or gradient_stops[center_key].alpha() < bright_color.alpha():
-                            gradient_stops[center_key] = bright_color
-
-                        if trailing_edge < 1:
-                            pos_key = round(trailing_edge * 1000)
-                            if pos_key not in gradient_stops or gradient_stops[pos_key].alpha() < medium_color.alpha():
-                                gradient_stops[pos_key] = medium_color
-
-                # Apply all gradient stops
-                for pos_key, color in gradient_stops.items():
-                    position = pos_key / 1000.0
-                    gradient.setColorAt(position, color)
-
-                # Draw segment with combined gradient
-                pen = QPen(QBrush(gradient), 3)
-                painter.setPen(pen)
-                painter.drawLine(x1, y1, x2, y2)
+                if not (0 <= wave_pos <= total_length and seg_start <= wave_pos <= seg_end):
+                    continue
+
+                wave_seg_center = (wave_pos - seg_start) / seg_length
+                wave_quarter_size = 0.06
+
+                # Calculate wave influence points
+                leading_edge = max(0.0, wave_seg_center - wave_quarter_size)
+                trailing_edge = min(1.0, wave_seg_center + wave_quarter_size)
+
+                # Add to gradient stops (brightest wins if overlap)
+                if leading_edge > 0:
+                    pos_key = round(leading_edge * 1000)  # Avoid float precision issues
+                    if pos_key not in gradient_stops or gradient_stops[pos_key].alpha() < medium_color.alpha():
+                        gradient_stops[pos_key] = medium_color
+
+                center_key = round(wave_seg_center * 1000)
+                if center_key not in gradient_stops or gradient_stops[center_key].alpha() < bright_color.alpha():
+                    gradient_stops[center_key] = bright_color
+
+                if trailing_edge < 1:
+                    pos_key = round(trailing_edge * 1000)
+                    if pos_key not in gradient_stops or gradient_stops[pos_key].alpha() < medium_color.alpha():
+                        gradient_stops[pos_key] = medium_color
+
+            if not gradient_stops:
+                # No waves on this segment - nét nền đã có trong lớp tĩnh
+                continue
+
+            gradient = QLinearGradient(x1, y1, x2, y2)
+            gradient.setColorAt(0.0, clear_color)
+            gradient.setColorAt(1.0, clear_color)
+
+            # Apply all gradient stops
+            for pos_key, color in gradient_stops.items():
+                gradient.setColorAt(pos_key / 1000.0, color)
+
+            # Draw segment with combined gradient
+            pen = QPen(QBrush(gradient), 3)
+            painter.setPen(pen)
+            painter.drawLine(x1, y1, x2, y2)
 
     def _draw_animated_line(self, painter, x1, y1, x2, y2, base_color=None):
         """Wrapper for single line - calls the path-based method."""
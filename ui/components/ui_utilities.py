@@ -3,6 +3,7 @@
 import os
 import sys
 import yaml
+from collections import OrderedDict
 from PyQt5.QtSvg import QSvgRenderer
 from PyQt5.QtGui import QPixmap, QPainter, QIcon, QColor, QRadialGradient, QBrush, QPen, QFont
 from PyQt5.QtCore import Qt, QByteArray, QBuffer, QIODevice, QSize, pyqtProperty, QPointF, QRectF
@@ -12,9 +13,10 @@ from xml.etree import ElementTree as ET
 # Refactored: Use common utilities instead of duplicated functions
 try:
     from common.utils import resource_path, load_button_colors
-    from common.constants import Colors, SystemLimits
+    from common.constants import Colors, SystemLimits, IconCacheDefaults
 
     BUTTON_COLORS = load_button_colors()
+    ICON_CACHE_MAX_ENTRIES = IconCacheDefaults.MAX_ENTRIES
 
     def reload_button_colors():
         """Reload button colors from config.yaml"""
@@ -42,6 +44,7 @@ except ImportError:
         return os.path.join(os.path.abspath("."), relative_path)
 
     BUTTON_COLORS = load_button_colors()
+    ICON_CACHE_MAX_ENTRIES = 64
 
     def reload_button_colors():
         """Reload button colors from config.yaml"""
@@ -49,6 +52,49 @@ except ImportError:
         BUTTON_COLORS = load_button_colors()
         return BUTTON_COLORS
 
+class SVGIconCache:
+    """Cache LRU dùng chung cho các icon SVG đã đổi màu và raster hóa.
+
+    Khóa là (đường dẫn, màu, kích thước, alpha). Icon lỗi (QIcon rỗng) cũng
+    được cache để không đọc lại đĩa mỗi lần cập nhật giao diện; gọi clear()
+    nếu file SVG thay đổi trong lúc chạy.
+    """
+
+    def __init__(self, max_entries=ICON_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._icons = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(svg_path, color, size, alpha):
+        return (svg_path, str(color).lower(), (int(size[0]), int(size[1])), int(alpha))
+
+    def get(self, key, factory):
+        """Trả về icon của key, gọi factory() để tạo nếu chưa có."""
+        icon = self._icons.get(key)
+        if icon is not None:
+            self._icons.move_to_end(key)
+            self.hits += 1
+            return icon
+
+        self.misses += 1
+        icon = factory()
+        self._icons[key] = icon
+        while len(self._icons) > self.max_entries:
+            self._icons.popitem(last=False)
+        return icon
+
+    def clear(self):
+        self._icons.clear()
+
+    def stats(self):
+        return {'entries': len(self._icons), 'hits': self.hits, 'misses': self.misses}
+
+
+# Global instance
+svg_icon_cache = SVGIconCache()
+
 class SVGColorChanger:
     """Class để thay đổi màu sắc của SVG files programmatically."""
     
@@ -64,8 +110,18 @@ class SVGColorChanger:
             alpha (int): Độ trong suốt 0-255
             
         Returns:
-            QIcon: Icon với màu đã được thay đổi
+            QIcon: Icon với màu đã được thay đổi (lấy từ svg_icon_cache nếu đã tạo)
         """
+        try:
+            key = svg_icon_cache.make_key(svg_path, color, size, alpha)
+        except (TypeError, ValueError, IndexError):
+            return QIcon()
+        return svg_icon_cache.get(
+            key, lambda: SVGColorChanger._render_colored_icon(svg_path, color, size, alpha))
+
+    @staticmethod
+    def _render_colored_icon(svg_path, color, size, alpha):
+        """Đọc, đổi màu và raster hóa SVG (không qua cache)."""
         try:
             # Đọc file SVG
             full_path = resource_path(svg_path)
@@ -339,7 +395,16 @@ class ColoredSVGButton:
             border_radius (int): Bán kính viền
             isometric (bool): Có tạo hiệu ứng isometric không
             icon_alpha (int): Độ trong suốt 0-255 cho icon
+
+        Returns:
+            bool: True nếu button được thiết lập lại, False nếu kiểu đã đúng
+                  như lần gọi trước (không làm gì)
         """
+        style = (svg_path, icon_color, tuple(icon_size), top_color, border_color,
+                 border_radius, isometric, icon_alpha)
+        if getattr(button, '_svg_button_style', None) == style:
+            return False
+
         try:
             # Tạo icon với màu tùy chỉnh và alpha
             colored_icon = SVGColorChanger.create_colored_icon(svg_path, icon_color, icon_size, icon_alpha)
@@ -389,9 +454,13 @@ class ColoredSVGButton:
                             background-color: #444444;
                         }}
                     """)
-            
+
+            button._svg_button_style = style
+            return True
+
         except Exception as e:
             print(f"Error setting up colored SVG button: {e}")
+            return False
     
     @staticmethod
     def create_isometric_button(parent=None):
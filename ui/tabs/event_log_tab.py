@@ -1,128 +1,24 @@
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtWidgets import QMessageBox
-from PyQt5.QtCore import Qt, QRectF
-from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QLinearGradient
+from PyQt5.QtCore import Qt
 from ..widgets.compass_widget import AngleCompass
 from ..widgets.half_compass_widget import HalfCircleWidget
 from ..widgets.numeric_display_widget import NumericDataWidget
 from ..widgets.ammunition_widget import BulletWidget
 from ..widgets.custom_message_box_widget import CustomMessageBox
 from ..components.ui_utilities import ColoredSVGButton
+from ..components.grid_background_renderer import GridBackgroundWidget
+from ..widgets.latency_diagnostics_widget import LatencyDiagnosticsWidget
+from ..components.log_view_model import (
+    LogListModel, PagedLogModel, LogItemDelegate, LOG_LEVELS, LEVEL_STYLES
+)
+from data_management.event_journal import event_journal, parse_journal_query
 import ui.ui_config as config
 import yaml
 import random
-import math
 from common.utils import resource_path
-from scipy.interpolate import CubicSpline
-import numpy as np
-
-class GridBackgroundWidget(QtWidgets.QWidget):
-    """Widget với grid background cho toàn bộ app với hiệu ứng dot nhấp nháy."""
-    
-    def __init__(self, parent=None, enable_animation=True):
-        super().__init__(parent)
-        self.enable_animation = enable_animation
-        self.grid_spacing = 50
-        self.dot_clusters = []
-        self.animation_timer = QtCore.QTimer()
-        self.animation_timer.timeout.connect(self.update_animation)
-        if self.enable_animation:
-            self.animation_timer.start(50)  # Giảm xuống 50ms để animation mượt hơn
-        self.time_offset = 0
-        self._initialize_dot_clusters()
-    
-    def set_animation_enabled(self, enabled):
-        """Bật/tắt hiệu ứng animation."""
-        self.enable_animation = enabled
-        if enabled:
-            self.animation_timer.start(50)
-        else:
-            self.animation_timer.stop()
-        self.update()  # Cập nhật để vẽ lại
-        
-    def _initialize_dot_clusters(self):
-        """Khởi tạo hiệu ứng sóng từ trái trên xuống phải dưới."""
-        # Không cần clusters nữa, chỉ cần thông số sóng
-        self.wave_speed = 0.05  # Tăng tốc độ sóng chạy để rõ ràng hơn
-        self.wave_frequency = 0.5  # Tăng tần số để tạo sự khác biệt rõ rệt giữa các dot
-        
-    def update_animation(self):
-        """Cập nhật animation cho dot nhấp nháy."""
-        if self.enable_animation:
-            self.time_offset += 1
-            self.update()  # Trigger repaint
-        
-    def paintEvent(self, event):
-        """Vẽ grid background với dot nhấp nháy."""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        if not self.enable_animation:
-            # Chỉ vẽ background đơn giản nếu animation bị tắt
-            return
-        
-        # Vẽ lưới background với đường kẻ ngang và dọc màu xám trắng mỏng
-        painter.setPen(QPen(QColor(220, 220, 220, 80), 0.5))
-        
-        # Vẽ các đường kẻ dọc
-        for x in range(0, self.width(), self.grid_spacing):
-            painter.drawLine(x, 0, x, self.height())
-        
-        # Vẽ các đường kẻ ngang
-        for y in range(0, self.height(), self.grid_spacing):
-            painter.drawLine(0, y, self.width(), y)
-            
-        # Vẽ các dot nhấp nháy tại giao điểm
-        self._draw_blinking_dots(painter)
-        
-    def _draw_blinking_dots(self, painter):
-        """Vẽ các dot nhấp nháy theo dạng sóng từ trái trên xuống phải dưới."""
-        painter.setPen(Qt.NoPen)
-        
-        # Tính toán số lượng giao điểm
-        cols = self.width() // self.grid_spacing + 1
-        rows = self.height() // self.grid_spacing + 1
-        
-        # Tạo danh sách tất cả giao điểm hợp lệ (tránh viền)
-        margin = 20
-        for row in range(rows):
-            for col in range(cols):
-                x = col * self.grid_spacing
-                y = row * self.grid_spacing
-                
-                # Kiểm tra nếu giao điểm nằm trong vùng hợp lệ
-                if margin <= x <= self.width() - margin and margin <= y <= self.height() - margin:
-                    # Tính toán khoảng cách diagonal từ góc trái trên (0,0)
-                    # Sử dụng tổng col + row để tạo diagonal
-                    diagonal_distance = col + row
-                    
-                    # Tạo sóng chạy theo thời gian với công thức rõ ràng hơn
-                    wave_phase = self.time_offset * self.wave_speed - diagonal_distance * self.wave_frequency
-                    
-                    # Tính alpha dựa trên sóng sin với biên độ lớn hơn
-                    alpha = int(80 + 175 * math.sin(wave_phase))  # Alpha từ 80 đến 255 để rõ ràng hơn
-                    
-                    # Đảm bảo alpha trong khoảng hợp lệ
-                    alpha = max(0, min(255, alpha))
-                    
-                    # Màu dot: xanh lam nhạt với alpha theo sóng
-                    color = QColor(100, 150, 255, alpha)
-                    painter.setBrush(QBrush(color))
-                    
-                    # Vẽ dot nhỏ tại chính xác giao điểm
-                    dot_size = 2.5
-                    dot_rect = QRectF(
-                        x - dot_size/2, 
-                        y - dot_size/2,
-                        dot_size, 
-                        dot_size
-                    )
-                    painter.drawEllipse(dot_rect)
-                        
-    def resizeEvent(self, event):
-        """Khởi tạo lại dot clusters khi resize."""
-        super().resizeEvent(event)
-        self._initialize_dot_clusters()
+from common.log_sink import log_sink
+from common.constants import LogSinkDefaults, JournalDefaults
 
 class LogTab(GridBackgroundWidget):
     _instance = None  # Singleton instance
@@ -133,6 +29,11 @@ class LogTab(GridBackgroundWidget):
         self.config = config_data
         LogTab._instance = self  # Lưu instance để có thể truy cập toàn cục
         self.setupUi()
+        
+        # Xả log từ log sink theo chu kỳ cố định trên GUI thread
+        self._log_flush_timer = QtCore.QTimer(self)
+        self._log_flush_timer.timeout.connect(self._flush_pending_logs)
+        self._log_flush_timer.start(LogSinkDefaults.FLUSH_INTERVAL_MS)
     
     @staticmethod
     def set_fire_control_instance(fire_control):
@@ -162,20 +63,145 @@ class LogTab(GridBackgroundWidget):
         log_label.setAlignment(Qt.AlignCenter)
         main_layout.addWidget(log_label)
         
-        # Create text browser for displaying logs
-        self.log_browser = QtWidgets.QTextBrowser()
-        self.log_browser.setStyleSheet("""
-            QTextBrowser {
+        # Thanh lọc: mức log + chuỗi tìm kiếm
+        filter_layout = QtWidgets.QHBoxLayout()
+        filter_layout.setSpacing(8)
+        self.level_filter_buttons = {}
+        for level in LOG_LEVELS:
+            color, icon = LEVEL_STYLES[level]
+            button = QtWidgets.QPushButton(f"{icon} {level}")
+            button.setCheckable(True)
+            button.setChecked(True)
+            button.setFixedHeight(32)
+            button.setStyleSheet(f"""
+                QPushButton {{
+                    background-color: #19232D;
+                    color: #64748B;
+                    font-size: 12px;
+                    font-weight: bold;
+                    border: 2px solid #475569;
+                    border-radius: 6px;
+                    padding: 4px 10px;
+                }}
+                QPushButton:checked {{
+                    color: {color};
+                    border: 2px solid {color};
+                }}
+            """)
+            button.toggled.connect(self._apply_level_filter)
+            self.level_filter_buttons[level] = button
+            filter_layout.addWidget(button)
+        
+        self.filter_edit = QtWidgets.QLineEdit()
+        self.filter_edit.setPlaceholderText("Lọc theo nội dung...")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.setFixedHeight(32)
+        self.filter_edit.setStyleSheet("""
+            QLineEdit {
                 background-color: #1E293B;
                 color: #F1F5F9;
                 font-size: 13px;
-                font-family: 'Courier New', monospace;
-                padding: 10px;
                 border: 2px solid #475569;
-                border-radius: 8px;
+                border-radius: 6px;
+                padding: 4px 8px;
             }
         """)
-        main_layout.addWidget(self.log_browser)
+        # Chờ người dùng gõ xong mới lọc lại
+        self._filter_debounce = QtCore.QTimer(self)
+        self._filter_debounce.setSingleShot(True)
+        self._filter_debounce.setInterval(200)
+        self._filter_debounce.timeout.connect(
+            lambda: self.log_model.set_text_filter(self.filter_edit.text())
+        )
+        self.filter_edit.textChanged.connect(self._filter_debounce.start)
+        filter_layout.addWidget(self.filter_edit, 1)
+        main_layout.addLayout(filter_layout)
+        
+        # Tra cứu nhật ký trên đĩa (phân trang khi cuộn)
+        search_layout = QtWidgets.QHBoxLayout()
+        search_layout.setSpacing(8)
+        self.journal_search_edit = QtWidgets.QLineEdit()
+        self.journal_search_edit.setPlaceholderText(
+            "Tra cứu nhật ký: level:ERROR can:0x300 node:NODE-001 from:-2h to:14:30 nội dung..."
+        )
+        self.journal_search_edit.setToolTip(
+            f"Tìm theo nội dung mà không có from: chỉ tra trong "
+            f"{JournalDefaults.TEXT_SEARCH_WINDOW_S / 3600:g} giờ gần nhất"
+        )
+        self.journal_search_edit.setClearButtonEnabled(True)
+        self.journal_search_edit.setFixedHeight(32)
+        self.journal_search_edit.setStyleSheet(self.filter_edit.styleSheet())
+        self.journal_search_edit.returnPressed.connect(self.search_journal)
+        search_layout.addWidget(self.journal_search_edit, 1)
+        
+        search_btn = QtWidgets.QPushButton("Tra cứu")
+        self.live_btn = QtWidgets.QPushButton("Trực tiếp")
+        for button, handler in ((search_btn, self.search_journal), (self.live_btn, self.show_live_log)):
+            button.setFixedHeight(32)
+            button.setStyleSheet("""
+                QPushButton {
+                    background-color: #19232D;
+                    color: #F1F5F9;
+                    font-size: 12px;
+                    font-weight: bold;
+                    border: 2px solid #10B981;
+                    border-radius: 6px;
+                    padding: 4px 14px;
+                }
+                QPushButton:disabled {
+                    color: #64748B;
+                    border: 2px solid #475569;
+                }
+            """)
+            button.clicked.connect(handler)
+            search_layout.addWidget(button)
+        self.live_btn.setEnabled(False)
+        
+        # Bảng chẩn đoán độ trễ (ẩn mặc định)
+        self.latency_btn = QtWidgets.QPushButton("Độ trễ")
+        self.latency_btn.setCheckable(True)
+        self.latency_btn.setFixedHeight(32)
+        self.latency_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #19232D;
+                color: #64748B;
+                font-size: 12px;
+                font-weight: bold;
+                border: 2px solid #475569;
+                border-radius: 6px;
+                padding: 4px 14px;
+            }
+            QPushButton:checked {
+                color: #F1F5F9;
+                border: 2px solid #10B981;
+            }
+        """)
+        search_layout.addWidget(self.latency_btn)
+        main_layout.addLayout(search_layout)
+        
+        self.search_status_label = QtWidgets.QLabel("")
+        self.search_status_label.setStyleSheet("QLabel { color: #94A3B8; font-size: 12px; }")
+        self.search_status_label.hide()
+        main_layout.addWidget(self.search_status_label)
+        
+        self.latency_panel = LatencyDiagnosticsWidget(parent=self)
+        self.latency_panel.hide()
+        self.latency_btn.toggled.connect(self.latency_panel.setVisible)
+        main_layout.addWidget(self.latency_panel)
+        
+        # Danh sách log: ring buffer + model/view, chỉ vẽ các dòng đang hiển thị
+        self.log_model = LogListModel(LogSinkDefaults.VIEW_MAX_RECORDS, self)
+        self.log_view = self._create_log_view(self.log_model)
+        self.search_model = PagedLogModel(self)
+        self.search_view = self._create_log_view(self.search_model)
+        self.search_model.rowsInserted.connect(self._update_search_status)
+        self.search_model.modelReset.connect(self._update_search_status)
+        self.search_model.loadingChanged.connect(self._update_search_status)
+        
+        self.log_stack = QtWidgets.QStackedWidget()
+        self.log_stack.addWidget(self.log_view)
+        self.log_stack.addWidget(self.search_view)
+        main_layout.addWidget(self.log_stack)
         
         # Add clear button
         clear_btn = QtWidgets.QPushButton("Xóa lịch sử")
@@ -200,48 +226,116 @@ class LogTab(GridBackgroundWidget):
         clear_btn.clicked.connect(self.clear_logs)
         main_layout.addWidget(clear_btn)
     
+    def _create_log_view(self, model):
+        """Tạo view cho model log.
+        
+        QTableView với chiều cao dòng cố định không phải duyệt toàn bộ model
+        khi layout (QListView thì có), nên chi phí thêm dòng là hằng số.
+        """
+        view = QtWidgets.QTableView()
+        view.setModel(model)
+        view.setItemDelegate(LogItemDelegate(view))
+        view.horizontalHeader().hide()
+        view.horizontalHeader().setStretchLastSection(True)
+        view.verticalHeader().hide()
+        view.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        view.setShowGrid(False)
+        view.setWordWrap(False)
+        view.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        view.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        view.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        view.setStyleSheet("""
+            QTableView {
+                background-color: #1E293B;
+                color: #F1F5F9;
+                font-size: 13px;
+                font-family: 'Courier New', monospace;
+                padding: 10px;
+                border: 2px solid #475569;
+                border-radius: 8px;
+            }
+        """)
+        view.verticalHeader().setDefaultSectionSize(view.fontMetrics().height() + 4)
+        return view
+    
+    def search_journal(self):
+        """Tra cứu nhật ký trên đĩa theo chuỗi trong ô tra cứu."""
+        text = self.journal_search_edit.text().strip()
+        try:
+            query = parse_journal_query(text)
+        except ValueError as e:
+            self.search_status_label.setText(f"Chuỗi tra cứu không hợp lệ: {e}")
+            self.search_status_label.show()
+            return
+        
+        def fetch_page(cursor):
+            page = event_journal.search(query, JournalDefaults.PAGE_SIZE, cursor)
+            return page.records, page.cursor
+        
+        self.search_model.set_source(fetch_page)
+        self.log_stack.setCurrentWidget(self.search_view)
+        self.live_btn.setEnabled(True)
+        self.search_status_label.show()
+    
+    def show_live_log(self):
+        """Quay lại danh sách log trực tiếp."""
+        self.search_model.set_source(None)
+        self.log_stack.setCurrentWidget(self.log_view)
+        self.live_btn.setEnabled(False)
+        self.search_status_label.hide()
+    
+    def _update_search_status(self, *args):
+        count = self.search_model.rowCount()
+        if self.search_model.is_loading():
+            suffix = " (đang tra cứu...)"
+        else:
+            suffix = "" if self.search_model.is_exhausted() else " (cuộn xuống để tải thêm)"
+        self.search_status_label.setText(f"{count} kết quả{suffix}")
+    
+    def _show_error_indicator(self):
+        """Hiển thị chấm đỏ trên tab lịch sử khi có ERROR."""
+        if LogTab._fire_control_instance:
+            try:
+                LogTab._fire_control_instance.show_error_indicator()
+            except Exception as e:
+                print(f"Không thể hiển thị error indicator: {e}")
+    
+    def _apply_level_filter(self):
+        """Cập nhật bộ lọc mức log theo các nút đang bật."""
+        self.log_model.set_level_filter(
+            level for level, button in self.level_filter_buttons.items() if button.isChecked()
+        )
+    
+    def _append_records(self, records):
+        """Thêm lô bản ghi vào model; chỉ tự cuộn khi đang ở cuối danh sách."""
+        scroll_bar = self.log_view.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+        
+        if any(record.level == "ERROR" for record in records):
+            self._show_error_indicator()
+        
+        self.log_model.append_records(records)
+        if at_bottom:
+            self.log_view.scrollToBottom()
+    
     def add_log(self, message, level="INFO"):
-        """Thêm log message vào log browser.
+        """Thêm log message vào danh sách log qua log sink (được ghi vào nhật ký).
         
         Args:
             message: Nội dung log
             level: Mức độ log (INFO, WARNING, ERROR)
         """
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Định dạng màu theo level
-        if level == "ERROR":
-            color = "#EF4444"  # Đỏ
-            icon = "❌"
-            # Hiển thị chấm đỏ trên tab lịch sử khi có ERROR
-            if LogTab._fire_control_instance:
-                try:
-                    LogTab._fire_control_instance.show_error_indicator()
-                except Exception as e:
-                    print(f"Không thể hiển thị error indicator: {e}")
-        elif level == "WARNING":
-            color = "#F59E0B"  # Vàng
-            icon = "⚠️"
-        elif level == "SUCCESS":
-            color = "#10B981"  # Xanh lá
-            icon = "✅"
-        else:  # INFO
-            color = "#3B82F6"  # Xanh dương
-            icon = "ℹ️"
-        
-        # Thêm HTML formatted log
-        log_html = f'<span style="color: #94A3B8;">[{timestamp}]</span> <span style="color: {color};">{icon} [{level}]</span> {message}'
-        self.log_browser.append(log_html)
-        
-        # Scroll to bottom
-        self.log_browser.verticalScrollBar().setValue(
-            self.log_browser.verticalScrollBar().maximum()
-        )
+        log_sink.emit(message, level, "app")
+    
+    def _flush_pending_logs(self):
+        """Xả các bản ghi đang chờ trong log sink vào model theo lô."""
+        records = log_sink.drain(LogSinkDefaults.MAX_BATCH)
+        if records:
+            self._append_records(records)
     
     def clear_logs(self):
-        """Xóa tất cả logs."""
-        self.log_browser.clear()
+        """Xóa danh sách log đang hiển thị (nhật ký trên đĩa vẫn được giữ)."""
+        self.log_model.clear()
         self.add_log("Đã xóa lịch sử sự kiện", "INFO")
     
     @staticmethod
@@ -250,15 +344,15 @@ class LogTab(GridBackgroundWidget):
         return LogTab._instance
     
     @staticmethod
-    def log(message, level="INFO"):
-        """Static method để ghi log từ bất kỳ đâu.
+    def log(message, level="INFO", source="app", can_id=None):
+        """Static method để ghi log từ bất kỳ đâu (an toàn với mọi thread).
+        
+        Log được đưa vào log sink và hiển thị theo lô trên GUI thread.
         
         Args:
             message: Nội dung log
             level: Mức độ log (INFO, WARNING, ERROR, SUCCESS)
+            source: Nguồn log (dùng cho giới hạn tốc độ)
+            can_id: CAN ID liên quan (dùng cho lấy mẫu), nếu có
         """
-        instance = LogTab.get_instance()
-        if instance:
-            instance.add_log(message, level)
-        else:
-            print(f"[{level}] {message}")
+        log_sink.emit(message, level, source, can_id)
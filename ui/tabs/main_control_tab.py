@@ -1,7 +1,5 @@
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtWidgets import QMessageBox, QPushButton, QLabel
-from PyQt5.QtCore import Qt, QRectF
-from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QLinearGradient
 from ..widgets.compass_widget import AngleCompass
 from ..widgets.half_compass_widget import HalfCircleWidget
 from ..widgets.numeric_display_widget import NumericDataWidget
@@ -10,127 +8,27 @@ from ..widgets.custom_message_box_widget import CustomMessageBox, ConfirmationWi
 from ..widgets.ballistic_calculator_dialog import BallisticCalculatorWidget
 from ..widgets.angle_input_dialog import AngleInputDialog
 from ..components.ui_utilities import ColoredSVGButton
+from ..components.grid_background_renderer import GridBackgroundWidget
+from ..components.state_bridge import state_bridge
+from common.state_store import state_store
+from common.latency_trace import latency_tracer
 import ui.ui_config as config
 from communication.data_sender import sender_angle_direction, sender_ammo_status
 from communication.can_config import CAN_ID_ANGLE_LEFT, CAN_ID_ANGLE_RIGHT
 import yaml
 import random
-import math
-from common.utils import resource_path, get_firing_table_interpolator, load_firing_table
+from common.utils import resource_path
+from common.ballistics import get_firing_table_interpolator, get_high_firing_table_interpolator
+from common.constants import WeaponSystem
+
+# Nhóm giả dùng để yêu cầu MainTab làm mới khi chỉ trạng thái cục bộ thay đổi
+UPDATE_REQUEST_GROUP = "main_tab"
 
-class GridBackgroundWidget(QtWidgets.QWidget):
-    """Widget với grid background cho toàn bộ app với hiệu ứng dot nhấp nháy."""
-    
-    def __init__(self, parent=None, enable_animation=True):
-        super().__init__(parent)
-        self.enable_animation = enable_animation
-        self.grid_spacing = 50
-        self.dot_clusters = []
-        self.animation_timer = QtCore.QTimer()
-        self.animation_timer.timeout.connect(self.update_animation)
-        if self.enable_animation:
-            self.animation_timer.start(50)  # Giảm xuống 50ms để animation mượt hơn
-        self.time_offset = 0
-        self._initialize_dot_clusters()
-    
-    def set_animation_enabled(self, enabled):
-        """Bật/tắt hiệu ứng animation."""
-        self.enable_animation = enabled
-        if enabled:
-            self.animation_timer.start(50)
-        else:
-            self.animation_timer.stop()
-        self.update()  # Cập nhật để vẽ lại
-        
-    def _initialize_dot_clusters(self):
-        """Khởi tạo hiệu ứng sóng từ trái trên xuống phải dưới."""
-        # Không cần clusters nữa, chỉ cần thông số sóng
-        self.wave_speed = 0.05  # Tăng tốc độ sóng chạy để rõ ràng hơn
-        self.wave_frequency = 0.5  # Tăng tần số để tạo sự khác biệt rõ rệt giữa các dot
-        
-    def update_animation(self):
-        """Cập nhật animation cho dot nhấp nháy."""
-        if self.enable_animation:
-            self.time_offset += 1
-            self.update()  # Trigger repaint
-        
-    def paintEvent(self, event):
-        """Vẽ grid background với dot nhấp nháy."""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        if not self.enable_animation:
-            # Chỉ vẽ background đơn giản nếu animation bị tắt
-            return
-        
-        # Vẽ lưới background với đường kẻ ngang và dọc màu xám trắng mỏng
-        painter.setPen(QPen(QColor(220, 220, 220, 80), 0.5))
-        
-        # Vẽ các đường kẻ dọc
-        for x in range(0, self.width(), self.grid_spacing):
-            painter.drawLine(x, 0, x, self.height())
-        
-        # Vẽ các đường kẻ ngang
-        for y in range(0, self.height(), self.grid_spacing):
-            painter.drawLine(0, y, self.width(), y)
-            
-        # Vẽ các dot nhấp nháy tại giao điểm
-        self._draw_blinking_dots(painter)
-        
-    def _draw_blinking_dots(self, painter):
-        """Vẽ các dot nhấp nháy theo dạng sóng từ trái trên xuống phải dưới."""
-        painter.setPen(Qt.NoPen)
-        
-        # Tính toán số lượng giao điểm
-        cols = self.width() // self.grid_spacing + 1
-        rows = self.height() // self.grid_spacing + 1
-        
-        # Tạo danh sách tất cả giao điểm hợp lệ (tránh viền)
-        margin = 20
-        for row in range(rows):
-            for col in range(cols):
-                x = col * self.grid_spacing
-                y = row * self.grid_spacing
-                
-                # Kiểm tra nếu giao điểm nằm trong vùng hợp lệ
-                if margin <= x <= self.width() - margin and margin <= y <= self.height() - margin:
-                    # Tính toán khoảng cách diagonal từ góc trái trên (0,0)
-                    # Sử dụng tổng col + row để tạo diagonal
-                    diagonal_distance = col + row
-                    
-                    # Tạo sóng chạy theo thời gian với công thức rõ ràng hơn
-                    wave_phase = self.time_offset * self.wave_speed - diagonal_distance * self.wave_frequency
-                    
-                    # Tính alpha dựa trên sóng sin với biên độ lớn hơn
-                    alpha = int(80 + 175 * math.sin(wave_phase))  # Alpha từ 80 đến 255 để rõ ràng hơn
-                    
-                    # Đảm bảo alpha trong khoảng hợp lệ
-                    alpha = max(0, min(255, alpha))
-                    
-                    # Màu dot: xanh lam nhạt với alpha theo sóng
-                    color = QColor(100, 150, 255, alpha)
-                    painter.setBrush(QBrush(color))
-                    
-                    # Vẽ dot nhỏ tại chính xác giao điểm
-                    dot_size = 2.5
-                    dot_rect = QRectF(
-                        x - dot_size/2, 
-                        y - dot_size/2,
-                        dot_size, 
-                        dot_size
-                    )
-                    painter.drawEllipse(dot_rect)
-                        
-    def resizeEvent(self, event):
-        """Khởi tạo lại dot clusters khi resize."""
-        super().resizeEvent(event)
-        self._initialize_dot_clusters()
 
 class MainTab(GridBackgroundWidget):
     def __init__(self, config_data, parent=None):
         super().__init__(parent, enable_animation=config_data['MainWindow'].get('background_animation', True))
         self.config = config_data
-        self._data_timer = None  # Thêm biến timer
         self._buttons_active_state = False  # Theo dõi trạng thái hiện tại của OK/Cancel button
         self._launch_all_active_state = False  # Theo dõi trạng thái hiện tại của Launch All button
         
@@ -400,10 +298,10 @@ class MainTab(GridBackgroundWidget):
         self.make_connection()
         # Khởi tạo trạng thái nút ban đầu
         self._update_action_buttons_state()
-        # Khởi động timer để update dữ liệu liên tục
-        self._data_timer = QtCore.QTimer()
-        self._data_timer.timeout.connect(self.update_data)
-        self._data_timer.start(100)  # 100ms, có thể chỉnh lại nếu muốn nhanh/chậm hơn
+        # Cập nhật khi trạng thái dùng chung (hoặc lựa chọn ống phóng) thay đổi,
+        # tối đa một lần mỗi khung hình, thay vì quét theo chu kỳ
+        state_bridge.stateChanged.connect(self._on_state_changed)
+        self.bullet_widget.selectionChanged.connect(self.request_update)
 
     def retranslateUi(self):
         pass  # No translation needed here
@@ -441,6 +339,7 @@ class MainTab(GridBackgroundWidget):
             f"Bạn có chắc chắn phóng {selected_count} ống đã chọn?"
         )
     
+    @latency_tracer.traced_command
     def _execute_launch(self):
         """Thực hiện phóng sau khi xác nhận."""
         left_selected = self.bullet_widget.left_selected_launchers.copy()
@@ -520,35 +419,16 @@ class MainTab(GridBackgroundWidget):
 
     def on_cancel_button_clicked(self):
         """Xử lý sự kiện khi nhấn nút Cancel."""
-        # Xóa danh sách các ống phóng đã chọn
-        self.bullet_widget.left_selected_launchers.clear()
-        self.bullet_widget.right_selected_launchers.clear()
-        
-        # Cập nhật lại giao diện
-        self.bullet_widget._update_launcher_status("Giàn trái", 
-                                                self.bullet_widget.left_launcher_status)
-        self.bullet_widget._update_launcher_status("Giàn phải", 
-                                                self.bullet_widget.right_launcher_status)
+        # Xóa danh sách các ống phóng đã chọn (chỉ vẽ lại các nút bị bỏ chọn)
+        self.bullet_widget.clear_selection()
         
         # Cập nhật trạng thái nút
         self._update_action_buttons_state()
 
     def on_launch_all_button_clicked(self):
         """Xử lý sự kiện khi nhấn nút Launch All."""
-        # Chọn tất cả các ống phóng sẵn sàng
-        
-        self.bullet_widget.left_selected_launchers.clear()
-        self.bullet_widget.right_selected_launchers.clear()
-
-        for idx in range(18):
-            if self.bullet_widget.left_launcher_status[idx]:
-                self.bullet_widget.left_selected_launchers.append(idx + 1)
-            if self.bullet_widget.right_launcher_status[idx]:
-                self.bullet_widget.right_selected_launchers.append(idx + 1)
-        
-        # Cập nhật giao diện để hiển thị các ống phóng đã chọn
-        self.bullet_widget._update_launcher_status("Giàn trái", self.bullet_widget.left_launcher_status)
-        self.bullet_widget._update_launcher_status("Giàn phải", self.bullet_widget.right_launcher_status)
+        # Chọn tất cả các ống phóng sẵn sàng và cập nhật giao diện
+        self.bullet_widget.select_all_ready()
         # Gọi hàm xử lý OK để phóng
         self.on_ok_button_clicked()
 
@@ -645,6 +525,7 @@ class MainTab(GridBackgroundWidget):
         # Hiển thị overlay
         self.angle_input_dialog.show()
         
+    @latency_tracer.traced_command
     def _handle_angle_input_accepted(self, side, idx):
         """Xử lý khi người dùng xác nhận nhập khoảng cách và góc hướng."""
         # Lấy giá trị đã nhập
@@ -696,8 +577,8 @@ class MainTab(GridBackgroundWidget):
                     config.DISTANCE_R = distance
             
             # Chọn bảng bắn dựa trên lựa chọn của người dùng (chỉ khi khoảng cách >= 9100)
-            if use_high_table and distance >= 9100:
-                interpolator = load_firing_table("table1_high.csv")
+            if use_high_table and distance >= WeaponSystem.HIGH_TABLE_MIN_DISTANCE:
+                interpolator = get_high_firing_table_interpolator()
                 table_name = "bảng bắn cao"
             else:
                 interpolator = get_firing_table_interpolator()
@@ -725,7 +606,7 @@ class MainTab(GridBackgroundWidget):
                 
                 # Log thông tin bảng bắn được sử dụng
                 from ui.tabs.event_log_tab import LogTab
-                if distance >= 9100:
+                if distance >= WeaponSystem.HIGH_TABLE_MIN_DISTANCE:
                     LogTab.log(f"Sử dụng {table_name} cho khoảng cách {distance:.1f}m - Góc tầm: {elevation:.1f}°", "INFO")
             else:
                 from ui.tabs.event_log_tab import LogTab
@@ -740,23 +621,22 @@ class MainTab(GridBackgroundWidget):
         self.direction_correction_left = corrections['direction_correction_left']
         self.direction_correction_right = corrections['direction_correction_right']
         
-        # Lượng sửa sẽ được áp dụng tự động trong update_data()
+        # Lượng sửa sẽ được áp dụng trong lần update_data() kế tiếp
+        self.request_update()
 
     def _update_action_buttons_state(self):
         """Cập nhật trạng thái và giao diện của OK Button và Cancel Button dựa trên việc có nút nào được chọn."""
-        has_selection = (len(self.bullet_widget.left_selected_launchers) > 0 or 
-                         len(self.bullet_widget.right_selected_launchers) > 0)
+        has_selection = self.bullet_widget.has_selection()
         btn_colors = self.config.get('ButtonColors', {})
 
         # Kiểm tra có ống phóng nào sẵn sàng không (cho Launch All button)
-        has_ready_launchers = (any(self.bullet_widget.left_launcher_status) or 
-                               any(self.bullet_widget.right_launcher_status))
+        has_ready_launchers = self.bullet_widget.has_ready_launchers()
 
         # Luôn cập nhật OK Button và Cancel Button với màu mới từ config
         if has_selection:
             # Có nút được chọn - sử dụng màu enabled thay vì selected
             enabled = btn_colors.get('enabled', {})
-            ColoredSVGButton.setup_button(
+            ok_changed = ColoredSVGButton.setup_button(
                 self.ok_button, 
                 "assets/Icons/launch.svg",
                 icon_color=enabled.get("icon_color", "#000000"),
@@ -767,7 +647,7 @@ class MainTab(GridBackgroundWidget):
                 border_radius=8,
                 isometric=True
             )
-            ColoredSVGButton.setup_button(
+            cancel_changed = ColoredSVGButton.setup_button(
                 self.cancel_button, 
                 "assets/Icons/cancel.svg",
                 icon_color=enabled.get("icon_color", "#000000"),
@@ -787,7 +667,7 @@ class MainTab(GridBackgroundWidget):
         else:
             # Không có nút nào được chọn - nút màu đen, SVG màu trắng, độ cao isometric bình thường
             disabled = btn_colors.get('disabled', {})
-            ColoredSVGButton.setup_button(
+            ok_changed = ColoredSVGButton.setup_button(
                 self.ok_button, 
                 "assets/Icons/launch.svg",
                 icon_color=disabled.get("icon_color", "#ffffff"),
@@ -798,7 +678,7 @@ class MainTab(GridBackgroundWidget):
                 border_radius=8,
                 isometric=True
             )
-            ColoredSVGButton.setup_button(
+            cancel_changed = ColoredSVGButton.setup_button(
                 self.cancel_button, 
                 "assets/Icons/cancel.svg",
                 icon_color=disabled.get("icon_color", "#ffffff"),
@@ -819,7 +699,7 @@ class MainTab(GridBackgroundWidget):
         # Luôn cập nhật Launch All Button với màu mới từ config
         if has_ready_launchers:
             enabled = btn_colors.get('enabled', {})
-            ColoredSVGButton.setup_button(
+            launch_all_changed = ColoredSVGButton.setup_button(
                 self.launch_all_button, 
                 "assets/Icons/launch_all.svg",
                 icon_color=enabled.get("icon_color", "#000000"),
@@ -834,7 +714,7 @@ class MainTab(GridBackgroundWidget):
             self.launch_all_button.setEnabled(True)
         else:
             disabled = btn_colors.get('disabled', {})
-            ColoredSVGButton.setup_button(
+            launch_all_changed = ColoredSVGButton.setup_button(
                 self.launch_all_button, 
                 "assets/Icons/launch_all.svg",
                 icon_color=disabled.get("icon_color", "#ffffff"),
@@ -850,7 +730,7 @@ class MainTab(GridBackgroundWidget):
 
         # Calculator Button luôn luôn enabled với màu enabled
         enabled = btn_colors.get('enabled', {})
-        ColoredSVGButton.setup_button(
+        calculator_changed = ColoredSVGButton.setup_button(
             self.calculator_button, 
             "assets/Icons/calculator.svg",
             icon_color=enabled.get("icon_color", "#000000"),
@@ -864,48 +744,83 @@ class MainTab(GridBackgroundWidget):
         self.calculator_button.offset_y = 12
         self.calculator_button.setEnabled(True)
 
-        # Trigger repaint cho tất cả button
-        self.ok_button.update()
-        self.cancel_button.update()
-        self.launch_all_button.update()
-        self.calculator_button.update()
+        # Chỉ vẽ lại button có kiểu thay đổi (offset_y đổi cùng với kiểu);
+        # ở trạng thái ổn định hàm này không tạo thêm repaint nào
+        for button, changed in ((self.ok_button, ok_changed),
+                                (self.cancel_button, cancel_changed),
+                                (self.launch_all_button, launch_all_changed),
+                                (self.calculator_button, calculator_changed)):
+            if changed:
+                button.update()
+
+    def request_update(self):
+        """Yêu cầu update_data() ở khung hình kế tiếp (cho thay đổi cục bộ của tab)."""
+        state_bridge.invalidate(UPDATE_REQUEST_GROUP)
+
+    def _on_state_changed(self, groups):
+        origins = latency_tracer.frame_dispatched(groups)
+        self.update_data()
+        if origins:
+            self._expect_paint(origins)
+
+    def _expect_paint(self, origins):
+        """Báo cho latency_tracer frame nào sẽ được hiển thị ở lần vẽ kế tiếp.
+
+        Half compass hiển thị cả góc/hướng hiện tại lẫn góc/hướng mục tiêu của
+        một giàn và luôn vẽ lại sau update_angle(). Widget đang ẩn không vẽ,
+        nên không được đăng ký.
+        """
+        for widget, groups in ((self.half_compass_left, (config.GROUP_CANNON_L, config.GROUP_TARGET_L)),
+                               (self.half_compass_right, (config.GROUP_CANNON_R, config.GROUP_TARGET_R))):
+            timestamps = [origins[group] for group in groups if group in origins]
+            if timestamps and widget.isVisible():
+                latency_tracer.expect_paint(widget, min(timestamps))
 
     def update_data(self):
         """Cập nhật các thông số, trang thái của các ống phóng và góc hướng hiện tại
         và góc tính toán từ hệ thống điều khiển bắn.
         """
-        # Tính toán góc tầm MỤC TIÊU liên tục từ khoảng cách hiện tại
+        # Đọc toàn bộ trạng thái một lần (nhất quán giữa giàn trái/phải)
+        state = state_store.snapshot()
+
+        # Tính toán góc tầm MỤC TIÊU từ khoảng cách hiện tại
         # Chỉ cập nhật khi đang ở chế độ nhập khoảng cách (không nhập góc tầm trực tiếp)
         
         # AIM_ANGLE = góc mục tiêu (từ nội suy bảng bắn)
-        # Chỉ cập nhật tự động khi đang ở chế độ nhập khoảng cách
-        if config.ELEVATION_INPUT_FROM_DISTANCE_L:
+        aim_angle_l = state.AIM_ANGLE_L
+        aim_angle_r = state.AIM_ANGLE_R
+        computed = {}
+        if state.ELEVATION_INPUT_FROM_DISTANCE_L:
             # Chọn bảng bắn dựa trên USE_HIGH_TABLE_L
-            if config.USE_HIGH_TABLE_L and config.DISTANCE_L >= 9100:
-                interpolator_l = load_firing_table("table1_high.csv")
+            if state.USE_HIGH_TABLE_L and state.DISTANCE_L >= WeaponSystem.HIGH_TABLE_MIN_DISTANCE:
+                interpolator_l = get_high_firing_table_interpolator()
             else:
                 interpolator_l = get_firing_table_interpolator()
             
             if interpolator_l:
-                config.AIM_ANGLE_L = interpolator_l.interpolate_angle(config.DISTANCE_L)
+                aim_angle_l = computed['AIM_ANGLE_L'] = interpolator_l.interpolate_angle(state.DISTANCE_L)
         
-        if config.ELEVATION_INPUT_FROM_DISTANCE_R:
+        if state.ELEVATION_INPUT_FROM_DISTANCE_R:
             # Chọn bảng bắn dựa trên USE_HIGH_TABLE_R
-            if config.USE_HIGH_TABLE_R and config.DISTANCE_R >= 9100:
-                interpolator_r = load_firing_table("table1_high.csv")
+            if state.USE_HIGH_TABLE_R and state.DISTANCE_R >= WeaponSystem.HIGH_TABLE_MIN_DISTANCE:
+                interpolator_r = get_high_firing_table_interpolator()
             else:
                 interpolator_r = get_firing_table_interpolator()
             
             if interpolator_r:
-                config.AIM_ANGLE_R = interpolator_r.interpolate_angle(config.DISTANCE_R)
+                aim_angle_r = computed['AIM_ANGLE_R'] = interpolator_r.interpolate_angle(state.DISTANCE_R)
+
+        # Ghi lại góc tầm mục tiêu đã tính (không tạo sự kiện nếu không đổi)
+        if computed:
+            state_store.update(**computed)
         
         # AIM_DIRECTION_L/R = hướng mục tiêu (được set từ targeting hoặc ballistic calculator)
         # KHÔNG tự động cập nhật ở đây - chỉ được set khi có tính toán mục tiêu
         # ANGLE_L/R và DIRECTION_L/R = góc/hướng HIỆN TẠI từ cảm biến (CAN bus)
         # Sẽ được cập nhật từ data_receiver khi nhận CAN bus 0x200, 0x201
         
-        self.bullet_widget._update_launcher_status("Giàn trái", config.AMMO_L)
-        self.bullet_widget._update_launcher_status("Giàn phải", config.AMMO_R)
+        self.bullet_widget._update_launcher_status("Giàn trái", state.AMMO_L)
+        self.bullet_widget._update_launcher_status("Giàn phải", state.AMMO_R)
         
         # Cập nhật trạng thái của OK Button và Cancel Button
         self._update_action_buttons_state()
@@ -914,14 +829,14 @@ class MainTab(GridBackgroundWidget):
         # DIRECTION_L/R = hướng hiện tại, AIM_DIRECTION_L/R = hướng mục tiêu
         # Áp dụng lượng sửa vào hướng mục tiêu hiển thị
         self.compass_left.update_angle(
-            aim_direction=config.AIM_DIRECTION_L + self.direction_correction_left, 
-            current_direction=config.DIRECTION_L, 
-            w_direction=config.W_DIRECTION
+            aim_direction=state.AIM_DIRECTION_L + self.direction_correction_left, 
+            current_direction=state.DIRECTION_L, 
+            w_direction=state.W_DIRECTION
         )
         self.compass_right.update_angle(
-            aim_direction=config.AIM_DIRECTION_R + self.direction_correction_right, 
-            current_direction=config.DIRECTION_R, 
-            w_direction=config.W_DIRECTION
+            aim_direction=state.AIM_DIRECTION_R + self.direction_correction_right, 
+            current_direction=state.DIRECTION_R, 
+            w_direction=state.W_DIRECTION
         )
         # self.compass_left.update_angle(aim_direction=-70, current_direction=-100, w_direction=config.W_DIRECTION)
         # self.compass_right.update_angle(aim_direction=90, current_direction=90, w_direction=w_direction)
@@ -929,16 +844,16 @@ class MainTab(GridBackgroundWidget):
         # ANGLE_L/R = góc hiện tại từ cảm biến, AIM_ANGLE_L/R = góc mục tiêu từ nội suy
         # Áp dụng lượng sửa (nếu có) vào góc mục tiêu hiển thị
         self.half_compass_left.update_angle(
-            current_angle=config.ANGLE_L, 
-            aim_angle=config.AIM_ANGLE_L + self.elevation_correction_left, 
-            current_direction=config.DIRECTION_L, 
-            aim_direction=config.AIM_DIRECTION_L + self.direction_correction_left
+            current_angle=state.ANGLE_L, 
+            aim_angle=aim_angle_l + self.elevation_correction_left, 
+            current_direction=state.DIRECTION_L, 
+            aim_direction=state.AIM_DIRECTION_L + self.direction_correction_left
         )
         self.half_compass_right.update_angle(
-            current_angle=config.ANGLE_R, 
-            aim_angle=config.AIM_ANGLE_R + self.elevation_correction_right, 
-            current_direction=config.DIRECTION_R, 
-            aim_direction=config.AIM_DIRECTION_R + self.direction_correction_right
+            current_angle=state.ANGLE_R, 
+            aim_angle=aim_angle_r + self.elevation_correction_right, 
+            current_direction=state.DIRECTION_R, 
+            aim_direction=state.AIM_DIRECTION_R + self.direction_correction_right
         )
         # self.half_compass_left.update_angle(current_angle=15, aim_angle=15,
         #                                     current_direction=45, aim_direction=16)
@@ -946,24 +861,24 @@ class MainTab(GridBackgroundWidget):
         #                                      current_direction=45, aim_direction=45)
         
         # Tính góc mục tiêu sau khi áp dụng lượng sửa (để hiển thị trong numeric display)
-        aim_angle_left_corrected = config.AIM_ANGLE_L + self.elevation_correction_left
-        aim_angle_right_corrected = config.AIM_ANGLE_R + self.elevation_correction_right
-        aim_direction_left_corrected = config.AIM_DIRECTION_L + self.direction_correction_left
-        aim_direction_right_corrected = config.AIM_DIRECTION_R + self.direction_correction_right
+        aim_angle_left_corrected = aim_angle_l + self.elevation_correction_left
+        aim_angle_right_corrected = aim_angle_r + self.elevation_correction_right
+        aim_direction_left_corrected = state.AIM_DIRECTION_L + self.direction_correction_left
+        aim_direction_right_corrected = state.AIM_DIRECTION_R + self.direction_correction_right
         
         # Tạo text hiển thị chế độ
-        mode_text_l = "AUTO" if config.DISTANCE_MODE_AUTO_L else "MANUAL"
-        mode_text_r = "AUTO" if config.DISTANCE_MODE_AUTO_R else "MANUAL"
+        mode_text_l = "AUTO" if state.DISTANCE_MODE_AUTO_L else "MANUAL"
+        mode_text_r = "AUTO" if state.DISTANCE_MODE_AUTO_R else "MANUAL"
         
         self.numeric_data_widget.update_data(
             **{
-                "Hướng ngắm hiện tại (độ)": (f"{config.DIRECTION_L:.1f}", f"{config.DIRECTION_R:.1f}"),
+                "Hướng ngắm hiện tại (độ)": (f"{state.DIRECTION_L:.1f}", f"{state.DIRECTION_R:.1f}"),
                 "Hướng ngắm mục tiêu (độ)": (f"{aim_direction_left_corrected:.1f}", f"{aim_direction_right_corrected:.1f}"),
-                "Góc tầm hiện tại (độ)": (f"{config.ANGLE_L:.1f}", f"{config.ANGLE_R:.1f}"),
+                "Góc tầm hiện tại (độ)": (f"{state.ANGLE_L:.1f}", f"{state.ANGLE_R:.1f}"),
                 "Góc tầm mục tiêu (độ)": (f"{aim_angle_left_corrected:.1f}", f"{aim_angle_right_corrected:.1f}"),
                 "Pháo sẵn sàng": (str(sum(self.bullet_widget.left_launcher_status)), str(sum(self.bullet_widget.right_launcher_status))),
                 "Pháo đã chọn": (str(len(self.bullet_widget.left_selected_launchers)), str(len(self.bullet_widget.right_selected_launchers))),
-                "Khoảng cách (m)": (f"{config.DISTANCE_L:.2f}", f"{config.DISTANCE_R:.2f}"),
+                "Khoảng cách (m)": (f"{state.DISTANCE_L:.2f}", f"{state.DISTANCE_R:.2f}"),
                 "Chế độ K/C": (mode_text_l, mode_text_r)
             }
         )
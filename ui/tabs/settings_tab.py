@@ -4,8 +4,8 @@ from PyQt5.QtCore import Qt, QRectF, QTimer, QPointF, QPropertyAnimation, QEasin
 from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QRadialGradient
 from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QLinearGradient
 import yaml
-import math
 from common.utils import resource_path
+from ..components.grid_background_renderer import GridBackgroundWidget
 
 class RippleButton(QtWidgets.QPushButton):
     """Custom QPushButton với hiệu ứng Ripple (sóng lan) như Material Design."""
@@ -99,114 +99,6 @@ class RippleButton(QtWidgets.QPushButton):
             )
             painter.drawEllipse(ripple_rect)
 
-class GridBackgroundWidget(QtWidgets.QWidget):
-    """Widget với grid background cho toàn bộ app với hiệu ứng dot nhấp nháy."""
-    
-    def __init__(self, parent=None, enable_animation=True):
-        super().__init__(parent)
-        self.enable_animation = enable_animation
-        self.grid_spacing = 50
-        self.dot_clusters = []
-        self.animation_timer = QtCore.QTimer()
-        self.animation_timer.timeout.connect(self.update_animation)
-        if self.enable_animation:
-            self.animation_timer.start(50)  # Giảm xuống 50ms để animation mượt hơn
-        self.time_offset = 0
-        self._initialize_dot_clusters()
-    
-    def set_animation_enabled(self, enabled):
-        """Bật/tắt hiệu ứng animation."""
-        self.enable_animation = enabled
-        if enabled:
-            self.animation_timer.start(50)
-        else:
-            self.animation_timer.stop()
-        self.update()  # Cập nhật để vẽ lại
-        
-    def _initialize_dot_clusters(self):
-        """Khởi tạo hiệu ứng sóng từ trái trên xuống phải dưới."""
-        # Không cần clusters nữa, chỉ cần thông số sóng
-        self.wave_speed = 0.05  # Tăng tốc độ sóng chạy để rõ ràng hơn
-        self.wave_frequency = 0.5  # Tăng tần số để tạo sự khác biệt rõ rệt giữa các dot
-        
-    def update_animation(self):
-        """Cập nhật animation cho dot nhấp nháy."""
-        if self.enable_animation:
-            self.time_offset += 1
-            self.update()  # Trigger repaint
-        
-    def paintEvent(self, event):
-        """Vẽ grid background với dot nhấp nháy."""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        if not self.enable_animation:
-            # Chỉ vẽ background đơn giản nếu animation bị tắt
-            return
-        
-        # Vẽ lưới background với đường kẻ ngang và dọc màu xám trắng mỏng
-        painter.setPen(QPen(QColor(220, 220, 220, 80), 0.5))
-        
-        # Vẽ các đường kẻ dọc
-        for x in range(0, self.width(), self.grid_spacing):
-            painter.drawLine(x, 0, x, self.height())
-        
-        # Vẽ các đường kẻ ngang
-        for y in range(0, self.height(), self.grid_spacing):
-            painter.drawLine(0, y, self.width(), y)
-            
-        # Vẽ các dot nhấp nháy tại giao điểm
-        self._draw_blinking_dots(painter)
-        
-    def _draw_blinking_dots(self, painter):
-        """Vẽ các dot nhấp nháy theo dạng sóng từ trái trên xuống phải dưới."""
-        painter.setPen(Qt.NoPen)
-        
-        # Tính toán số lượng giao điểm
-        cols = self.width() // self.grid_spacing + 1
-        rows = self.height() // self.grid_spacing + 1
-        
-        # Tạo danh sách tất cả giao điểm hợp lệ (tránh viền)
-        margin = 20
-        for row in range(rows):
-            for col in range(cols):
-                x = col * self.grid_spacing
-                y = row * self.grid_spacing
-                
-                # Kiểm tra nếu giao điểm nằm trong vùng hợp lệ
-                if margin <= x <= self.width() - margin and margin <= y <= self.height() - margin:
-                    # Tính toán khoảng cách diagonal từ góc trái trên (0,0)
-                    # Sử dụng tổng col + row để tạo diagonal
-                    diagonal_distance = col + row
-                    
-                    # Tạo sóng chạy theo thời gian với công thức rõ ràng hơn
-                    wave_phase = self.time_offset * self.wave_speed - diagonal_distance * self.wave_frequency
-                    
-                    # Tính alpha dựa trên sóng sin với biên độ lớn hơn
-                    alpha = int(80 + 175 * math.sin(wave_phase))  # Alpha từ 80 đến 255 để rõ ràng hơn
-                    
-                    # Đảm bảo alpha trong khoảng hợp lệ
-                    alpha = max(0, min(255, alpha))
-                    
-                    # Màu dot: xanh lam nhạt với alpha theo sóng
-                    color = QColor(100, 150, 255, alpha)
-                    painter.setBrush(QBrush(color))
-                    
-                    # Vẽ dot nhỏ tại chính xác giao điểm
-                    dot_size = 2.5
-                    dot_rect = QRectF(
-                        x - dot_size/2, 
-                        y - dot_size/2,
-                        dot_size, 
-                        dot_size
-                    )
-                    painter.drawEllipse(dot_rect)
-                        
-    def resizeEvent(self, event):
-        """Khởi tạo lại dot clusters khi resize."""
-        super().resizeEvent(event)
-        self._initialize_dot_clusters()
-
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtWidgets import QMessageBox, QColorDialog, QSpinBox, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QGroupBox, QScrollArea, QSizePolicy, QSpacerItem, QFrame, QLineEdit
 from PyQt5.QtCore import Qt
@@ -12,6 +12,7 @@ from ui.components.grid_background_renderer import GridBackgroundWidget
 from ui.components.system_diagram_renderer import SystemDiagramRenderer
 from ui.components.info_panel_renderer import InfoPanelRenderer
 from ui.components.event_handler import InfoTabEventHandler
+from ui.components.state_bridge import state_bridge
 from ui.widgets.status_indicator_widget import StatusIndicatorWidget
 
 
@@ -49,11 +50,18 @@ class InfoTab(GridBackgroundWidget):
         self.status_indicator = StatusIndicatorWidget(self)
         self.status_indicator.move(20, self.height() - self.status_indicator.height() - 20)
 
+        # Đèn trạng thái cập nhật theo sự kiện từ state_store, không quét định kỳ
+        self._update_status_lights()
+        state_bridge.stateChanged.connect(self._on_state_changed)
+
         # Timer để cập nhật dữ liệu và mô phỏng - Refactored to use constant
         self.data_timer = QTimer()
         self.data_timer.timeout.connect(self._update_data)
         self.data_timer.start(DATA_UPDATE_INTERVAL)  # Cập nhật mỗi giây
 
+        # Frame nền lưới được gộp vào chu kỳ animation bên dưới
+        self._background_frame_pending = False
+
         # Timer cho animation effect - 60 FPS for smooth animation
         self.animation_timer = QTimer()
         self.animation_timer.timeout.connect(self._update_animation)
@@ -64,17 +72,41 @@ class InfoTab(GridBackgroundWidget):
         # system_data_manager.simulate_data()  # Vô hiệu hóa - dùng dữ liệu CAN thật
         # module_manager.simulate_realtime_data()  # Vô hiệu hóa - dùng dữ liệu CAN thật
         
-        # Cập nhật trạng thái đèn từ config
+        # Sơ đồ chỉ vẽ lại khi trạng thái node đổi; info panel hiển thị giá trị
+        # realtime nên được làm mới theo chu kỳ dữ liệu
+        if self._diagram_stale():
+            self.update()
+        elif self.event_handler.show_info_panel:
+            self.update(self.event_handler.info_panel_rect)
+
+    def _on_state_changed(self, groups):
+        import ui.ui_config as config
+        if config.GROUP_STATUS in groups:
+            self._update_status_lights()
+
+    def _update_status_lights(self):
+        """Cập nhật trạng thái đèn từ config."""
         import ui.ui_config as config
         self.status_indicator.set_power_status(config.POWER_STATUS)
         self.status_indicator.set_ready_status(config.READY_STATUS)
-        
-        self.update()  # Trigger repaint
+
+    def _diagram_stale(self):
+        return self.system_diagram_renderer.is_static_layer_stale(self.size(), self.devicePixelRatioF())
+
+    def background_frame(self):
+        """Frame nền lưới (20 Hz): chỉ đánh dấu, lần vẽ lại do _update_animation gộp."""
+        self._background_frame_pending = True
 
     def _update_animation(self):
         """Cập nhật animation cho connection lines."""
-        if self.system_diagram_renderer.animation_enabled:
-            self.update()  # Trigger repaint for animation
+        renderer = self.system_diagram_renderer
+        if self._background_frame_pending or self._diagram_stale():
+            # Dot của nền lưới phủ toàn widget; lớp sơ đồ tĩnh đã cache nên chỉ là blit
+            self._background_frame_pending = False
+            self.update()
+        elif renderer.animation_enabled and not renderer.connection_bounds.isNull():
+            # Chỉ vùng có đường kết nối cần vẽ lại lớp sóng
+            self.update(renderer.connection_bounds)
     
     def resizeEvent(self, event):
         """Xử lý khi resize để giữ status indicator ở góc dưới trái."""
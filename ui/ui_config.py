@@ -1,45 +1,89 @@
 import random
-DIRECTION_L = 0
-DIRECTION_R = 0
-ANGLE_L = 0
-ANGLE_R = 0
-DISTANCE_L = 0
-DISTANCE_R = 0
-AIM_DIRECTION_L = 0
-AIM_DIRECTION_R = 0
-AIM_ANGLE_L = 0
-AIM_ANGLE_R = 0
-W_DIRECTION = 30  # Hướng của tàu so với địa lý (độ, 0 = Bắc)
+import sys
+import types
+
+from common.state_store import state_store, flags
+
+# Trạng thái dùng chung được giữ trong state_store. Module này vẫn cho phép
+# đọc/ghi kiểu `config.DISTANCE_L = ...` như trước: thuộc tính là trường trạng
+# thái được chuyển thẳng tới state_store (có kiểu, đánh phiên bản theo nhóm,
+# báo sự kiện khi giá trị thật sự thay đổi). Cần ghi nhiều trường cùng lúc
+# thì dùng state_store.update(...) để GUI không thấy trạng thái ghi dở.
+
+# Nhóm trường (đơn vị đánh phiên bản và gửi sự kiện)
+GROUP_CANNON_L = "cannon_l"    # Góc/hướng hiện tại từ cảm biến
+GROUP_CANNON_R = "cannon_r"
+GROUP_TARGET_L = "target_l"    # Khoảng cách, hướng và góc tầm mục tiêu
+GROUP_TARGET_R = "target_r"
+GROUP_SHIP = "ship"
+GROUP_AMMO = "ammo"
+GROUP_STATUS = "status"
+GROUP_MODES = "modes"
+
+state_store.define(GROUP_CANNON_L, float, DIRECTION_L=0, ANGLE_L=0)
+state_store.define(GROUP_CANNON_R, float, DIRECTION_R=0, ANGLE_R=0)
+state_store.define(GROUP_TARGET_L, float, DISTANCE_L=0, AIM_DIRECTION_L=0, AIM_ANGLE_L=0)
+state_store.define(GROUP_TARGET_R, float, DISTANCE_R=0, AIM_DIRECTION_R=0, AIM_ANGLE_R=0)
+state_store.define(GROUP_SHIP, float, W_DIRECTION=30)  # Hướng của tàu so với địa lý (độ, 0 = Bắc)
 # AMMO_L = [bool(random.randint(0, 1)) for i in range(18)]
 # AMMO_R = [bool(random.randint(0, 1)) for i in range(18)]
-AMMO_L = [bool(1) for i in range(18)]
-AMMO_R = [bool(1) for i in range(18)]
-FIRE_L = [False for i in range(18)]
-FIRE_R = [False for i in range(18)]
+state_store.define(GROUP_AMMO, flags,
+                   AMMO_L=[bool(1) for i in range(18)],
+                   AMMO_R=[bool(1) for i in range(18)],
+                   FIRE_L=[False for i in range(18)],
+                   FIRE_R=[False for i in range(18)])
+
 NUMBER_LIST = [[ 2,10,14,17,11, 3],
                [ 6,16, 8, 5,15, 7],
                [ 4,12,18,13, 9, 1]]
 
 # Trạng thái đèn thông báo
-POWER_STATUS = True   # True = xanh (bình thường), False = đỏ (bất thường)
-READY_STATUS = True   # True = xanh (bình thường), False = đỏ (bất thường)
+state_store.define(
+    GROUP_STATUS, bool,
+    POWER_STATUS=True,   # True = xanh (bình thường), False = đỏ (bất thường)
+    READY_STATUS=True,   # True = xanh (bình thường), False = đỏ (bất thường)
+)
+
+state_store.define(
+    GROUP_MODES, bool,
+    # Chế độ nhập khoảng cách (True = Tự động từ CAN, False = Thủ công)
+    DISTANCE_MODE_AUTO_L=True,  # Chế độ tự động cho giàn trái
+    DISTANCE_MODE_AUTO_R=True,  # Chế độ tự động cho giàn phải
+
+    # Bảng bắn được sử dụng (True = Bảng bắn cao, False = Bảng bắn thấp)
+    USE_HIGH_TABLE_L=False,  # Bảng bắn cho giàn trái
+    USE_HIGH_TABLE_R=False,  # Bảng bắn cho giàn phải
+
+    # Chế độ nhập góc hướng (True = Tự động từ CAN, False = Thủ công)
+    DIRECTION_MODE_AUTO_L=True,  # Chế độ tự động cho giàn trái
+    DIRECTION_MODE_AUTO_R=True,  # Chế độ tự động cho giàn phải
+
+    # Chế độ nhập góc tầm (True = Tính từ khoảng cách, False = Nhập trực tiếp góc tầm)
+    ELEVATION_INPUT_FROM_DISTANCE_L=True,  # Giàn trái: True = nhập khoảng cách, False = nhập góc tầm trực tiếp
+    ELEVATION_INPUT_FROM_DISTANCE_R=True,  # Giàn phải: True = nhập khoảng cách, False = nhập góc tầm trực tiếp
+
+    # Chế độ nhập góc tầm trực tiếp (True = Tự động từ CAN, False = Thủ công)
+    ELEVATION_MODE_AUTO_L=True,  # Chế độ tự động cho giàn trái
+    ELEVATION_MODE_AUTO_R=True,  # Chế độ tự động cho giàn phải
+)
+
+
+class _StateModule(types.ModuleType):
+    """Module ui_config: thuộc tính là trường trạng thái đi qua state_store."""
 
-# Chế độ nhập khoảng cách (True = Tự động từ CAN, False = Thủ công)
-DISTANCE_MODE_AUTO_L = True  # Chế độ tự động cho giàn trái
-DISTANCE_MODE_AUTO_R = True  # Chế độ tự động cho giàn phải
+    def __getattr__(self, name):
+        if state_store.has_field(name):
+            return state_store.get(name)
+        raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
 
-# Bảng bắn được sử dụng (True = Bảng bắn cao, False = Bảng bắn thấp)
-USE_HIGH_TABLE_L = False  # Bảng bắn cho giàn trái
-USE_HIGH_TABLE_R = False  # Bảng bắn cho giàn phải
+    def __setattr__(self, name, value):
+        if state_store.has_field(name):
+            state_store.update(**{name: value})
+        else:
+            super().__setattr__(name, value)
 
-# Chế độ nhập góc hướng (True = Tự động từ CAN, False = Thủ công)
-DIRECTION_MODE_AUTO_L = True  # Chế độ tự động cho giàn trái
-DIRECTION_MODE_AUTO_R = True  # Chế độ tự động cho giàn phải
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(state_store.fields))
 
-# Chế độ nhập góc tầm (True = Tính từ khoảng cách, False = Nhập trực tiếp góc tầm)
-ELEVATION_INPUT_FROM_DISTANCE_L = True  # Giàn trái: True = nhập khoảng cách, False = nhập góc tầm trực tiếp
-ELEVATION_INPUT_FROM_DISTANCE_R = True  # Giàn phải: True = nhập khoảng cách, False = nhập góc tầm trực tiếp
 
-# Chế độ nhập góc tầm trực tiếp (True = Tự động từ CAN, False = Thủ công)
-ELEVATION_MODE_AUTO_L = True  # Chế độ tự động cho giàn trái
-ELEVATION_MODE_AUTO_R = True  # Chế độ tự động cho giàn phải
+sys.modules[__name__].__class__ = _StateModule
@@ -3,7 +3,7 @@
 
 from PyQt5.QtWidgets import QWidget, QLabel, QPushButton
 from PyQt5.QtGui import QFont, QPainter, QPen, QColor, QLinearGradient, QRadialGradient, QBrush
-from PyQt5.QtCore import Qt, QRect, QPropertyAnimation, QEasingCurve, QRectF, QPointF, pyqtProperty
+from PyQt5.QtCore import Qt, QRect, QPropertyAnimation, QEasingCurve, QRectF, QPointF, pyqtProperty, pyqtSignal
 from PyQt5.QtWidgets import QGraphicsOpacityEffect
 from ..ui_config import NUMBER_LIST
 import yaml
@@ -30,20 +30,77 @@ def reload_button_colors():
 from ..components.ui_utilities import BulletIsometricButton
 
 
+LEFT_LAUNCHER = "Giàn trái"
+RIGHT_LAUNCHER = "Giàn phải"
+TUBE_COUNT = 18
+ALL_TUBES_MASK = (1 << TUBE_COUNT) - 1
+
+
+def status_to_mask(status: list) -> int:
+    """Danh sách trạng thái 18 ống → bitmask (bit i ứng với ống số i + 1)."""
+    mask = 0
+    for i, ready in enumerate(status):
+        if ready:
+            mask |= 1 << i
+    return mask
+
+
+def mask_to_numbers(mask: int) -> list:
+    """Bitmask → danh sách số ống (1-18) tăng dần."""
+    return [i + 1 for i in range(TUBE_COUNT) if mask >> i & 1]
+
+
 class BulletWidget(QWidget):
+    """Hai giàn phóng 18 ống.
+
+    Trạng thái mỗi giàn được giữ dưới dạng bitmask (sẵn sàng / đã chọn) và nút
+    được giữ trong mảng theo chỉ số ống, nên mỗi lần cập nhật chỉ XOR trạng
+    thái cũ với mới rồi vẽ lại đúng những nút thay đổi.
+    """
+
+    # Phát khi tập ống được chọn thay đổi (click, bỏ chọn, chọn tất cả)
+    selectionChanged = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         
         # Khởi tạo trạng thái
-        self.left_launcher_status = [True for i in range(18)]
-        self.right_launcher_status = [True for i in range(18)]
-        self.left_selected_launchers = []
-        self.right_selected_launchers = []
+        self._buttons = {LEFT_LAUNCHER: [None] * TUBE_COUNT, RIGHT_LAUNCHER: [None] * TUBE_COUNT}
+        self._ready_mask = {LEFT_LAUNCHER: ALL_TUBES_MASK, RIGHT_LAUNCHER: ALL_TUBES_MASK}
+        self._selected_mask = {LEFT_LAUNCHER: 0, RIGHT_LAUNCHER: 0}
+        self._status_lists = {side: [True] * TUBE_COUNT for side in self._buttons}
         self.numeric_data_widget = None
         
         # Tạo giao diện
-        self._create_launcher_frame("Giàn trái", 10, 15, self.left_launcher_status)
-        self._create_launcher_frame("Giàn phải", 630, 15, self.right_launcher_status)
+        self._create_launcher_frame(LEFT_LAUNCHER, 10, 15, self.left_launcher_status)
+        self._create_launcher_frame(RIGHT_LAUNCHER, 630, 15, self.right_launcher_status)
+
+    # Danh sách chỉ đọc, được suy ra từ bitmask (dùng clear_selection/select_all_ready để thay đổi)
+    @property
+    def left_launcher_status(self) -> list:
+        return self._status_lists[LEFT_LAUNCHER]
+
+    @property
+    def right_launcher_status(self) -> list:
+        return self._status_lists[RIGHT_LAUNCHER]
+
+    @property
+    def left_selected_launchers(self) -> list:
+        return mask_to_numbers(self._selected_mask[LEFT_LAUNCHER])
+
+    @property
+    def right_selected_launchers(self) -> list:
+        return mask_to_numbers(self._selected_mask[RIGHT_LAUNCHER])
+
+    def selected_mask(self, launcher_side: str) -> int:
+        """Bitmask các ống đã chọn của giàn (bit i ứng với ống số i + 1)."""
+        return self._selected_mask[launcher_side]
+
+    def has_selection(self) -> bool:
+        return bool(self._selected_mask[LEFT_LAUNCHER] or self._selected_mask[RIGHT_LAUNCHER])
+
+    def has_ready_launchers(self) -> bool:
+        return bool(self._ready_mask[LEFT_LAUNCHER] or self._ready_mask[RIGHT_LAUNCHER])
 
     def _set_numeric_data_widget(self, widget: QWidget) -> None:
         """Khi thông số thay đổi sẽ tham chiếu đến numeric data object để cập nhật dữ liệu
@@ -64,12 +121,12 @@ class BulletWidget(QWidget):
         """
         if self.numeric_data_widget:
             # Count available missiles
-            left_available = sum(1 for status in self.left_launcher_status if status)
-            right_available = sum(1 for status in self.right_launcher_status if status)
+            left_available = bin(self._ready_mask[LEFT_LAUNCHER]).count("1")
+            right_available = bin(self._ready_mask[RIGHT_LAUNCHER]).count("1")
             
             # Count selected missiles
-            left_selected = len(self.left_selected_launchers)
-            right_selected = len(self.right_selected_launchers)
+            left_selected = bin(self._selected_mask[LEFT_LAUNCHER]).count("1")
+            right_selected = bin(self._selected_mask[RIGHT_LAUNCHER]).count("1")
             
             # Cập nhật dữ liệu với đúng key name
             self.numeric_data_widget.update_data(**{
@@ -146,6 +203,7 @@ class BulletWidget(QWidget):
                     lambda checked, side=launcher_side, index=number: 
                     self._on_button_clicked(side, index)
                 )
+                self._buttons[launcher_side][number-1] = button
 
     def _on_button_clicked(self, launcher_side: str, button_index: int) -> None:
         """Xử lý sự kiện khi nút được nhấn.
@@ -157,25 +215,11 @@ class BulletWidget(QWidget):
         Returns:
             None
         """
-        selected_list = (self.left_selected_launchers if launcher_side == "Giàn trái" 
-                        else self.right_selected_launchers)
-        status_list = (self.left_launcher_status if launcher_side == "Giàn trái" 
-                      else self.right_launcher_status)
-
+        bit = 1 << (button_index - 1)
         # Chỉ xử lý khi ống phóng sẵn sàng
-        if status_list[button_index-1]:
-            if button_index in selected_list:
-                selected_list.remove(button_index)
-            else:
-                selected_list.append(button_index)
-
-            button = self.findChild(BulletIsometricButton, f"{launcher_side}_{button_index}")
-            # Cập nhật trạng thái
-            self._update_button_style(button, status_list[button_index-1], 
-                                    button_index in selected_list)
-            
-            # Đảm bảo cập nhật numeric display sau khi click
-            self._update_numeric_display()
+        if self._ready_mask[launcher_side] & bit:
+            self._apply_state(launcher_side, self._ready_mask[launcher_side],
+                              self._selected_mask[launcher_side] ^ bit)
 
     def _update_button_style(self, button: BulletIsometricButton, is_ready: bool, is_selected: bool) -> None:
         """Cập nhật trạng thái và màu sắc của nút bấm với hiệu ứng isometric 3D.
@@ -192,9 +236,48 @@ class BulletWidget(QWidget):
             button.set_state(is_ready, is_selected)
             button.setEnabled(is_ready)
 
+    def _apply_state(self, launcher_side: str, ready_mask: int, selected_mask: int) -> bool:
+        """Đặt trạng thái mới cho giàn và chỉ cập nhật các nút có bit thay đổi.
+
+        Args:
+            launcher_side (str): Tên/Vị trí giàn phóng
+            ready_mask (int): Bitmask ống sẵn sàng
+            selected_mask (int): Bitmask ống đã chọn (được giới hạn trong ready_mask)
+
+        Returns:
+            bool: True nếu có nút thay đổi
+        """
+        selected_mask &= ready_mask
+        changed = ((self._ready_mask[launcher_side] ^ ready_mask)
+                   | (self._selected_mask[launcher_side] ^ selected_mask))
+        if not changed:
+            return False
+
+        selection_changed = selected_mask != self._selected_mask[launcher_side]
+        if ready_mask != self._ready_mask[launcher_side]:
+            self._status_lists[launcher_side] = [bool(ready_mask >> i & 1) for i in range(TUBE_COUNT)]
+        self._ready_mask[launcher_side] = ready_mask
+        self._selected_mask[launcher_side] = selected_mask
+
+        buttons = self._buttons[launcher_side]
+        while changed:
+            bit = changed & -changed
+            changed ^= bit
+            index = bit.bit_length() - 1
+            self._update_button_style(buttons[index], bool(ready_mask & bit), bool(selected_mask & bit))
+
+        # Đảm bảo cập nhật numeric display sau khi thay đổi trạng thái
+        self._update_numeric_display()
+        if selection_changed:
+            self.selectionChanged.emit()
+        return True
+
     def _update_launcher_status(self, launcher_side: str, new_status: list) -> None:
         """Cập nhật tráng thái của giàn phóng.
 
+        Ống đã chọn nhưng không còn sẵn sàng sẽ bị bỏ chọn. Không có gì thay
+        đổi thì không nút nào bị động tới.
+
         Args:
             launcher_side (str): Tên/Vị trí giàn phóng
             new_status (list): Trạng thái mới của giàn phóng.
@@ -202,70 +285,39 @@ class BulletWidget(QWidget):
         Returns:
             None
         """
-        if len(new_status) != 18:
-            print(f"Error: Cần đúng 18 trạng thái, nhưng nhận được {len(new_status)}")
+        if len(new_status) != TUBE_COUNT:
+            print(f"Error: Cần đúng {TUBE_COUNT} trạng thái, nhưng nhận được {len(new_status)}")
+            return
+        if launcher_side not in self._buttons:
+            print(f"Error: Giàn phóng không hợp lệ: {launcher_side}")
             return
 
-        # Cập nhật trạng thái và kiểm tra danh sách đã chọn
-        if launcher_side == "Giàn trái":
-            self.left_launcher_status = new_status
-            # Chỉ giữ lại các ống phóng đã chọn và vẫn sẵn sàng
-            self.left_selected_launchers = [
-                idx for idx in self.left_selected_launchers 
-                if new_status[idx-1]
-            ]
-        
-        else:
-            self.right_launcher_status = new_status
-            # Chỉ giữ lại các ống phóng đã chọn và vẫn sẵn sàng
-            self.right_selected_launchers = [
-                idx for idx in self.right_selected_launchers 
-                if new_status[idx-1]    
-            ]
-            
+        self._apply_state(launcher_side, status_to_mask(new_status), self._selected_mask[launcher_side])
 
-        # Cập nhật giao diện các nút theo NUMBER_LIST
-        for row_idx, row in enumerate(NUMBER_LIST):
-            for col_idx, number in enumerate(row):
-                button = self.findChild(BulletIsometricButton, f"{launcher_side}_{number}")
-                if button:
-                    is_selected = (number in self.left_selected_launchers if launcher_side == "Giàn trái"
-                                 else number in self.right_selected_launchers)
-                    
-                    self._update_button_style(
-                        button,
-                        new_status[number-1],
-                        is_selected
-                    )
-                    # Cập nhật trạng thái enabled của nút
-                    button.setEnabled(new_status[number-1])
-        # Đảm bảo cập nhật numeric display sau khi thay đổi trạng thái
-        self._update_numeric_display()
+    def clear_selection(self) -> None:
+        """Bỏ chọn tất cả ống phóng của cả hai giàn."""
+        for side in self._buttons:
+            self._apply_state(side, self._ready_mask[side], 0)
+
+    def select_all_ready(self) -> None:
+        """Chọn tất cả ống phóng đang sẵn sàng của cả hai giàn."""
+        for side in self._buttons:
+            self._apply_state(side, self._ready_mask[side], self._ready_mask[side])
 
     def update_button_colors(self):
         """Cập nhật màu sắc của tất cả các nút từ config mới"""
         reload_button_colors()  # Reload global config
         
         # Cập nhật lại tất cả các nút
-        for row_idx, row in enumerate(NUMBER_LIST):
-            for col_idx, number in enumerate(row):
-                # Cập nhật nút trái
-                left_button = self.findChild(BulletIsometricButton, f"Giàn trái_{number}")
-                if left_button:
-                    left_button.refresh_colors()  # Refresh colors for this button
-                    is_selected = number in self.left_selected_launchers
-                    left_button.set_state(self.left_launcher_status[number-1], is_selected)
-                    left_button.update()  # Force repaint
-                    left_button.repaint()  # Force immediate repaint
-                
-                # Cập nhật nút phải
-                right_button = self.findChild(BulletIsometricButton, f"Giàn phải_{number}")
-                if right_button:
-                    right_button.refresh_colors()  # Refresh colors for this button
-                    is_selected = number in self.right_selected_launchers
-                    right_button.set_state(self.right_launcher_status[number-1], is_selected)
-                    right_button.update()  # Force repaint
-                    right_button.repaint()  # Force immediate repaint
+        for side, buttons in self._buttons.items():
+            ready_mask = self._ready_mask[side]
+            selected_mask = self._selected_mask[side]
+            for index, button in enumerate(buttons):
+                if button:
+                    button.refresh_colors()  # Refresh colors for this button
+                    button.set_state(bool(ready_mask >> index & 1), bool(selected_mask >> index & 1))
+                    button.update()  # Force repaint
+                    button.repaint()  # Force immediate repaint
 
     def update(self, left_status: list = [False] * 18, right_status: list = [False] * 18) -> None:
         """Cập nhật trạng thái của giàn phóng trái và phải khi có thay đổi
@@ -286,7 +338,7 @@ class BulletWidget(QWidget):
             raise ValueError("Cần đúng 18 trạng thái cho cả giàn trái và phải")
 
         # new_left_status = [not status for status in self.left_launcher_status]
-        self._update_launcher_status("Giàn trái", left_status)
+        self._update_launcher_status(LEFT_LAUNCHER, left_status)
         
         # new_right_status = [not status for status in self.right_launcher_status]
-        self._update_launcher_status("Giàn phải", right_status)
\ No newline at end of file
+        self._update_launcher_status(RIGHT_LAUNCHER, right_status)
\ No newline at end of file
@@ -4,7 +4,8 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QDoubleValidator, QPainter, QColor, QFont
 import ui.ui_config as config
-from common.utils import get_firing_table_interpolator, resource_path, load_firing_table
+from common.utils import resource_path
+from common.ballistics import get_firing_table_interpolator, get_high_firing_table_interpolator
 import yaml
 
 
@@ -27,7 +28,6 @@ class AngleInputDialog(QWidget):
         
         # Biến theo dõi bảng bắn được chọn (True = bảng bắn cao, False = bảng bắn thấp)
         self.use_high_table = False
-        self._high_table_interpolator = None  # Cache interpolator bảng bắn cao
         
         # Làm cho widget này hiển thị trên tất cả widget khác
         self.setWindowFlags(Qt.Widget)
@@ -648,10 +648,8 @@ class AngleInputDialog(QWidget):
             self.table_selection_container.setVisible(False)
     
     def _get_high_table_interpolator(self):
-        """Lấy hoặc tạo interpolator cho bảng bắn cao."""
-        if self._high_table_interpolator is None:
-            self._high_table_interpolator = load_firing_table("table1_high.csv")
-        return self._high_table_interpolator
+        """Lấy interpolator cho bảng bắn cao (đã cache trong firing_table_registry)."""
+        return get_high_firing_table_interpolator()
     
     def on_table_selection_changed(self, button):
         """Xử lý khi người dùng thay đổi lựa chọn bảng bắn."""
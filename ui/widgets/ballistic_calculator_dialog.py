@@ -1,9 +1,11 @@
+import math
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QPushButton, QWidget, QGridLayout, QFrame)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QDoubleValidator, QIntValidator
 import ui.ui_config as config
 from communication.data_sender import sender_angle_direction
+from common.latency_trace import latency_tracer
 
 
 class BinaryValidator(QIntValidator):
@@ -754,7 +756,7 @@ class BallisticCalculatorWidget(QWidget):
         self.ok_btn = QPushButton("✓")
         self.ok_btn.setFixedSize(40, 40)
         self.ok_btn.setCursor(Qt.PointingHandCursor)
-        self.ok_btn.clicked.connect(self.on_ok_clicked)
+        self.ok_btn.clicked.connect(lambda: self.on_ok_clicked())
         self.ok_btn.setStyleSheet("""
             QPushButton {
                 background-color: #10B981;
@@ -800,6 +802,7 @@ class BallisticCalculatorWidget(QWidget):
 
         return button_layout
 
+    @latency_tracer.traced_command
     def on_ok_clicked(self):
         """Xử lý khi nhấn OK - áp dụng lượng sửa."""
         corrections = self.get_corrections()
@@ -1036,7 +1039,7 @@ class BallisticCalculatorWidget(QWidget):
             config.AIM_DIRECTION_R = azimuth_right_deg
             
             # Nội suy góc tầm từ bảng bắn dựa trên khoảng cách
-            from common.utils import get_firing_table_interpolator
+            from common.ballistics import get_firing_table_interpolator
             interpolator = get_firing_table_interpolator()
             if interpolator:
                 # Tính góc tầm cho pháo trái
@@ -1070,7 +1073,7 @@ class BallisticCalculatorWidget(QWidget):
         if current_mode == "manual":
             return 0, 0, 0, 0
         
-        from common.utils import get_firing_table_interpolator, get_slope_correction_table
+        from common.ballistics import get_firing_table_interpolator, get_slope_correction_table
         
         try:
             # ========== LẤY INPUT TỪ CỘT BÊN TRÁI ==========
@@ -1103,33 +1106,36 @@ class BallisticCalculatorWidget(QWidget):
             X_left = config.DISTANCE_L   # Khoảng cách trái (m)
             X_right = config.DISTANCE_R  # Khoảng cách phải (m)
             
-            # Nội suy các giá trị từ table1 cho TRÁI
-            Z_left = interpolator.interpolate_z(X_left) if interpolator.z_data is not None else 0
-            delta_Zwhz_left = interpolator.interpolate_delta_zwhz(X_left)
-            delta_Zwbez_left = interpolator.interpolate_delta_zwbez(X_left)
-            delta_Zwhx_left = interpolator.interpolate_delta_zwhx(X_left)
-            delta_Xwhx_left = interpolator.interpolate_delta_xwhx(X_left)
-            delta_Xwhz_left = interpolator.interpolate_delta_xwhz(X_left)
-            delta_Xwbex_left = interpolator.interpolate_delta_xwbex(X_left)
-            delta_Xkacn_left = interpolator.interpolate_delta_xkacn(X_left)
-            delta_XH_left = interpolator.interpolate_delta_xh(X_left)
-            delta_XT_left = interpolator.interpolate_delta_xt(X_left)
-            delta_XTsz_left = interpolator.interpolate_delta_xtsz(X_left)
-            delta_XTbic_left = interpolator.interpolate_delta_xtbic(X_left)
+            # Nội suy mọi cột từ table1 cho cả hai bên trong một lần tính
+            row_left, row_right = interpolator.evaluate([X_left, X_right])
+
+            # Các giá trị từ table1 cho TRÁI
+            Z_left = row_left['z']
+            delta_Zwhz_left = row_left['delta_zwhz']
+            delta_Zwbez_left = row_left['delta_zwbez']
+            delta_Zwhx_left = row_left['delta_zwhx']
+            delta_Xwhx_left = row_left['delta_xwhx']
+            delta_Xwhz_left = row_left['delta_xwhz']
+            delta_Xwbex_left = row_left['delta_xwbex']
+            delta_Xkacn_left = row_left['delta_xkacn']
+            delta_XH_left = row_left['delta_xh']
+            delta_XT_left = row_left['delta_xt']
+            delta_XTsz_left = row_left['delta_xtsz']
+            delta_XTbic_left = row_left['delta_xtbic']
             
-            # Nội suy các giá trị từ table1 cho PHẢI
-            Z_right = interpolator.interpolate_z(X_right) if interpolator.z_data is not None else 0
-            delta_Zwhz_right = interpolator.interpolate_delta_zwhz(X_right)
-            delta_Zwbez_right = interpolator.interpolate_delta_zwbez(X_right)
-            delta_Zwhx_right = interpolator.interpolate_delta_zwhx(X_right)
-            delta_Xwhx_right = interpolator.interpolate_delta_xwhx(X_right)
-            delta_Xwhz_right = interpolator.interpolate_delta_xwhz(X_right)
-            delta_Xwbex_right = interpolator.interpolate_delta_xwbex(X_right)
-            delta_Xkacn_right = interpolator.interpolate_delta_xkacn(X_right)
-            delta_XH_right = interpolator.interpolate_delta_xh(X_right)
-            delta_XT_right = interpolator.interpolate_delta_xt(X_right)
-            delta_XTsz_right = interpolator.interpolate_delta_xtsz(X_right)
-            delta_XTbic_right = interpolator.interpolate_delta_xtbic(X_right)
+            # Các giá trị từ table1 cho PHẢI
+            Z_right = row_right['z']
+            delta_Zwhz_right = row_right['delta_zwhz']
+            delta_Zwbez_right = row_right['delta_zwbez']
+            delta_Zwhx_right = row_right['delta_zwhx']
+            delta_Xwhx_right = row_right['delta_xwhx']
+            delta_Xwhz_right = row_right['delta_xwhz']
+            delta_Xwbex_right = row_right['delta_xwbex']
+            delta_Xkacn_right = row_right['delta_xkacn']
+            delta_XH_right = row_right['delta_xh']
+            delta_XT_right = row_right['delta_xt']
+            delta_XTsz_right = row_right['delta_xtsz']
+            delta_XTbic_right = row_right['delta_xtbic']
             
             # ========== CÔNG THỨC GIẢ TÍNH LƯỢNG SỬA GÓC TẦM (TRÁI) ==========
             # TODO: CHỈNH SỬA CÔNG THỨC NÀY THEO YÊU CẦU THỰC TẾ
@@ -1199,14 +1205,20 @@ class BallisticCalculatorWidget(QWidget):
                     current_elev_mils_left = config.AIM_ANGLE_L / 0.05625  # Chuyển độ về ly giác
                     current_elev_mils_right = config.AIM_ANGLE_R / 0.05625
                     
-                    # Tra bảng table2
+                    # Tra bảng table2 cho cả hai bên trong một lần
                     try:
-                        p_correction_left_mils = slope_table.lookup(slope_angle, current_elev_mils_left)
-                        p_correction_right_mils = slope_table.lookup(slope_angle, current_elev_mils_right)
+                        p_correction_left_mils, p_correction_right_mils = slope_table.lookup(
+                            slope_angle, [current_elev_mils_left, current_elev_mils_right])
                         
-                        # Cộng thêm vào lượng sửa góc tầm
-                        elev_correction_left_mils += p_correction_left_mils
-                        elev_correction_right_mils += p_correction_right_mils
+                        # Cộng thêm vào lượng sửa góc tầm (bỏ qua ô trống của bảng)
+                        if not math.isnan(p_correction_left_mils):
+                            elev_correction_left_mils += p_correction_left_mils
+                        else:
+                            print(f"Bảng chênh tà không có giá trị cho góc tà {slope_angle}, ly giác {current_elev_mils_left:.0f} (trái)")
+                        if not math.isnan(p_correction_right_mils):
+                            elev_correction_right_mils += p_correction_right_mils
+                        else:
+                            print(f"Bảng chênh tà không có giá trị cho góc tà {slope_angle}, ly giác {current_elev_mils_right:.0f} (phải)")
                     except Exception as e:
                         print(f"Lỗi tra bảng chênh tà: {e}")
             
@@ -7,6 +7,8 @@ from PyQt5.QtWidgets import QWidget
 from PyQt5.QtGui import QPainter, QPen, QColor, QPixmap
 from PyQt5.QtCore import Qt, QPointF, QRectF, QTimer, pyqtProperty, QPropertyAnimation, QEasingCurve
 
+from ..components.asset_cache import asset_cache
+
 
 def resource_path(relative_path):
     if hasattr(sys, '_MEIPASS'):
@@ -14,6 +16,11 @@ def resource_path(relative_path):
     return os.path.join(os.path.abspath("."), relative_path)
 
 
+SHIP_ICON_PATH = resource_path(r"assets\Icons\ShipIcon.png").replace("\\", "/")
+MISSILE_ICON_PATH = resource_path(r"assets\Icons\missile.svg").replace("\\", "/")
+MISSILE_ICON_SIZE = 24  # Kích thước missile (phóng to x1.2)
+
+
 
 class AngleCompass(QWidget):
 
@@ -166,8 +173,7 @@ class AngleCompass(QWidget):
         self._draw_geographic_compass(painter, top_center, self.radius * 0.7)
         
         # Vẽ icon tàu xoay theo current_direction
-        icon_path = resource_path(r"assets\Icons\ShipIcon.png").replace("\\", "/")
-        self._draw_center_icon(painter, top_center, icon_path, self.radius * 0.7)
+        self._draw_center_icon(painter, top_center, SHIP_ICON_PATH, self.radius * 0.7)
         
         # Cả 2 mũi tên đều ở vòng ngoài: current_direction hướng ra ngoài, aim_direction hướng vào trong
         self._draw_pointer_triangle_isometric(painter, top_center, self.radius, self._current_direction, 20, inner_circle=False)
@@ -338,8 +344,7 @@ class AngleCompass(QWidget):
             missile_angle = math.atan2(dy, dx) + math.pi/2
         
         # Vẽ missile
-        missile_path = resource_path(r"assets\Icons\missile.svg").replace("\\", "/")
-        self._draw_missile_icon(painter, missile_pos, missile_path, missile_angle)
+        self._draw_missile_icon(painter, missile_pos, MISSILE_ICON_PATH, missile_angle)
 
     def _draw_missile_animation_outer(self, painter: QPainter, center: QPointF, radius: float, angle_deg: float) -> None:
         """Vẽ missile animation chuyển động theo đường parabol đến đầu mũi tên current_direction.
@@ -406,8 +411,7 @@ class AngleCompass(QWidget):
             missile_angle = math.atan2(dy, dx) + math.pi/2
         
         # Vẽ missile
-        missile_path = resource_path(r"assets\Icons\missile.svg").replace("\\", "/")
-        self._draw_missile_icon(painter, missile_pos, missile_path, missile_angle)
+        self._draw_missile_icon(painter, missile_pos, MISSILE_ICON_PATH, missile_angle)
 
     def _draw_missile_icon(self, painter: QPainter, position: QPointF, icon_path: str, rotation_angle: float) -> None:
         """Vẽ icon missile tại vị trí và góc xoay nhất định.
@@ -421,34 +425,13 @@ class AngleCompass(QWidget):
         Returns:
             None
         """
-        # Load missile icon (sử dụng PNG thay vì SVG để đơn giản hóa)
-        missile_png_path = resource_path(r"assets\Icons\missile.svg").replace("\\", "/")
-        pixmap = QPixmap(missile_png_path)
-        if pixmap.isNull():
-            print(f"Error: Unable to load missile icon from {missile_png_path}")
+        # Icon đã scale và tô đen được giữ trong asset_cache
+        missile_size = MISSILE_ICON_SIZE
+        black_pixmap = asset_cache.tinted(icon_path, missile_size, missile_size, Qt.black)
+        if black_pixmap.isNull():
+            print(f"Error: Unable to load missile icon from {icon_path}")
             return
 
-        # Kích thước missile (phóng to x1.2)
-        missile_size = 24
-        pixmap = pixmap.scaled(missile_size, missile_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
-        # Tạo một pixmap màu đen từ pixmap gốc
-        black_pixmap = QPixmap(pixmap.size())
-        black_pixmap.fill(Qt.transparent)
-        
-        black_painter = QPainter(black_pixmap)
-        black_painter.setRenderHint(QPainter.Antialiasing)
-        
-        # Vẽ hình dạng gốc để giữ alpha channel
-        black_painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
-        black_painter.drawPixmap(0, 0, pixmap)
-        
-        # Đổi màu thành đen bằng cách vẽ đè lên với màu đen và CompositionMode_SourceAtop
-        black_painter.setCompositionMode(QPainter.CompositionMode_SourceAtop)
-        black_painter.fillRect(black_pixmap.rect(), Qt.black)
-        
-        black_painter.end()
-
         # Tạo transform để xoay missile theo hướng chuyển động
         transform = QtGui.QTransform()
         transform.translate(position.x(), position.y())
@@ -876,18 +859,12 @@ class AngleCompass(QWidget):
 
     def _draw_center_icon(self, painter: QPainter, center: QPointF, icon_path: str, inner_radius: float) -> None:
         """Vẽ icon ở giữa vòng tròn, nghiêng về phía trước để tạo góc nhìn 45 độ từ phía sau."""
-        pixmap = QPixmap(icon_path)
-        if pixmap.isNull():
-            print(f"Error: Unable to load icon from {icon_path}")
-            return
-
         # Tính toán kích thước icon dựa trên bán kính vòng tròn nhỏ
         icon_size = int(inner_radius)  # Giảm kích thước icon nhỏ hơn
-        pixmap = pixmap.scaled(icon_size, icon_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
-        # Tạo transform để nghiêng icon về phía trước
-        transform = QtGui.QTransform()  # Xoay 90 độ về bên trái 
-        transformed_pixmap = pixmap.transformed(transform, Qt.SmoothTransformation)
+        transformed_pixmap = asset_cache.scaled(icon_path, icon_size, icon_size)
+        if transformed_pixmap.isNull():
+            print(f"Error: Unable to load icon from {icon_path}")
+            return
 
         # Tính toán tọa độ góc trên bên trái để căn giữa icon
         top_left_x = center.x() - transformed_pixmap.width() / 2 
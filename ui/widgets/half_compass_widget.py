@@ -5,6 +5,9 @@ from PyQt5.QtWidgets import QWidget
 from PyQt5.QtGui import QPainter, QPen, QColor, QPixmap
 from PyQt5.QtCore import Qt, QPointF, QRectF, QTimer, pyqtProperty, QPropertyAnimation, QEasingCurve
 
+from ..components.asset_cache import asset_cache
+from common.latency_trace import latency_tracer
+
 
 def resource_path(relative_path):
     if hasattr(sys, '_MEIPASS'):
@@ -12,6 +15,9 @@ def resource_path(relative_path):
     return os.path.join(os.path.abspath("."), relative_path)
 
 
+AIM_ICON_PATH = resource_path(r"assets\Icons\missileIcon.png").replace("\\", "/")
+
+
 class HalfCircleWidget(QWidget):
     _instance_counter = 0  # Class variable để đếm instance
     
@@ -194,6 +200,8 @@ class HalfCircleWidget(QWidget):
         
         # Vẽ đèn thông báo ở dưới cùng khi cả 2 wheel trùng khớp
         self._draw_status_light(painter, total_width, total_height, total_wheel_width, start_x)
+        painter.end()
+        latency_tracer.paint_done(self)
 
     def _draw_vertical_wheel_static(self, painter: QPainter, center: QPointF, width: float, height: float, is_360: bool = False) -> None:
         """Vẽ phần tĩnh của vertical picker wheel - chỉ vẽ background wheel."""
@@ -1024,13 +1032,11 @@ class HalfCircleWidget(QWidget):
         x = center.x() + radius * math.cos(angle_rad) - icon_size / 2
         y = center.y() - radius * math.sin(angle_rad) - icon_size / 2
         
-        # Load icon
-        icon_path = resource_path(r"assets\Icons\missileIcon.png").replace("\\", "/")
-        
-        aim_icon = QPixmap(icon_path)
+        # Icon đã scale sẵn theo kích thước (asset_cache)
+        scaled_icon = asset_cache.scaled(AIM_ICON_PATH, int(icon_size), int(icon_size))
 
         # Validate pixmap loaded successfully
-        if aim_icon.isNull():
+        if scaled_icon.isNull():
             # Fail quietly to avoid spamming console during UI startup
             return
             
@@ -1041,13 +1047,6 @@ class HalfCircleWidget(QWidget):
             QPainter.HighQualityAntialiasing
         )
         
-        # Scale icon với TransformationMode.SmoothTransformation
-        scaled_icon = aim_icon.scaled(
-            int(icon_size), int(icon_size),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        )
-        
         # Lưu trạng thái và transform
         painter.save()
         painter.translate(x + icon_size/2, y + icon_size/2)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+from PyQt5 import QtWidgets
+from PyQt5.QtCore import Qt, QTimer
+
+from common.constants import LatencyTraceDefaults
+from common.latency_trace import latency_tracer, STAGES, STAGE_DESCRIPTIONS
+
+COLUMNS = ("Chặng", "Số mẫu", "p50 (ms)", "p90 (ms)", "p99 (ms)", "Max (ms)")
+SUMMARY_KEYS = ('p50_ms', 'p90_ms', 'p99_ms', 'max_ms')
+
+
+class LatencyDiagnosticsWidget(QtWidgets.QFrame):
+    """Bảng chẩn đoán độ trễ theo chặng (CAN frame → điểm ảnh, click → bus.send).
+
+    Chỉ đọc histogram của latency_tracer khi đang hiển thị.
+    """
+
+    def __init__(self, tracer=latency_tracer, parent=None):
+        super().__init__(parent)
+        self.tracer = tracer
+        self.setupUi()
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+    def setupUi(self):
+        self.setStyleSheet("""
+            QFrame {
+                background: #19232D;
+                border: 2px solid #10B981;
+                border-radius: 8px;
+            }
+            QTableWidget {
+                background: transparent;
+                color: #F1F5F9;
+                font-size: 12px;
+                border: none;
+                gridline-color: #334155;
+            }
+            QHeaderView::section {
+                background: #0F172A;
+                color: #94A3B8;
+                font-size: 12px;
+                font-weight: bold;
+                border: none;
+                padding: 4px;
+            }
+            QLabel {
+                color: #94A3B8;
+                font-size: 12px;
+                border: none;
+            }
+            QPushButton {
+                background-color: #19232D;
+                color: #F1F5F9;
+                font-size: 12px;
+                font-weight: bold;
+                border: 2px solid #10B981;
+                border-radius: 6px;
+                padding: 4px 14px;
+            }
+        """)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+
+        self.table = QtWidgets.QTableWidget(len(STAGES), len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.table.setFocusPolicy(Qt.NoFocus)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        for column in range(1, len(COLUMNS)):
+            header.setSectionResizeMode(column, QtWidgets.QHeaderView.ResizeToContents)
+        for row, stage in enumerate(STAGES):
+            name = QtWidgets.QTableWidgetItem(STAGE_DESCRIPTIONS[stage])
+            name.setToolTip(stage)
+            self.table.setItem(row, 0, name)
+            for column in range(1, len(COLUMNS)):
+                item = QtWidgets.QTableWidgetItem("-")
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+        self.table.setFixedHeight(self.table.horizontalHeader().height()
+                                  + sum(self.table.rowHeight(row) for row in range(len(STAGES))) + 4)
+        layout.addWidget(self.table)
+
+        bottom_layout = QtWidgets.QHBoxLayout()
+        self.status_label = QtWidgets.QLabel("")
+        bottom_layout.addWidget(self.status_label, 1)
+        reset_btn = QtWidgets.QPushButton("Đặt lại")
+        dump_btn = QtWidgets.QPushButton("Xuất JSON")
+        for button, handler in ((reset_btn, self.reset), (dump_btn, self.dump)):
+            button.setFixedHeight(28)
+            button.clicked.connect(handler)
+            bottom_layout.addWidget(button)
+        layout.addLayout(bottom_layout)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._refresh_timer.start(LatencyTraceDefaults.PANEL_REFRESH_MS)
+
+    def hideEvent(self, event):
+        self._refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Cập nhật bảng từ histogram gộp của mọi thread."""
+        merged = self.tracer.merged()
+        for row, stage in enumerate(STAGES):
+            histogram = merged.get(stage)
+            summary = histogram.summary() if histogram is not None else {'count': 0}
+            self.table.item(row, 1).setText(str(summary['count']))
+            for column, key in enumerate(SUMMARY_KEYS, start=2):
+                value = summary.get(key)
+                self.table.item(row, column).setText(f"{value:.3f}" if value is not None else "-")
+        if not self.tracer.enabled:
+            self.status_label.setText("Đo độ trễ đang tắt (LatencyTraceDefaults.ENABLED)")
+
+    def reset(self):
+        self.tracer.reset()
+        self.status_label.setText("Đã đặt lại số liệu")
+        self.refresh()
+
+    def dump(self):
+        try:
+            path = self.tracer.dump()
+            self.status_label.setText(f"Đã ghi {path}")
+        except OSError as e:
+            error_msg = f"Không thể ghi file độ trễ: {e}"
+            print(error_msg)
+            self.status_label.setText(error_msg)
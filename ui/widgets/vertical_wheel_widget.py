@@ -5,6 +5,8 @@ from PyQt5.QtWidgets import QWidget
 from PyQt5.QtGui import QPainter, QPen, QColor, QPixmap
 from PyQt5.QtCore import Qt, QPointF, QRectF, QTimer, pyqtProperty, QPropertyAnimation, QEasingCurve
 
+from ..components.asset_cache import asset_cache
+
 
 def resource_path(relative_path):
     if hasattr(sys, '_MEIPASS'):
@@ -12,6 +14,9 @@ def resource_path(relative_path):
     return os.path.join(os.path.abspath("."), relative_path)
 
 
+AIM_ICON_PATH = resource_path(r"assets\Icons\missileIcon.png").replace("\\", "/")
+
+
 class VerticalWheelWidget(QWidget):
     def __init__(self, current_angle, aim_angle, parent=None):
         super().__init__(parent)
@@ -284,21 +289,15 @@ class VerticalWheelWidget(QWidget):
         icon_size = radius / 2
         x = center.x() + radius * math.cos(angle_rad) - icon_size / 2
         y = center.y() - radius * math.sin(angle_rad) - icon_size / 2
-        icon_path = resource_path(r"assets\Icons\missileIcon.png").replace("\\", "/")
-        aim_icon = QPixmap(icon_path)
-        if aim_icon.isNull():
-            print(f"Error: Unable to load icon from {icon_path}")
+        scaled_icon = asset_cache.scaled(AIM_ICON_PATH, int(icon_size), int(icon_size))
+        if scaled_icon.isNull():
+            print(f"Error: Unable to load icon from {AIM_ICON_PATH}")
             return
         painter.setRenderHints(
             QPainter.Antialiasing |
             QPainter.SmoothPixmapTransform |
             QPainter.HighQualityAntialiasing
         )
-        scaled_icon = aim_icon.scaled(
-            int(icon_size), int(icon_size),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        )
         painter.save()
         painter.translate(x + icon_size/2, y + icon_size/2)
         painter.rotate(44 - self._current_angle)